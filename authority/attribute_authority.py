@@ -1,14 +1,21 @@
 import os
-from typing import Any, List, Dict
+import threading
+from typing import Any, List, Dict, Tuple
 
+from authority.revocation_index import RevocationIndex
 from service.central_authority import CentralAuthority
 from shared.implementations.serializer.base_serializer import BaseSerializer
 from shared.model.global_parameters import GlobalParameters
+from shared.utils.precomputation_util import precompute_fixed_bases
 
 DEFAULT_STORAGE_PATH = 'data/authorities'
 ATTRIBUTE_PUBLIC_KEYS_FILENAME = '%s_public_attributes.dat'
 ATTRIBUTE_SECRET_KEYS_FILENAME = '%s_secret_attributes.dat'
+ATTRIBUTE_REVOCATIONS_FILENAME = '%s_revocations.dat'
+ATTRIBUTE_TIME_PERIOD_KEYS_FILENAME = '%s_keys_%d.dat'
 
+KeygenRequest = Dict[str, Any]
+"""A keygen request, a dict with the gid, registration_data, attributes and time_period of the user."""
 
 class AttributeAuthority(object):
     """
@@ -28,7 +35,10 @@ class AttributeAuthority(object):
         self._public_keys = None  # type: Any
         self._secret_keys = None  # type: Any
         self.global_parameters = None  # type: GlobalParameters
-        self.revocation_list = dict()  # type: Dict[int, Dict[str, List[str]]]
+        self.revocation_index = RevocationIndex()
+        self._keys_lock = threading.RLock()
+        self._preparing_keys = dict()  # type: Dict[int, threading.Event]
+        self._persist_time_period_keys = False
         if not os.path.exists(self.storage_path):
             os.makedirs(self.storage_path)
 
@@ -65,6 +75,161 @@ class AttributeAuthority(object):
         """
         pass
 
+    def create_keys_for_time_period(self, time_period: int) -> Tuple[Any, Any]:
+        """
+        Create the public and secret keys of a time period, without using them yet. Only implemented by
+        authorities which use different keys in each time period.
+        :param time_period: The time period
+        :return: The public keys and secret keys of the time period
+        """
+        raise NotImplementedError()
+
+    def generate_keys_for_time_period(self, time_period: int) -> Tuple[Any, Any]:
+        """
+        Generate the public and secret keys for the given time period, unless they are already available.
+        :param time_period: The time period
+        :return: The public keys and secret keys of the time period
+        """
+        return self.prepare_keys_for_time_period(time_period)
+
+    @property
+    def persist_time_period_keys(self) -> bool:
+        """
+        Whether the keys of each time period are loaded from the storage path when prepared, and persisted in it
+        otherwise. Enabling it persists the keys already in use as well, so they are used again after a restart.
+        """
+        return self._persist_time_period_keys
+
+    @persist_time_period_keys.setter
+    def persist_time_period_keys(self, persist: bool) -> None:
+        with self._keys_lock:
+            self._persist_time_period_keys = persist
+            if not persist:
+                return
+            time_periods = [time_period for time_period in self.time_periods_with_keys()
+                            if not os.path.exists(self._time_period_keys_path(time_period))]
+            keys = [(time_period, self._public_keys[time_period], self._secret_keys[time_period])
+                    for time_period in time_periods]
+        for time_period, public_keys, secret_keys in keys:
+            self.save_keys_for_time_period(time_period, public_keys, secret_keys)
+
+    def prepare_keys_for_time_period(self, time_period: int) -> Tuple[Any, Any]:
+        """
+        Make sure the keys of a time period are available. The keys of a time period are only prepared by one thread
+        at a time. Other threads requiring the same keys wait for it, so all of them use the same keys. The keys are
+        loaded and persisted when persist_time_period_keys is enabled.
+        :param time_period: The time period
+        :return: The public keys and secret keys of the time period
+        """
+        while True:
+            with self._keys_lock:
+                if time_period in self._public_keys:
+                    return self._public_keys[time_period], self._secret_keys[time_period]
+                event = self._preparing_keys.get(time_period)
+                if event is None:
+                    event = threading.Event()
+                    self._preparing_keys[time_period] = event
+                    break
+            # When the other thread fails, this thread prepares the keys on the next iteration
+            event.wait()
+        try:
+            keys = self.load_keys_for_time_period(time_period) if self.persist_time_period_keys else None
+            persisted = keys is not None
+            if not persisted:
+                keys = self.create_keys_for_time_period(time_period)
+                if self.persist_time_period_keys:
+                    self.save_keys_for_time_period(time_period, *keys)
+                    persisted = True
+            # The setting is checked again while installing, as persist_time_period_keys only persists the keys
+            # already installed when it is enabled
+            with self._keys_lock:
+                persist = not persisted and self.persist_time_period_keys
+                keys = self.install_keys_for_time_period(time_period, *keys)
+            if persist:
+                self.save_keys_for_time_period(time_period, *keys)
+            return keys
+        finally:
+            with self._keys_lock:
+                del self._preparing_keys[time_period]
+            event.set()
+
+    def install_keys_for_time_period(self, time_period: int, public_keys: Any, secret_keys: Any) -> Tuple[Any, Any]:
+        """
+        Start using the keys of a time period, unless keys of the time period are already in use. The public and
+        secret keys are swapped in together, so no request sees the keys of only one of them.
+        :param time_period: The time period
+        :param public_keys: The public keys of the time period
+        :param secret_keys: The secret keys of the time period
+        :return: The public keys and secret keys in use for the time period
+        """
+        with self._keys_lock:
+            if time_period not in self._public_keys:
+                self._public_keys[time_period] = public_keys
+                self._secret_keys[time_period] = secret_keys
+            return self._public_keys[time_period], self._secret_keys[time_period]
+
+    def evict_keys_for_time_period(self, time_period: int) -> None:
+        """
+        Stop using the keys of a time period, and remove the persisted keys.
+        :param time_period: The time period
+        """
+        with self._keys_lock:
+            self._public_keys.pop(time_period, None)
+            self._secret_keys.pop(time_period, None)
+        save_file_path = self._time_period_keys_path(time_period)
+        if os.path.exists(save_file_path):
+            os.remove(save_file_path)
+
+    def clear_keys_for_time_periods(self) -> None:
+        """
+        Remove the keys of all time periods from memory and disk, for example as they are no longer valid after a
+        new setup.
+        """
+        with self._keys_lock:
+            for time_period in self.time_periods_with_keys():
+                self.evict_keys_for_time_period(time_period)
+            prefix = ATTRIBUTE_TIME_PERIOD_KEYS_FILENAME.split('%d')[0] % self.name
+            for filename in os.listdir(self.storage_path):
+                if filename.startswith(prefix):
+                    os.remove(os.path.join(self.storage_path, filename))
+
+    def time_periods_with_keys(self) -> List[int]:
+        """
+        Gets the time periods of which keys are in use, for authorities with different keys in each time period.
+        """
+        with self._keys_lock:
+            return sorted(key for key in self._public_keys.keys() if isinstance(key, int))
+
+    def _time_period_keys_path(self, time_period: int) -> str:
+        return os.path.join(self.storage_path, ATTRIBUTE_TIME_PERIOD_KEYS_FILENAME % (self.name, time_period))
+
+    def save_keys_for_time_period(self, time_period: int, public_keys: Any, secret_keys: Any) -> None:
+        """
+        Persist the keys of a time period, see load_keys_for_time_period. The file is replaced atomically.
+        """
+        save_file_path = self._time_period_keys_path(time_period)
+        with open(save_file_path + '.tmp', 'wb') as f:
+            f.write(self.serializer.dumps({
+                'public': self.serializer.serialize_authority_public_keys(public_keys),
+                'secret': self.serializer.serialize_authority_secret_keys(secret_keys)
+            }))
+        os.replace(save_file_path + '.tmp', save_file_path)
+
+    def load_keys_for_time_period(self, time_period: int) -> Tuple[Any, Any]:
+        """
+        Load the persisted keys of a time period.
+        :param time_period: The time period
+        :return: The public keys and secret keys of the time period, or None when they are not persisted
+        """
+        save_file_path = self._time_period_keys_path(time_period)
+        if not os.path.exists(save_file_path):
+            return None
+        with open(save_file_path, 'rb') as f:
+            keys = self.serializer.loads(f.read())
+        public_keys = self.serializer.deserialize_authority_public_keys(keys['public'])
+        precompute_fixed_bases(public_keys)
+        return public_keys, self.serializer.deserialize_authority_secret_keys(keys['secret'])
+
     def revoke_attribute_indirect(self, gid: str, attribute: str, time_period: int) -> None:
         """
         Indirectly revoke an attribute for a user for a time period by adding it to the revocation list.
@@ -73,11 +238,15 @@ class AttributeAuthority(object):
         :param attribute: The attribute to revoke
         :param time_period: The time period to revoke for.
         """
-        if time_period not in self.revocation_list:
-            self.revocation_list[time_period] = dict()
-        if attribute not in self.revocation_list[time_period]:
-            self.revocation_list[time_period][attribute] = list()
-        self.revocation_list[time_period][attribute].append(gid)
+        self.revocation_index.revoke(gid, attribute, time_period)
+
+    @property
+    def revocation_list(self) -> Dict[int, Dict[str, List[str]]]:
+        """
+        Gets the revocation lists of all time periods containing revocations.
+        """
+        return {time_period: self.revocation_list_for_time_period(time_period)
+                for time_period in self.revocation_index.time_periods()}
 
     def revocation_list_for_time_period(self, time_period: int) -> Dict[str, List[str]]:
         """
@@ -85,7 +254,7 @@ class AttributeAuthority(object):
         :param time_period: The time period to get the revocation list for.
         :return: A dictionary of attribute name to list of user identifiers.
         """
-        return self.revocation_list[time_period] if time_period in self.revocation_list else {}
+        return self.revocation_index.revocation_list(time_period)
 
     def is_revoked(self, gid: str, attribute: str, time_period: int) -> bool:
         """
@@ -95,18 +264,49 @@ class AttributeAuthority(object):
         :param time_period: The time period to check.
         :return: Whether the attribute is revoked.
         """
-        if time_period in self.revocation_list and attribute in self.revocation_list[time_period]:
-            return gid in self.revocation_list[time_period][attribute]
-        else:
-            return False
+        return self.revocation_index.is_revoked(gid, attribute, time_period)
 
     def remove_revoked_attributes(self, gid: str, attributes: List[str], time_period: int) -> List[str]:
         return [attribute for attribute in attributes if not self.is_revoked(gid, attribute, time_period)]
 
+    def remove_revoked_attributes_batch(self, requests: List[KeygenRequest]) -> List[KeygenRequest]:
+        """
+        Remove the revoked attributes from multiple keygen requests.
+        :param requests: The keygen requests
+        :return: Copies of the requests, containing only the attributes which are not revoked
+        """
+        result = list()
+        for request in requests:
+            valid_request = dict(request)
+            valid_request['attributes'] = self.remove_revoked_attributes(request['gid'], request['attributes'],
+                                                                         request['time_period'])
+            result.append(valid_request)
+        return result
+
     def keygen(self, gid: str, registration_data: Any, attributes: list, time_period: int):
         valid_attributes = self.remove_revoked_attributes(gid, attributes, time_period)
         return self._keygen(gid, registration_data, valid_attributes, time_period)
 
+    def keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        """
+        Generate secret keys for multiple users. Revoked attributes are removed like in keygen.
+        :param requests: The keygen requests, see KeygenRequest
+        :return: The secret keys of each request, in the order of the requests
+        """
+        return self._keygen_batch(self.remove_revoked_attributes_batch(requests))
+
+    def _keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        """
+        Generate secret keys for multiple users. Subclasses can override this method to share the setup of the
+        scheme and the keys of each time period between the requests.
+        :param requests: The keygen requests, containing only the attributes to embed in the secret keys
+        :return: The secret keys of each request
+
+        Note: this method does not check whether the users own the attributes.
+        """
+        return [self._keygen(request['gid'], request['registration_data'], request['attributes'],
+                             request['time_period']) for request in requests]
+
     def _keygen(self, gid: str, registration_data: Any, attributes: list, time_period: int):
         """
         Generate secret keys for a user.
@@ -131,11 +331,22 @@ class AttributeAuthority(object):
         with open(save_file_path, 'wb') as f:
             f.write(self.serializer.serialize_authority_secret_keys(self._secret_keys))
 
+        save_file_path = os.path.join(self.storage_path, ATTRIBUTE_REVOCATIONS_FILENAME % self.name)
+        with open(save_file_path, 'wb') as f:
+            f.write(self.revocation_index.dumps())
+
     def load_attribute_keys(self):
         save_file_path = os.path.join(self.storage_path, ATTRIBUTE_PUBLIC_KEYS_FILENAME % self.name)
         with open(save_file_path, 'rb') as f:
             self._public_keys = self.serializer.deserialize_authority_public_keys(f.read())
+        precompute_fixed_bases(self._public_keys)
 
         save_file_path = os.path.join(self.storage_path, ATTRIBUTE_SECRET_KEYS_FILENAME % self.name)
         with open(save_file_path, 'rb') as f:
             self._secret_keys = self.serializer.deserialize_authority_secret_keys(f.read())
+
+        save_file_path = os.path.join(self.storage_path, ATTRIBUTE_REVOCATIONS_FILENAME % self.name)
+        if os.path.exists(save_file_path):
+            with open(save_file_path, 'rb') as f:
+                self.revocation_index = RevocationIndex.loads(f.read())
+
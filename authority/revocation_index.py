@@ -0,0 +1,223 @@
+import pickle
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+
+class RevocationIndex(object):
+    """
+    Index of the attributes revoked for users in each time period. The global identifiers of the users are interned
+    to consecutive integers, and the revoked users of an attribute in a time period are stored as a bitmap over
+    these integers. This makes membership checks constant time, and keeps the index compact: 100.000 revoked users
+    take 12.5 kB per attribute.
+
+    Each change of the revoked users of an attribute in a time period increments its version (see version), so
+    derived data, like update keys, can be checked for staleness without comparing the revoked users.
+
+    >>> index = RevocationIndex()
+    >>> index.revoke('bob', 'A@X', 1)
+    >>> index.is_revoked('bob', 'A@X', 1), index.is_revoked('bob', 'A@X', 2), index.is_revoked('alice', 'A@X', 1)
+    (True, False, False)
+    >>> index.carry_forward(1, 2)
+    >>> index.revocation_list(2)
+    {'A@X': ['bob']}
+    """
+
+    def __init__(self) -> None:
+        self._gids = list()  # type: List[str]
+        self._ids = dict()  # type: Dict[str, int]
+        self._bitmaps = dict()  # type: Dict[int, Dict[str, bytearray]]
+        self._versions = dict()  # type: Dict[Tuple[int, str], int]
+        self.identifier = uuid.uuid4().hex
+        """Identifies this index, so versions of different indices never compare equal."""
+
+    def intern(self, gid: str) -> int:
+        """
+        Get the integer identifier of a user, assigning a new one if the user is unknown.
+        :param gid: The global identifier of the user
+        :return: The integer identifier
+        """
+        identifier = self._ids.get(gid)
+        if identifier is None:
+            identifier = len(self._gids)
+            self._ids[gid] = identifier
+            self._gids.append(gid)
+        return identifier
+
+    def _bitmap(self, attribute: str, time_period: int) -> bytearray:
+        bitmaps = self._bitmaps.setdefault(time_period, dict())
+        if attribute not in bitmaps:
+            bitmaps[attribute] = bytearray()
+        return bitmaps[attribute]
+
+    def version(self, attribute: str, time_period: int) -> Tuple[str, int]:
+        """
+        Get the version of the revoked users of an attribute in a time period. The version changes whenever users
+        are revoked or reinstated, and is kept by dumps and loads.
+        :param attribute: The attribute
+        :param time_period: The time period
+        :return: The version, consisting of the identifier of the index and a counter
+        """
+        return self.identifier, self._versions.get((time_period, attribute), 0)
+
+    def _increment_version(self, attribute: str, time_period: int) -> None:
+        key = (time_period, attribute)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def revoke(self, gid: str, attribute: str, time_period: int) -> None:
+        """
+        Revoke an attribute of a user for a time period.
+        :param gid: The global identifier of the user
+        :param attribute: The attribute to revoke
+        :param time_period: The time period to revoke the attribute for
+        """
+        self.revoke_bulk([gid], [attribute], time_period)
+
+    def revoke_bulk(self, gids: Iterable[str], attributes: Iterable[str], time_period: int) -> None:
+        """
+        Revoke the given attributes of all given users for a time period.
+        :param gids: The global identifiers of the users
+        :param attributes: The attributes to revoke
+        :param time_period: The time period to revoke the attributes for
+        """
+        identifiers = [self.intern(gid) for gid in gids]
+        if len(identifiers) == 0:
+            return
+        size = (max(identifiers) >> 3) + 1
+        for attribute in attributes:
+            bitmap = self._bitmap(attribute, time_period)
+            if len(bitmap) < size:
+                bitmap.extend(bytes(size - len(bitmap)))
+            changed = False
+            for identifier in identifiers:
+                mask = 1 << (identifier & 7)
+                if not bitmap[identifier >> 3] & mask:
+                    bitmap[identifier >> 3] |= mask
+                    changed = True
+            if changed:
+                self._increment_version(attribute, time_period)
+
+    def unrevoke(self, gid: str, attribute: str, time_period: int) -> None:
+        """
+        Undo the revocation of an attribute of a user for a time period.
+        :param gid: The global identifier of the user
+        :param attribute: The attribute to reinstate
+        :param time_period: The time period to reinstate the attribute for
+        """
+        self.unrevoke_bulk([gid], [attribute], time_period)
+
+    def unrevoke_bulk(self, gids: Iterable[str], attributes: Iterable[str], time_period: int) -> None:
+        """
+        Undo the revocation of the given attributes of all given users for a time period.
+        :param gids: The global identifiers of the users
+        :param attributes: The attributes to reinstate
+        :param time_period: The time period to reinstate the attributes for
+        """
+        identifiers = [self._ids[gid] for gid in gids if gid in self._ids]
+        bitmaps = self._bitmaps.get(time_period, {})
+        for attribute in attributes:
+            bitmap = bitmaps.get(attribute)
+            if bitmap is None:
+                continue
+            changed = False
+            for identifier in identifiers:
+                mask = 1 << (identifier & 7)
+                if identifier >> 3 < len(bitmap) and bitmap[identifier >> 3] & mask:
+                    bitmap[identifier >> 3] &= ~mask
+                    changed = True
+            if changed:
+                self._increment_version(attribute, time_period)
+
+    def is_revoked(self, gid: str, attribute: str, time_period: int) -> bool:
+        """
+        Check whether an attribute of a user is revoked in a time period.
+        :param gid: The global identifier of the user
+        :param attribute: The attribute to check
+        :param time_period: The time period to check
+        :return: Whether the attribute is revoked
+        """
+        identifier = self._ids.get(gid)
+        if identifier is None:
+            return False
+        bitmap = self._bitmaps.get(time_period, {}).get(attribute)
+        if bitmap is None or identifier >> 3 >= len(bitmap):
+            return False
+        return bitmap[identifier >> 3] & (1 << (identifier & 7)) != 0
+
+    def carry_forward(self, time_period: int, next_time_period: int) -> None:
+        """
+        Revoke all attributes revoked in a time period in another time period as well, for example when a new
+        time period starts. Revocations already present in the other time period are kept.
+        :param time_period: The time period to copy the revocations of
+        :param next_time_period: The time period to add the revocations to
+        """
+        for attribute, bitmap in self._bitmaps.get(time_period, {}).items():
+            target = self._bitmap(attribute, next_time_period)
+            if len(target) < len(bitmap):
+                target.extend(bytes(len(bitmap) - len(target)))
+            current = int.from_bytes(target, 'little')
+            merged = current | int.from_bytes(bitmap, 'little')
+            if merged != current:
+                target[:] = merged.to_bytes(len(target), 'little')
+                self._increment_version(attribute, next_time_period)
+
+    def revoked_users(self, attribute: str, time_period: int) -> List[str]:
+        """
+        Get the users for which an attribute is revoked in a time period.
+        :param attribute: The attribute
+        :param time_period: The time period
+        :return: The global identifiers of the users, in the order they were first revoked
+        """
+        bitmap = self._bitmaps.get(time_period, {}).get(attribute, b'')
+        return [self._gids[(index << 3) + bit]
+                for index, byte in enumerate(bitmap) if byte
+                for bit in range(8) if byte & (1 << bit)]
+
+    def revocation_list(self, time_period: int) -> Dict[str, List[str]]:
+        """
+        Get the revocation list of a time period.
+        :param time_period: The time period
+        :return: A dictionary from attribute to the list of global identifiers of the users it is revoked for
+        """
+        result = dict()  # type: Dict[str, List[str]]
+        for attribute in self._bitmaps.get(time_period, {}).keys():
+            users = self.revoked_users(attribute, time_period)
+            if len(users) > 0:
+                result[attribute] = users
+        return result
+
+    def time_periods(self) -> List[int]:
+        """
+        Get the time periods containing revocations.
+        """
+        return [time_period for time_period, bitmaps in self._bitmaps.items()
+                if any(any(bitmap) for bitmap in bitmaps.values())]
+
+    def dumps(self) -> bytes:
+        """
+        Serialize the index, see loads.
+        """
+        return pickle.dumps({
+            'identifier': self.identifier,
+            'versions': self._versions,
+            'gids': self._gids,
+            'bitmaps': {time_period: {attribute: bytes(bitmap) for attribute, bitmap in bitmaps.items()}
+                        for time_period, bitmaps in self._bitmaps.items()}
+        })
+
+    @staticmethod
+    def loads(data: bytes) -> 'RevocationIndex':
+        """
+        Deserialize an index serialized with dumps.
+        :param data: The serialized index
+        :return: The index
+        """
+        d = pickle.loads(data)
+        index = RevocationIndex()
+        for gid in d['gids']:
+            index.intern(gid)
+        index._bitmaps = {time_period: {attribute: bytearray(bitmap) for attribute, bitmap in bitmaps.items()}
+                          for time_period, bitmaps in d['bitmaps'].items()}
+        if 'identifier' in d:
+            index.identifier = d['identifier']
+            index._versions = dict(d['versions'])
+        return index
@@ -0,0 +1,131 @@
+import threading
+
+from authority.attribute_authority import AttributeAuthority
+
+
+class TimePeriodKeyScheduler(object):
+    """
+    Scheduler generating the keys of upcoming time periods ahead of time in a background thread, for authorities
+    which use different keys in each time period (see AttributeAuthority.create_keys_for_time_period). This way,
+    requests for a new time period never have to wait for the (slow) authority setup.
+
+    The keys of the current time period and the next `lookahead` time periods are kept available. Keys are
+    generated outside the lock of the authority, persisted, and only then swapped in, so a request either sees all
+    keys of a time period or none. Keys of time periods more than `retention` periods before the current time
+    period are evicted. Persisted keys are loaded instead of generated, so a restarted authority starts warm.
+    A request for a time period of which the keys are being generated waits for the scheduler, instead of
+    generating other keys (see AttributeAuthority.prepare_keys_for_time_period).
+    """
+
+    def __init__(self, authority: AttributeAuthority, lookahead: int = 2, retention: int = 1,
+                 persist: bool = True) -> None:
+        """
+        :param authority: The authority to generate the keys for
+        :param lookahead: The amount of time periods after the current time period to generate keys for
+        :param retention: The amount of time periods before the current time period to keep the keys of
+        :param persist: Whether to persist the keys in the storage path of the authority. When started, this
+        is set on the authority (see AttributeAuthority.persist_time_period_keys), so keys prepared for requests are
+        persisted as well.
+        """
+        assert lookahead >= 0 and retention >= 0, 'The lookahead and retention should not be negative'
+        self.authority = authority
+        self.lookahead = lookahead
+        self.retention = retention
+        self.persist = persist
+        self.current_time_period = None  # type: int
+        self._condition = threading.Condition()
+        self._thread = None  # type: threading.Thread
+        self._stopped = False
+
+    def scheduled_time_periods(self) -> range:
+        """
+        Gets the time periods of which the keys should be available.
+        """
+        return range(self.current_time_period, self.current_time_period + self.lookahead + 1)
+
+    def start(self, time_period: int) -> None:
+        """
+        Start generating keys in the background.
+        :param time_period: The current time period
+        """
+        with self._condition:
+            self.current_time_period = time_period
+            self.authority.persist_time_period_keys = self.persist
+            if self._thread is not None:
+                self._condition.notify_all()
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._schedule, name='TimePeriodKeyScheduler', daemon=True)
+            self._thread.start()
+
+    def advance(self, time_period: int) -> None:
+        """
+        Move on to a new time period. The keys of the new upcoming time periods are generated, and the keys of
+        old time periods are evicted, in the background.
+        :param time_period: The new current time period
+        """
+        with self._condition:
+            self.current_time_period = time_period
+            self._condition.notify_all()
+
+    def stop(self) -> None:
+        """
+        Stop generating keys. The keys which are being generated are still installed.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join()
+
+    def _pending(self) -> list:
+        """
+        Gets the scheduled time periods of which the keys are not available yet.
+        """
+        available = set(self.authority.time_periods_with_keys())
+        return [time_period for time_period in self.scheduled_time_periods() if time_period not in available]
+
+    def _expired(self) -> list:
+        """
+        Gets the time periods of which the keys should be evicted.
+        """
+        return [time_period for time_period in self.authority.time_periods_with_keys()
+                if time_period < self.current_time_period - self.retention]
+
+    def is_ready(self) -> bool:
+        """
+        Check whether the keys of all scheduled time periods are available.
+        """
+        with self._condition:
+            return len(self._pending()) == 0
+
+    def _schedule(self) -> None:
+        """
+        Keep the keys of the scheduled time periods available. Runs in the background thread.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and len(self._pending()) == 0 and len(self._expired()) == 0:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                pending = self._pending()
+                expired = self._expired()
+            for time_period in expired:
+                self.authority.evict_keys_for_time_period(time_period)
+            # Generate the nearest time period first, and outside the lock, so requests are served meanwhile
+            for time_period in pending[:1]:
+                self.authority.prepare_keys_for_time_period(time_period)
+            with self._condition:
+                self._condition.notify_all()
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        """
+        Wait until the keys of all scheduled time periods are available.
+        :param timeout: The maximum time to wait in seconds, or None to wait indefinitely
+        :return: Whether the keys of all scheduled time periods are available
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._pending()) == 0, timeout)
@@ -0,0 +1,189 @@
+import asyncio
+import pickle
+from concurrent.futures import Executor, ThreadPoolExecutor
+from os.path import join
+from typing import Any, Callable, Dict, List
+
+from client.user_client import UserClient
+from shared.implementations.base_implementation import BaseImplementation
+from shared.model.records.data_record import DataRecord
+from shared.model.user import User
+
+REQUEST_WORKERS = 16
+"""The amount of threads performing the (blocking) requests to the insurance service and authorities."""
+
+
+class PrefetchedUpdateKeysConnection(object):
+    """
+    Stand-in for an authority connection, returning update keys which are already requested. This allows the
+    implementations to calculate decryption keys without requesting the update keys one authority at a time.
+    """
+
+    def __init__(self, update_keys: Any) -> None:
+        self.update_keys = update_keys
+
+    def request_update_keys(self, time_period: int) -> Any:
+        return self.update_keys
+
+
+class AsyncUserClient(UserClient):
+    """
+    User client with asyncio versions of the operations. Requests to multiple authorities are sent concurrently,
+    instead of one authority at a time. The requests are performed on a pool of request threads, while the
+    cryptographic operations are offloaded to the given executor, so the event loop is never blocked.
+
+    The synchronous methods of UserClient can still be used, but not concurrently with the asynchronous methods.
+    """
+
+    def __init__(self, user: User, implementation: BaseImplementation, verbose=False, storage_path=None,
+                 monitor_network=False, executor: Executor = None, request_workers: int = REQUEST_WORKERS) -> None:
+        """
+        :param executor: The executor to perform the cryptographic operations with. When None, the default
+        executor of the event loop is used.
+        :param request_workers: The amount of threads performing requests
+        """
+        super().__init__(user, implementation, verbose=verbose, storage_path=storage_path,
+                         monitor_network=monitor_network)
+        self.executor = executor
+        self.request_executor = ThreadPoolExecutor(max_workers=request_workers)
+
+    def close(self) -> None:
+        """
+        Shut down the request threads and close the connections.
+        """
+        self.request_executor.shutdown()
+        self.reset_connections()
+
+    async def _request(self, method: Callable, *args: Any) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(self.request_executor, method, *args)
+
+    async def _compute(self, method: Callable, *args: Any) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(self.executor, method, *args)
+
+    async def _connect_authorities(self) -> Dict[str, Any]:
+        # Creating the connections might request the authorities from the insurance service
+        if self._authority_connections is None:
+            await self._request(lambda: self.authority_connections)
+        return self._authority_connections
+
+    async def request_secret_keys_multiple_authorities_async(self, authority_attributes: Dict[str, List[str]],
+                                                             time_period: int) -> None:
+        """
+        Request secret keys from multiple authorities concurrently, see request_secret_keys_multiple_authorities.
+        :param authority_attributes: A dictionary from the name of the authority to request the secret keys from to
+        the list of attributes to request secret keys for from this authority.
+        :param time_period: The time period to request secret keys for, if applicable
+        """
+        connections = await self._connect_authorities()
+        responses = await asyncio.gather(*[
+            self._request(connections[authority_name].request_keygen, self.user.gid, self.user.registration_data,
+                          attributes, time_period)
+            for authority_name, attributes in authority_attributes.items()
+        ])
+        for secret_keys in responses:
+            self.user.issue_secret_keys(secret_keys)
+        await self._request(self.save_user_secret_keys)
+
+    async def authorities_public_keys_async(self, time_period: int) -> Dict[str, Any]:
+        """
+        Gets the merged public keys of all authorities for the given time period, see authorities_public_keys.
+        The public keys which are not cached yet are requested concurrently.
+        :param time_period: The time period
+        :return: The merged public keys, as returned by the merge_public_keys of the implementation
+        """
+        if time_period not in self._merged_public_keys:
+            connections = await self._connect_authorities()
+            missing = [name for name in connections.keys() if (name, time_period) not in self._authority_public_keys]
+            responses = await asyncio.gather(*[
+                self._request(connections[name].request_public_keys, time_period) for name in missing
+            ])
+            for name, public_keys in zip(missing, responses):
+                self._authority_public_keys[(name, time_period)] = public_keys
+            self._merged_public_keys[time_period] = await self._compute(
+                self.implementation.merge_public_keys,
+                {name: self._authority_public_keys[(name, time_period)] for name in connections.keys()})
+        return self._merged_public_keys[time_period]
+
+    async def request_update_keys_async(self, time_period: int) -> Dict[str, Any]:
+        """
+        Request the update keys of all authorities concurrently.
+        :param time_period: The time period to request the update keys for
+        :return: A dictionary from the name of the authority to its update keys
+        """
+        connections = await self._connect_authorities()
+        names = list(connections.keys())
+        responses = await asyncio.gather(*[
+            self._request(connections[name].request_update_keys, time_period) for name in names
+        ])
+        return dict(zip(names, responses))
+
+    async def _update_key_connections(self, time_period: int, ciphertext: Any = None) -> Dict[str, Any]:
+        """
+        Get the connections to calculate decryption keys with. When the implementation uses update keys, they
+        are requested concurrently up front, unless the decryption keys of the given ciphertext are cached.
+        """
+        if not self.implementation.uses_update_keys:
+            return await self._connect_authorities()
+        if ciphertext is not None:
+            cache_key = self.implementation.decryption_keys_cache_key(ciphertext, time_period)
+            if cache_key is not None and self.cached_decryption_keys(cache_key) is not None:
+                return await self._connect_authorities()
+        update_keys = await self.request_update_keys_async(time_period)
+        return {name: PrefetchedUpdateKeysConnection(keys) for name, keys in update_keys.items()}
+
+    async def _retrieve_decryption_key_async(self, record: DataRecord) -> bytes:
+        authorities = None
+        # Finding the owner keys might generate them
+        if await self._compute(self.find_owner_keys, record.owner_public_key) is None:
+            authorities = await self._update_key_connections(record.time_period, record.encryption_key_read)
+        return await self._compute(self._retrieve_decryption_key, record, authorities)
+
+    async def encrypt_file_async(self, filename: str, read_policy: str, write_policy: str,
+                                 time_period: int = 1) -> str:
+        """
+        Encrypt a file and send it to the insurance, see encrypt_file.
+        :param filename: The filename (relative to /data/input) to encrypt
+        :param read_policy: The read policy to use
+        :param write_policy: The write policy to use
+        :param time_period: The time period to use
+        :return: The location of the encrypted data
+        """
+        await self._request(lambda: self.global_parameters)
+        await self.authorities_public_keys_async(time_period)
+
+        with open(join('data/input', filename), 'rb') as file:
+            # The file is encrypted while it is streamed to the insurance, like in encrypt_file
+            create_record = await self._compute(self.create_record, read_policy, write_policy, file,
+                                                {'name': filename}, time_period)
+            return await self._request(self.send_create_record, create_record)
+
+    async def decrypt_file_async(self, location: str) -> str:
+        """
+        Decrypt the record on the given location and output it to the storage path, see decrypt_file.
+        :param location: The location of the record to decrypt
+        :raise exceptions.policy_not_satisfied_exception.PolicyNotSatisfiedException
+        :return: The name of the output file
+        """
+        record = await self._request(self.request_record, location)
+        decryption_key = await self._retrieve_decryption_key_async(record)
+
+        def decrypt():
+            ske = self.implementation.symmetric_key_scheme
+            info = pickle.loads(ske.ske_decrypt(record.info, decryption_key))
+            with open(join(self.storage_path, info['name']), 'wb') as file:
+                for chunk in ske.ske_decrypt_stream(record.data, decryption_key):
+                    file.write(chunk)
+            return info['name']
+
+        return await self._compute(decrypt)
+
+    async def update_file_async(self, location: str, message: bytes = b'updated content') -> None:
+        """
+        Update the data of the record on the given location, see update_file.
+        :param location: The location of the record to update
+        :param message: The new message
+        """
+        record = await self._request(self.request_record, location)
+        authorities = await self._update_key_connections(record.time_period, record.encryption_key_read)
+        update_record = await self._compute(self.update_record, record, message, authorities)
+        await self._request(self.send_update_record, location, update_record)
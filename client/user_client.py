@@ -1,15 +1,19 @@
 import os
 import pickle
+import threading
+from collections import OrderedDict
 from os import path
 from os.path import join
 from typing import Tuple, Any, List, Dict
 
-from Crypto.PublicKey import RSA
-
 from service.insurance_service import InsuranceService
+from shared.connection.rpc import Address
+from shared.connection.socket_user_attribute_authority_connection import SocketUserAttributeAuthorityConnection
+from shared.connection.socket_user_insurance_connection import SocketUserInsuranceConnection
 from shared.connection.user_attribute_authority_connection import UserAttributeAuthorityConnection
 from shared.connection.user_insurance_connection import UserInsuranceConnection
 from shared.implementations.base_implementation import BaseImplementation
+from shared.implementations.public_key.key_pair_pool import KeyPairPool
 from shared.model.global_parameters import GlobalParameters
 from shared.model.records.create_record import CreateRecord
 from shared.model.records.data_record import DataRecord
@@ -17,6 +21,7 @@ from shared.model.records.policy_update_record import PolicyUpdateRecord
 from shared.model.records.update_record import UpdateRecord
 from shared.model.types import AbeEncryption, DecryptionKeys
 from shared.model.user import User
+from shared.utils.data_util import as_buffer
 from shared.utils.key_utils import extract_key_from_group_element
 
 RSA_KEY_SIZE = 2048
@@ -24,6 +29,10 @@ RSA_KEY_SIZE = 2048
 USER_OWNER_KEY_FILENAME = '%s.der'
 USER_REGISTRATION_DATA_FILENAME = '%s_registration.dat'
 USER_SECRET_KEYS_FILENAME = '%s_secret_keys.dat'
+USER_WRITE_KEY_POOL_FILENAME = '%s_write_key_pool.dat'
+
+DECRYPTION_KEYS_CACHE_SIZE = 64
+"""The maximum amount of calculated decryption keys to keep, see BaseImplementation.decryption_keys_cache_key."""
 
 DEFAULT_STORAGE_PATH = 'data/output'
 
@@ -40,6 +49,16 @@ class UserClient(object):
         self._insurance_connection = None  # type: UserInsuranceConnection
         self._global_parameters = None  # type: GlobalParameters
         self._authority_connections = None  # type: Dict[str, UserAttributeAuthorityConnection]
+        self._insurance_address = None  # type: Address
+        self._authority_addresses = None  # type: Dict[str, Address]
+        self._authkey = None  # type: bytes
+        self._connection_pool_size = 4
+        self._authority_public_keys = dict()  # type: Dict[Tuple[str, int], Any]
+        self._merged_public_keys = dict()  # type: Dict[int, Dict[str, Any]]
+        self._decryption_keys_cache = OrderedDict()  # type: OrderedDict
+        self._decryption_keys_cache_version = None  # type: int
+        self._decryption_keys_lock = threading.Lock()
+        self.write_key_pair_pool = None  # type: KeyPairPool
         if not path.exists(self.storage_path):
             os.makedirs(self.storage_path)
 
@@ -59,7 +78,16 @@ class UserClient(object):
 
     @property
     def authority_connections(self) -> Dict[str, UserAttributeAuthorityConnection]:
-        if self._authority_connections is None:
+        if self._authority_connections is None and self._authority_addresses is not None:
+            self._authority_connections = {
+                name: SocketUserAttributeAuthorityConnection(address, self.implementation.serializer, self._authkey,
+                                                             benchmark=self.monitor_network,
+                                                             identifier=self.user.gid,
+                                                             pool_size=self._connection_pool_size)
+                for name, address
+                in self._authority_addresses.items()
+                }
+        elif self._authority_connections is None:
             self._authority_connections = {
                 name: UserAttributeAuthorityConnection(authority, self.implementation.serializer,
                                                        benchmark=self.monitor_network, identifier=self.user.gid)
@@ -70,25 +98,127 @@ class UserClient(object):
 
     @property
     def insurance_connection(self) -> UserInsuranceConnection:
-        if self._insurance_connection is None:
+        if self._insurance_connection is None and self._insurance_address is not None:
+            self._insurance_connection = SocketUserInsuranceConnection(self._insurance_address,
+                                                                       self.implementation.serializer,
+                                                                       self._authkey,
+                                                                       benchmark=self.monitor_network,
+                                                                       identifier=self.user.gid,
+                                                                       pool_size=self._connection_pool_size)
+        elif self._insurance_connection is None:
             self._insurance_connection = UserInsuranceConnection(self.insurance, self.implementation.serializer,
                                                                  benchmark=self.monitor_network,
                                                                  identifier=self.user.gid)
         return self._insurance_connection
 
+    def connect_remote(self, insurance_address: Address, authority_addresses: Dict[str, Address],
+                       authkey: bytes = None, pool_size: int = 4) -> None:
+        """
+        Connect to an insurance service and attribute authorities served over sockets, see shared.connection.rpc,
+        instead of calling them in-process. The authorities can only be called in-process when the insurance service
+        is, as a remote insurance service only describes the authorities instead of returning them.
+        :param insurance_address: The address of the insurance service, or None to call it in-process
+        :param authority_addresses: A dictionary from the name of each authority to its address, or None to call the
+        authorities in-process
+        :param authkey: The shared secret of the servers, required when connecting to any of them
+        :param pool_size: The maximum amount of sockets opened to each server
+        """
+        assert insurance_address is None or authority_addresses is not None, \
+            'The authority addresses are required when connecting to a remote insurance service'
+        assert (insurance_address is None and authority_addresses is None) or authkey is not None, \
+            'The shared secret is required when connecting to a remote server'
+        self._insurance_address = insurance_address
+        self._authority_addresses = authority_addresses
+        self._authkey = authkey
+        self._connection_pool_size = pool_size
+        self.reset_connections()
+
     def reset_connections(self):
+        if self._insurance_connection is not None:
+            self._insurance_connection.close()
+        if self._authority_connections is not None:
+            for connection in self._authority_connections.values():
+                connection.close()
         self._insurance_connection = None
         self._authority_connections = None
+        self.invalidate_public_keys()
 
-    def authorities_public_keys(self, time_period):
-        # Retrieve authority public keys
-        return self.implementation.merge_public_keys(
-            {
-                name: authority.request_public_keys(time_period)
-                for name, authority
-                in self.authority_connections.items()
-                }
-        )
+    def authority_public_keys(self, authority_name: str, time_period: int) -> Any:
+        """
+        Gets the public keys of a single authority for the given time period. The keys are requested from the
+        authority only once, until they are invalidated with invalidate_public_keys.
+        :param authority_name: The name of the authority
+        :param time_period: The time period
+        :return: The public keys of the authority
+        """
+        cache_key = (authority_name, time_period)
+        if cache_key not in self._authority_public_keys:
+            self._authority_public_keys[cache_key] = self.authority_connections[authority_name].request_public_keys(
+                time_period)
+        return self._authority_public_keys[cache_key]
+
+    def authorities_public_keys(self, time_period: int) -> Dict[str, Any]:
+        """
+        Gets the merged public keys of all authorities for the given time period. The merged keys are kept
+        until the public keys of one of the authorities for this time period are invalidated.
+        :param time_period: The time period
+        :return: The merged public keys, as returned by the merge_public_keys of the implementation
+        """
+        if time_period not in self._merged_public_keys:
+            self._merged_public_keys[time_period] = self.implementation.merge_public_keys(
+                {
+                    name: self.authority_public_keys(name, time_period)
+                    for name
+                    in self.authority_connections.keys()
+                    }
+            )
+        return self._merged_public_keys[time_period]
+
+    def invalidate_public_keys(self, authority_name: str = None, time_period: int = None) -> None:
+        """
+        Invalidate the cached public keys, for example when an authority rotates its keys.
+        :param authority_name: The authority to invalidate the keys of, or None for all authorities
+        :param time_period: The time period to invalidate the keys for, or None for all time periods
+        """
+        for name, period in list(self._authority_public_keys.keys()):
+            if (authority_name is None or name == authority_name) and (time_period is None or period == time_period):
+                del self._authority_public_keys[(name, period)]
+        for period in list(self._merged_public_keys.keys()):
+            if time_period is None or period == time_period:
+                del self._merged_public_keys[period]
+
+    def start_write_key_pair_pool(self, low_watermark: int = 2, high_watermark: int = 8) -> KeyPairPool:
+        """
+        Start generating write key pairs ahead of time in the background, so creating records and updating
+        policies do not have to wait for the key generation. Key pairs left in the pool when it is stopped are
+        stored, so the pool starts warm the next time.
+        :param low_watermark: The pool is refilled when it contains less than this amount of key pairs
+        :param high_watermark: The amount of key pairs the pool is filled up to
+        :return: The started pool
+        """
+        if self.write_key_pair_pool is None:
+            self.write_key_pair_pool = KeyPairPool(
+                self.implementation.public_key_scheme, RSA_KEY_SIZE, low_watermark, high_watermark,
+                spill_path=os.path.join(self.storage_path, USER_WRITE_KEY_POOL_FILENAME % self.user.gid))
+            self.write_key_pair_pool.start()
+        return self.write_key_pair_pool
+
+    def stop_write_key_pair_pool(self) -> None:
+        """
+        Stop the pool of write key pairs, if started, and store the remaining key pairs.
+        """
+        if self.write_key_pair_pool is not None:
+            self.write_key_pair_pool.stop()
+            self.write_key_pair_pool = None
+
+    def generate_write_key_pair(self) -> Any:
+        """
+        Get a new write key pair, from the pool of pre-generated key pairs if it is started.
+        :return: A new key pair
+        """
+        if self.write_key_pair_pool is not None:
+            return self.write_key_pair_pool.take()
+        return self.implementation.public_key_scheme.generate_key_pair(RSA_KEY_SIZE)
 
     def encrypt_file(self, filename: str, read_policy: str = None, write_policy: str = None,
                      time_period: int = 1) -> str:
@@ -114,52 +244,111 @@ class UserClient(object):
             read_policy = policy_file.readline()
             write_policy = policy_file.readline()
 
-        file = open(join('data/input', filename), 'rb')
-        # Encrypt a message
-        create_record = self.create_record(read_policy, write_policy, file.read(), {'name': filename}, time_period)
-        file.close()
-        # Send to insurance (this also stores the record)
-        return self.send_create_record(create_record)
+        with open(join('data/input', filename), 'rb') as file:
+            # Encrypt a message, the file is encrypted while it is streamed to the insurance
+            create_record = self.create_record(read_policy, write_policy, file, {'name': filename}, time_period)
+            # Send to insurance (this also stores the record)
+            return self.send_create_record(create_record)
+
+    def encrypt_files(self, filenames: List[str], read_policy: str, write_policy: str,
+                      time_period: int = 1) -> List[str]:
+        """
+        Encrypt multiple files with the same policies. The attribute based encryption of the keys is performed only
+        once, and shared by the records of all files. Each file is encrypted with its own data key.
+        :param filenames: The filenames (relative to /data/input) to encrypt
+        :param read_policy: The read policy to use
+        :param write_policy: The write policy to use
+        :param time_period: The time period to use
+        :return: The names of the encrypted data (in /data/storage/), in the order of the filenames
+        """
+        record_keys = self._create_record_keys(read_policy, write_policy, time_period)
+        locations = list()
+        for filename in filenames:
+            if self.verbose:
+                print('Encrypting %s' % join('data/input', filename))
+            with open(join('data/input', filename), 'rb') as file:
+                create_record = self._create_record_with_keys(record_keys, file, {'name': filename})
+                locations.append(self.send_create_record(create_record))
+        return locations
 
-    def create_record(self, read_policy: str, write_policy: str, message: bytes, info: dict,
+    def create_record(self, read_policy: str, write_policy: str, message: Any, info: dict,
                       time_period: int) -> CreateRecord:
         """
         Create a new record containing the encrypted message.
         :param time_period: The time period for which the record is encrypted
         :param read_policy: The read policy to encrypt with.
         :param write_policy: The write policy to encrypt with.
-        :param message: The message to encrypt.
+        :param message: The message to encrypt. Either bytes, or a file-like object or iterable of bytes,
+        in which case the data of the record is a stream of encrypted chunks.
         :param info: Additional info to encrypt with the message.
         :return: records.create_record.CreateRecord The resulting record containing the encrypted message.
         """
-        # Generate symmetric encryption key
+        return self._create_record_with_keys(self._create_record_keys(read_policy, write_policy, time_period),
+                                             message, info)
+
+    def _create_record_keys(self, read_policy: str, write_policy: str, time_period: int) -> Tuple[CreateRecord, bytes]:
+        """
+        Generate and encrypt the keys for new records with the given policies. This contains all attribute based
+        encryption, so the keys can be shared by multiple records.
+        :param read_policy: The read policy to encrypt with.
+        :param write_policy: The write policy to encrypt with.
+        :param time_period: The time period for which the records are encrypted
+        :return: A CreateRecord without info and data, and the key to wrap the data keys of the records with
+        """
+        # Generate the key encryption key
         key, symmetric_key = self.implementation.generate_abe_key(self.global_parameters)
 
         # Generate key pairs for writers and data owner
         pke = self.implementation.public_key_scheme
-        ske = self.implementation.symmetric_key_scheme
-        write_key_pair = pke.generate_key_pair(RSA_KEY_SIZE)
+        write_key_pair = self.generate_write_key_pair()
         owner_key_pair = self.get_owner_key()
+        authority_public_keys = self.authorities_public_keys(time_period)
 
-        # Encrypt data and create a record
         return CreateRecord(
             read_policy=read_policy,
             write_policy=write_policy,
             owner_public_key=owner_key_pair.publickey(),
             write_public_key=write_key_pair.publickey(),
             encryption_key_read=self.implementation.abe_encrypt(self.global_parameters,
-                                                                self.authorities_public_keys(time_period), key,
+                                                                authority_public_keys, key,
                                                                 read_policy, time_period),
             encryption_key_owner=pke.encrypt(symmetric_key, owner_key_pair),
             write_private_key=self.implementation.abe_encrypt_wrapped(self.global_parameters,
-                                                                      self.authorities_public_keys(time_period),
+                                                                      authority_public_keys,
                                                                       self.implementation.serializer.serialize_private_key(
                                                                           write_key_pair),
                                                                       write_policy,
                                                                       time_period),
-            time_period=time_period,
-            info=ske.ske_encrypt(pickle.dumps(info), symmetric_key),
-            data=ske.ske_encrypt(message, symmetric_key)
+            time_period=time_period
+        ), symmetric_key
+
+    def _create_record_with_keys(self, record_keys: Tuple[CreateRecord, bytes], message: Any,
+                                 info: dict) -> CreateRecord:
+        """
+        Create a new record containing the encrypted message, using keys created by _create_record_keys.
+        :param record_keys: The keys, as created by _create_record_keys
+        :param message: The message to encrypt. Either bytes, or a file-like object or iterable of bytes.
+        :param info: Additional info to encrypt with the message.
+        :return: records.create_record.CreateRecord The resulting record containing the encrypted message.
+        """
+        keys, key_encryption_key = record_keys
+        ske = self.implementation.symmetric_key_scheme
+        data_key = self.implementation.generate_data_key()
+
+        # Encrypt data and create a record
+        return CreateRecord(
+            read_policy=keys.read_policy,
+            write_policy=keys.write_policy,
+            owner_public_key=keys.owner_public_key,
+            write_public_key=keys.write_public_key,
+            encryption_key_read=keys.encryption_key_read,
+            encryption_key_owner=keys.encryption_key_owner,
+            write_private_key=keys.write_private_key,
+            time_period=keys.time_period,
+            info=ske.ske_encrypt(pickle.dumps(info), data_key),
+            data=ske.ske_encrypt(message, data_key) if isinstance(message, bytes)
+            else ske.ske_encrypt_stream(message, data_key),
+            wrapped_data_key=ske.ske_encrypt(data_key, key_encryption_key)
         )
 
     def decrypt_file(self, location: str) -> str:
@@ -173,22 +362,88 @@ class UserClient(object):
         if self.verbose:
             print('Decrypting %s' % join('data/storage', location))
 
-        info, data = self.decrypt_record(record)
+        ske = self.implementation.symmetric_key_scheme
+        decryption_key = self._retrieve_decryption_key(record)
+        info = pickle.loads(ske.ske_decrypt(record.info, decryption_key))
 
         if self.verbose:
             print('Writing    %s' % join('data/output', info['name']))
-        file = open(join(self.storage_path, info['name']), 'wb')
-        file.write(data)
-        file.close()
+        with open(join(self.storage_path, info['name']), 'wb') as file:
+            for chunk in ske.ske_decrypt_stream(record.data, decryption_key):
+                file.write(chunk)
         return info['name']
 
-    def _decryption_keys_for_read_key(self, record: DataRecord):
-        return self.implementation.decryption_keys(self.global_parameters,
-                                                   self.authority_connections,
-                                                   self.user.secret_keys,
-                                                   self.user.registration_data,
-                                                   record.encryption_key_read,
-                                                   record.time_period)
+    def decrypt_range(self, location: str, offset: int, length: int) -> bytes:
+        """
+        Decrypt a range of the data of the record on the given location. Only the parts of the data containing
+        the range are read and decrypted, which requires a symmetric key scheme with a seekable format, like
+        shared.implementations.symmetric_key.chunked_aes_symmetric_key.ChunkedAESSymmetricKey.
+        :param location: The location of the record (in /data/storage)
+        :param offset: The offset in the plaintext of the range
+        :param length: The length of the range
+        :raise exceptions.policy_not_satisfied_exception.PolicyNotSatisfiedException
+        :return: The plaintext of the range
+        """
+        record = self.request_record(location)
+
+        if self.verbose:
+            print('Decrypting %s [%d:%d]' % (join('data/storage', location), offset, offset + length))
+
+        ske = self.implementation.symmetric_key_scheme
+        decryption_key = self._retrieve_decryption_key(record)
+        return ske.ske_decrypt_range(record.data, decryption_key, offset, length)
+
+    def _decryption_keys(self, ciphertext: AbeEncryption, time_period: int,
+                         authorities: Dict[str, UserAttributeAuthorityConnection] = None) -> DecryptionKeys:
+        """
+        Calculate the decryption keys for an ABE ciphertext.
+        :param ciphertext: The ABE ciphertext to calculate the decryption keys for
+        :param time_period: The time period of the ciphertext
+        :param authorities: The connections to request update keys with, defaults to the authority connections
+        :return: The decryption keys
+        """
+        cache_key = self.implementation.decryption_keys_cache_key(ciphertext, time_period)
+        if cache_key is not None:
+            decryption_keys = self.cached_decryption_keys(cache_key)
+            if decryption_keys is not None:
+                return decryption_keys
+        if authorities is None:
+            authorities = self.authority_connections
+        version = self.user.secret_keys_version
+        decryption_keys = self.implementation.decryption_keys(self.global_parameters,
+                                                              authorities,
+                                                              self.user.secret_keys,
+                                                              self.user.registration_data,
+                                                              ciphertext,
+                                                              time_period)
+        if cache_key is not None:
+            with self._decryption_keys_lock:
+                # Do not cache keys calculated with secret keys which have been reissued meanwhile
+                if version == self.user.secret_keys_version:
+                    self._decryption_keys_cache[cache_key] = decryption_keys
+                    while len(self._decryption_keys_cache) > DECRYPTION_KEYS_CACHE_SIZE:
+                        self._decryption_keys_cache.popitem(last=False)
+        return decryption_keys
+
+    def cached_decryption_keys(self, cache_key: Any) -> DecryptionKeys:
+        """
+        Gets the cached decryption keys with the given cache key. The cache is cleared when the secret keys of the
+        user have changed since the decryption keys were calculated.
+        :param cache_key: The cache key, as given by BaseImplementation.decryption_keys_cache_key
+        :return: The decryption keys, or None if not cached
+        """
+        with self._decryption_keys_lock:
+            if self._decryption_keys_cache_version != self.user.secret_keys_version:
+                self._decryption_keys_cache.clear()
+                self._decryption_keys_cache_version = self.user.secret_keys_version
+            decryption_keys = self._decryption_keys_cache.get(cache_key)
+            if decryption_keys is not None:
+                self._decryption_keys_cache.move_to_end(cache_key)
+            return decryption_keys
+
+    def _decryption_keys_for_read_key(self, record: DataRecord,
+                                      authorities: Dict[str, UserAttributeAuthorityConnection] = None):
+        return self._decryption_keys(record.encryption_key_read, record.time_period, authorities)
 
     def _decrypt_abe(self, ciphertext: AbeEncryption, decryption_keys: DecryptionKeys):
         """
@@ -203,33 +458,39 @@ class UserClient(object):
 
     def decrypt_record(self, record: DataRecord) -> Tuple[dict, bytes]:
         """
-        Decrypt a data record if possible.
+        Decrypt a data record if possible. Stored data is memory-mapped and decrypted into a single buffer.
         :param record: The data record to decrypt
         :raise exceptions.policy_not_satisfied_exception.PolicyNotSatisfiedException
         :return: info, data
         """
         ske = self.implementation.symmetric_key_scheme
         decryption_key = self._retrieve_decryption_key(record)
-        return pickle.loads(ske.ske_decrypt(record.info, decryption_key)), ske.ske_decrypt(record.data, decryption_key)
+        return pickle.loads(ske.ske_decrypt(record.info, decryption_key)), \
+               ske.ske_decrypt_buffer(as_buffer(record.data), decryption_key)
 
-    def _retrieve_decryption_key(self, record: DataRecord):
+    def _retrieve_decryption_key(self, record: DataRecord,
+                                 authorities: Dict[str, UserAttributeAuthorityConnection] = None):
         """
-        Retrieve the symmetric decryption key from the given date record, if possible.
+        Retrieve the symmetric decryption key of the info and data from the given date record, if possible.
         The key is retrieved by using the owner key if possible, otherwise ABE is used to retrieve the symmetric key.
+        When the record contains a wrapped data key, this key is unwrapped using the retrieved key.
         :param record: The DataRecord to retrieve the symmetric decryption key from.
+        :param authorities: The connections to request update keys with, defaults to the authority connections
         :return: The symmetric decryption key.
         :raise exceptions.policy_not_satisfied_exception.PolicyNotSatisfiedException
         """
+        ske = self.implementation.symmetric_key_scheme
         owner_keys = self.find_owner_keys(record.owner_public_key)
         if owner_keys is not None:
             pke = self.implementation.public_key_scheme
             decryption_key = pke.decrypt(record.encryption_key_owner, owner_keys)
         else:
-            ske = self.implementation.symmetric_key_scheme
             # Check if we need to fetch update keys first
-            abe_decryption_keys = self._decryption_keys_for_read_key(record)
+            abe_decryption_keys = self._decryption_keys_for_read_key(record, authorities)
             key = self._decrypt_abe(record.encryption_key_read, abe_decryption_keys)
             decryption_key = extract_key_from_group_element(self.global_parameters.group, key, ske.ske_key_size())
+        if record.wrapped_data_key is not None:
+            decryption_key = ske.ske_decrypt(record.wrapped_data_key, decryption_key)
         return decryption_key
 
     def update_file(self, location: str, message: bytes = b'updated content'):
@@ -248,25 +509,22 @@ class UserClient(object):
         # Send it to the insurance
         self.send_update_record(location, update_record)
 
-    def update_record(self, record: DataRecord, message: bytes) -> UpdateRecord:
+    def update_record(self, record: DataRecord, message: bytes,
+                      authorities: Dict[str, UserAttributeAuthorityConnection] = None) -> UpdateRecord:
         """
         Update the content of a record
         :param record: The data record to update
         :param message: The new message
+        :param authorities: The connections to request update keys with, defaults to the authority connections
         :return: records.update_record.UpdateRecord An record containing the updated data
         """
         pke = self.implementation.public_key_scheme
         ske = self.implementation.symmetric_key_scheme
         # Retrieve the encryption key
-        decryption_key = self._retrieve_decryption_key(record)
+        decryption_key = self._retrieve_decryption_key(record, authorities)
         # Retrieve the write secret key
-        decryption_keys = self.implementation.decryption_keys(self.global_parameters,
-                                                              self.authority_connections,
-                                                              self.user.secret_keys,
-                                                              self.user.registration_data,
-                                                              record.write_private_key[0],
-                                                              record.time_period)
-        write_secret_key = RSA.importKey(
+        decryption_keys = self._decryption_keys(record.write_private_key[0], record.time_period, authorities)
+        write_secret_key = self.implementation.serializer.deserialize_private_key(
             self.implementation.abe_decrypt_wrapped(self.global_parameters, decryption_keys,
                                                     self.user.gid, record.write_private_key,
                                                     self.user.registration_data))
@@ -288,23 +546,25 @@ class UserClient(object):
     def update_policy(self, record: DataRecord, read_policy: str, write_policy: str,
                       time_period: int) -> PolicyUpdateRecord:
         """
-        Update the policies of a DataRecord
+        Update the policies of a DataRecord. The info and data of the record are not encrypted again, instead the data
+        key is wrapped with a new key encryption key, which is encrypted under the new policies.
         :param record: The DataRecord to update the policies of
         :param read_policy: The new read policy
         :param write_policy: The new write_policy
         :param time_period: The new time period
-        :return: A PolicyUpdateRecord containing the updated policies
+        :return: A PolicyUpdateRecord containing the updated policies and keys, without info and data
         """
         pke = self.implementation.public_key_scheme
         ske = self.implementation.symmetric_key_scheme
-        # Retrieve the encryption key
-        decryption_key = self._retrieve_decryption_key(record)
+        # Retrieve the data key. For records without a wrapped data key, the current key becomes the data key.
+        data_key = self._retrieve_decryption_key(record)
         # Find the correct owner key
         owner_key_pair = self.find_owner_keys(record.owner_public_key)
-        # Generate new encryption keys
+        # Generate new key encryption keys
         new_key, new_symmetric_key = self.implementation.generate_abe_key(self.global_parameters)
+        wrapped_data_key = ske.ske_encrypt(data_key, new_symmetric_key)
         # Generate new write keys
-        write_key_pair = pke.generate_key_pair(RSA_KEY_SIZE)
+        write_key_pair = self.generate_write_key_pair()
 
         # Retrieve authority public keys
         authority_public_keys = self.authorities_public_keys(time_period)
@@ -318,14 +578,12 @@ class UserClient(object):
                                                                 time_period),
             encryption_key_owner=pke.encrypt(new_symmetric_key, owner_key_pair),
             write_private_key=self.implementation.abe_encrypt_wrapped(self.global_parameters, authority_public_keys,
-                                                                      write_key_pair.exportKey('DER'), write_policy,
-                                                                      time_period),
+                                                                      self.implementation.serializer.serialize_private_key(
+                                                                          write_key_pair),
+                                                                      write_policy, time_period),
             time_period=record.time_period,
-            info=ske.ske_encrypt(ske.ske_decrypt(record.info, decryption_key),
-                                 new_symmetric_key),
-            data=ske.ske_encrypt(ske.ske_decrypt(record.data, decryption_key),
-                                 new_symmetric_key),
-            signature=pke.sign(owner_key_pair, pickle.dumps((read_policy, write_policy, time_period)))
+            wrapped_data_key=wrapped_data_key,
+            signature=pke.sign(owner_key_pair, pickle.dumps((read_policy, write_policy, time_period, wrapped_data_key)))
         )
 
     def request_record(self, location: str) -> DataRecord:
@@ -407,6 +665,7 @@ class UserClient(object):
 
     def register(self, insurance: InsuranceService):
         self.insurance = insurance
+        self.invalidate_public_keys()
         registration_data = self.insurance_connection.send_register_user(self.user.gid)
         self.user.registration_data = registration_data
         self.save_registration_data()
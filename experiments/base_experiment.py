@@ -20,6 +20,7 @@ from experiments.runner.experiment_output import ExperimentOutput, OUTPUT_DETAIL
 from experiments.runner.experiment_state import ExperimentState
 from service.central_authority import CentralAuthority
 from service.insurance_service import InsuranceService
+from service.storage import Storage
 from shared.connection.base_connection import BaseConnection
 from shared.implementations.base_implementation import BaseImplementation
 from shared.model.user import User
@@ -283,7 +284,14 @@ class BaseExperiment(object):
         self.insurance = InsuranceService(self.state.implementation.serializer,
                                           self.central_authority,
                                           self.state.implementation.public_key_scheme,
-                                          storage_path=self.get_insurance_storage_path())
+                                          storage=self.create_insurance_storage())
+
+    def create_insurance_storage(self) -> Storage:
+        """
+        Create the storage backend of the insurance service.
+        :return: The storage
+        """
+        return Storage(self.state.implementation.serializer, self.get_insurance_storage_path())
 
     def _run_authsetup(self, authority: AttributeAuthority) -> None:
         attributes = next(
@@ -407,6 +415,7 @@ class BaseExperiment(object):
                 self.run_step(ABEStep.policy_update, self._run_policy_update)
             if self.run_descriptions['decrypt'] == 'always':
                 self.run_step(ABEStep.decrypt, self._run_decrypt)
+            self.run_additional_steps()
 
             self.stop_measurements()
             self.tear_down()
@@ -416,6 +425,13 @@ class BaseExperiment(object):
         except:
             self.output.output_error()
 
+    def run_additional_steps(self) -> None:
+        """
+        Run steps specific to an experiment, using run_step. These steps are run after the default steps,
+        while measuring.
+        """
+        pass
+
     def run_step(self, abe_step: ABEStep, method: Callable[..., None], args: List[Any] = list()):
         if self.state.measurement_type == MeasurementType.memory:
             u = memory_usage((method, args, {}), interval=self.memory_measure_interval)
@@ -480,7 +496,7 @@ class BaseExperiment(object):
             self.output.output_connections(self.get_connections())
             self.output.output_storage_space([
                 {
-                    'path': self.get_insurance_storage_path(),
+                    'sizes': self.insurance.storage.storage_space(),
                     'filename_mapper': lambda file: path.splitext(file)[1].strip('.')
                 },
                 {
@@ -11,3 +11,11 @@ class ABEStep(Enum):
     decrypt = 8
     data_update = 9
     policy_update = 10
+    pke_keygen = 11
+    pke_sign = 12
+    pke_verify = 13
+    abe_encrypt = 14
+    abe_decrypt = 15
+    serialize = 16
+    deserialize = 17
+    storage_update = 18
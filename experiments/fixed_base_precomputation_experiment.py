@@ -0,0 +1,61 @@
+from typing import List, Any
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.abe_step import ABEStep
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+from shared.utils import precomputation_util
+
+
+class FixedBasePrecomputationExperiment(BaseExperiment):
+    """
+    Experiment measuring the speedup of encryption by fixed-base precomputation tables for the global parameters and
+    authority public keys, against the time and memory it costs to build the tables during the setup.
+    The setup runs in each iteration, as the tables are built while setting up the keys.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'always',
+        'register_keygen': 'always',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'never'
+    }
+    generated_file_sizes = [64 * 1024]
+    generated_file_amount = 1
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types = [
+        MeasurementType.timings,
+        MeasurementType.memory
+    ]
+    measurement_types_once = []  # type: List[MeasurementType]
+    measurement_repeat = 20
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [
+                ExperimentCase('without precomputation', {'precompute': False}),
+                ExperimentCase('with precomputation', {'precompute': True})
+            ]
+        super().__init__(cases)
+        self.key = None  # type: Any
+
+    def setup(self):
+        super().setup()
+        precomputation_util.FIXED_BASE_PRECOMPUTATION_ENABLED = self.state.case.arguments['precompute']
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            precomputation_util.FIXED_BASE_PRECOMPUTATION_ENABLED = True
+
+    def run_additional_steps(self) -> None:
+        self.key, _ = self.state.implementation.generate_abe_key(self.user_clients[0].global_parameters)
+        self.run_step(ABEStep.abe_encrypt, self._run_abe_encrypt)
+
+    def _run_abe_encrypt(self) -> None:
+        user_client = self.user_clients[0]
+        self.state.implementation.abe_encrypt(user_client.global_parameters, user_client.authorities_public_keys(1),
+                                              self.key, self.read_policy, 1)
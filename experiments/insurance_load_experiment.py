@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import List, Tuple
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+from service.concurrent_insurance_service import ConcurrentInsuranceService
+from shared.utils.measure_util import percentile
+
+
+class InsuranceLoadExperiment(BaseExperiment):
+    """
+    Load test of the concurrent insurance service. Each simulated client updates its own record in a loop, and waits
+    for each update before sending the next. The throughput and the median and 99th percentile latency of the
+    updates are reported for a growing amount of clients. The update requests are signed up front, so only the
+    service is measured.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'never'
+    }
+    generated_file_sizes = [64 * 1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = []  # type: List[MeasurementType]
+    measurement_repeat = 5
+    requests_per_client = 20
+    """The amount of updates each client sends."""
+    workers = 8
+    """The amount of worker threads of the insurance service."""
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [ExperimentCase('%d clients' % clients, {'clients': clients}) for clients in [1, 2, 4, 8, 16]]
+        super().__init__(cases)
+        self.load_results = None  # type: List[Tuple[str, float]]
+
+    def _setup_insurance(self) -> None:
+        self.insurance = ConcurrentInsuranceService(self.state.implementation.serializer,
+                                                    self.central_authority,
+                                                    self.state.implementation.public_key_scheme,
+                                                    storage=self.create_insurance_storage(),
+                                                    workers=self.workers)
+
+    def reset_variables(self):
+        if self.insurance is not None:
+            self.insurance.close()
+        super().reset_variables()
+
+    def run_additional_steps(self) -> None:
+        clients = self.state.case.arguments['clients']
+        owner, writer = self.user_clients[0], self.user_clients[1]
+        locations = [self.location] + [owner.encrypt_file(self.file_name, self.read_policy, self.write_policy)
+                                       for _ in range(clients - 1)]
+        with open(self.update_file_name, 'rb') as update_file:
+            message = update_file.read()
+        update_records = [writer.update_record(self.insurance.load(location), message) for location in locations]
+
+        latencies = list()  # type: List[float]
+        latencies_lock = threading.Lock()
+
+        def run_client(location, update_record):
+            client_latencies = list()
+            for _ in range(self.requests_per_client):
+                start = time.perf_counter()
+                self.insurance.submit_update(location, update_record).result()
+                client_latencies.append(time.perf_counter() - start)
+            with latencies_lock:
+                latencies.extend(client_latencies)
+
+        threads = [threading.Thread(target=run_client, args=arguments) for arguments in zip(locations, update_records)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        self.load_results = [
+            ('throughput', len(latencies) / elapsed),
+            ('latency_p50', percentile(latencies, 0.5)),
+            ('latency_p99', percentile(latencies, 0.99))
+        ]
+
+    def finish_measurements(self) -> None:
+        super().finish_measurements()
+        if self.load_results is not None:
+            self.output.output_case_results('load', self.load_results)
+            self.load_results = None
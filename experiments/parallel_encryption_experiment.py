@@ -0,0 +1,61 @@
+from typing import List, Dict
+
+from experiments.enum.measurement_type import MeasurementType
+from experiments.file_size_experiment import FileSizeExperiment
+from experiments.runner.experiment_case import ExperimentCase
+from shared.implementations.symmetric_key.base_symmetric_key import BaseSymmetricKey
+from shared.implementations.symmetric_key.chunked_aes_symmetric_key import ChunkedAESSymmetricKey
+
+
+class ParallelEncryptionExperiment(FileSizeExperiment):
+    """
+    Experiment measuring the throughput of the symmetric encryption and decryption of a large file, when the
+    blocks of the ChunkedAESSymmetricKey scheme are spread over a varying amount of worker processes.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'always'
+    }
+    generated_file_sizes = [50 * (2 ** 20)]
+    encrypted_file_size = generated_file_sizes[0]
+    worker_amounts = [1, 2, 4, 8]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    # The cpu and memory measurements only measure the main process, so they are meaningless here
+    measurement_types_once = []  # type: List[MeasurementType]
+    measurement_repeat = 10
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = list(map(lambda workers: ExperimentCase('%d workers' % workers, {
+                'workers': workers,
+                'file_size': self.encrypted_file_size
+            }), self.worker_amounts))
+        super().__init__(cases)
+        self.symmetric_key_schemes = dict()  # type: Dict[int, ChunkedAESSymmetricKey]
+
+    def setup(self):
+        super().setup()
+        workers = self.state.case.arguments['workers']
+        if workers not in self.symmetric_key_schemes:
+            self.symmetric_key_schemes[workers] = ChunkedAESSymmetricKey(workers=workers)
+        self.state.implementation.symmetric_key_scheme = self.symmetric_key_schemes[workers]
+
+    def run(self) -> None:
+        original_schemes = {
+            implementation: implementation.symmetric_key_scheme
+            for implementation in self.implementations
+        }  # type: Dict[object, BaseSymmetricKey]
+        try:
+            super().run()
+        finally:
+            for implementation, scheme in original_schemes.items():
+                implementation.symmetric_key_scheme = scheme
+            for scheme in self.symmetric_key_schemes.values():
+                scheme.close()
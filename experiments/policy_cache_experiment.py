@@ -0,0 +1,75 @@
+from typing import List, Any, Dict
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.abe_step import ABEStep
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+from shared.model.types import AbeEncryption
+from shared.utils import policy_cache
+
+
+class PolicyCacheExperiment(BaseExperiment):
+    """
+    Micro-benchmark of a single ABE encryption and decryption (without the symmetric encryption and key pair
+    generation of a record), with and without caching the scheme objects and parsed policies.
+    """
+    generated_file_amount = 0
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'never',
+        'update_keys': 'never',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'never'
+    }
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = []  # type: List[MeasurementType]
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [
+                ExperimentCase('uncached', {'cache': False}),
+                ExperimentCase('cached', {'cache': True})
+            ]
+        super().__init__(cases)
+        self.key = None  # type: Any
+        self.public_keys = None  # type: Dict[str, Any]
+        self.abe_ciphertext = None  # type: AbeEncryption
+
+    def setup(self):
+        super().setup()
+        policy_cache.POLICY_CACHE_ENABLED = self.state.case.arguments['cache']
+        user_client = self.user_clients[0]
+        self.key, _ = self.state.implementation.generate_abe_key(user_client.global_parameters)
+        self.public_keys = user_client.authorities_public_keys(1)
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            policy_cache.POLICY_CACHE_ENABLED = True
+
+    def run_additional_steps(self) -> None:
+        self.run_step(ABEStep.abe_encrypt, self._run_abe_encrypt)
+        self.run_step(ABEStep.abe_decrypt, self._run_abe_decrypt)
+
+    def _run_abe_encrypt(self) -> None:
+        user_client = self.user_clients[0]
+        self.abe_ciphertext = self.state.implementation.abe_encrypt(user_client.global_parameters,
+                                                                    self.public_keys, self.key,
+                                                                    self.read_policy, 1)
+
+    def _run_abe_decrypt(self) -> None:
+        user_client = self.user_clients[1]
+        implementation = self.state.implementation
+        decryption_keys = implementation.decryption_keys(user_client.global_parameters,
+                                                         user_client.authority_connections,
+                                                         user_client.user.secret_keys,
+                                                         user_client.user.registration_data,
+                                                         self.abe_ciphertext, 1)
+        key = implementation.abe_decrypt(user_client.global_parameters, decryption_keys, user_client.user.gid,
+                                         self.abe_ciphertext, user_client.user.registration_data)
+        assert key == self.key
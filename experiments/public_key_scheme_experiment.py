@@ -0,0 +1,79 @@
+import os
+import shutil
+from typing import List, Any, Dict
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.abe_step import ABEStep
+from experiments.runner.experiment_case import ExperimentCase
+from shared.implementations.base_implementation import BaseImplementation
+from shared.implementations.public_key.base_public_key import BasePublicKey
+from shared.implementations.public_key.ec_public_key import ECPublicKey
+from shared.implementations.public_key.rsa_public_key import RSAPublicKey
+
+RSA_KEY_SIZE = 2048
+
+
+class PublicKeySchemeExperiment(BaseExperiment):
+    """
+    Experiment comparing the RSA and elliptic curve public key schemes, used for the owner and write keys.
+    Besides the default steps, the key generation, signing and verification are measured separately.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'always',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'always',
+        'policy_update': 'always',
+        'decrypt': 'always'
+    }
+    generated_file_sizes = [1024 * 1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_repeat = 20
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [
+                ExperimentCase('RSA', {'public_key_scheme': RSAPublicKey()}),
+                ExperimentCase('EC', {'public_key_scheme': ECPublicKey()})
+            ]
+        super().__init__(cases)
+        self.key_pair = None  # type: Any
+        self.signature = None  # type: bytes
+
+    def setup(self):
+        super().setup()
+        self.state.implementation.public_key_scheme = self.state.case.arguments['public_key_scheme']
+        # The insurance and the stored owner keys depend on the public key scheme
+        self._setup_insurance()
+        for authority in self.attribute_authorities:
+            self.insurance.add_authority(authority)
+        if os.path.exists(self.get_user_client_storage_path()):
+            shutil.rmtree(self.get_user_client_storage_path())
+        os.makedirs(self.get_user_client_storage_path())
+
+    def run(self) -> None:
+        original_schemes = {
+            implementation: implementation.public_key_scheme
+            for implementation in self.implementations
+        }  # type: Dict[BaseImplementation, BasePublicKey]
+        try:
+            super().run()
+        finally:
+            for implementation, scheme in original_schemes.items():
+                implementation.public_key_scheme = scheme
+
+    def run_additional_steps(self) -> None:
+        self.run_step(ABEStep.pke_keygen, self._run_pke_keygen)
+        self.run_step(ABEStep.pke_sign, self._run_pke_sign)
+        self.run_step(ABEStep.pke_verify, self._run_pke_verify)
+
+    def _run_pke_keygen(self) -> None:
+        self.key_pair = self.state.implementation.public_key_scheme.generate_key_pair(RSA_KEY_SIZE)
+
+    def _run_pke_sign(self) -> None:
+        self.signature = self.state.implementation.public_key_scheme.sign(self.key_pair, self.read_policy.encode())
+
+    def _run_pke_verify(self) -> None:
+        assert self.state.implementation.public_key_scheme.verify(self.key_pair.publickey(), self.signature,
+                                                                  self.read_policy.encode())
@@ -0,0 +1,85 @@
+import time
+from typing import List, Tuple
+
+from authority.revocation_index import RevocationIndex
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+
+
+class RevocationIndexExperiment(BaseExperiment):
+    """
+    Benchmark of the revocation index of the attribute authorities. For a growing amount of revoked users, the
+    attributes of the authority are revoked in bulk, after which the membership checks, a keygen of a non-revoked
+    user, carrying the revocations to the next time period and persisting the index are timed.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'never',
+        'update_keys': 'never',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'never'
+    }
+    generated_file_sizes = [1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = []  # type: List[MeasurementType]
+    measurement_repeat = 5
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [ExperimentCase('%d revoked' % amount, {'revoked': amount}) for amount in [0, 1000, 100000]]
+        super().__init__(cases)
+        self.revocation_results = None  # type: List[Tuple[str, float]]
+
+    def run_additional_steps(self) -> None:
+        authority = self.attribute_authorities[0]
+        user_client = self.user_clients[1]
+        attributes = next(
+            description['attributes'][authority.name]
+            for description in self.user_descriptions
+            if description['gid'] == user_client.user.gid)
+        gids = ['REVOKED%d' % i for i in range(self.state.case.arguments['revoked'])]
+        authority.revocation_index = RevocationIndex()
+
+        start = time.perf_counter()
+        authority.revocation_index.revoke_bulk(gids, authority.attributes, 1)
+        revoke_time = time.perf_counter() - start
+
+        checked_gids = gids[-100:] + [user_client.user.gid]
+        start = time.perf_counter()
+        for gid in checked_gids:
+            authority.remove_revoked_attributes(gid, attributes, 1)
+        check_time = (time.perf_counter() - start) / len(checked_gids)
+
+        start = time.perf_counter()
+        user_client.request_secret_keys(authority.name, attributes, 1)
+        keygen_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        authority.revocation_index.carry_forward(1, 2)
+        carry_forward_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        serialized = authority.revocation_index.dumps()
+        RevocationIndex.loads(serialized)
+        persist_time = time.perf_counter() - start
+
+        self.revocation_results = [
+            ('revoke_bulk', revoke_time),
+            ('remove_revoked_attributes', check_time),
+            ('keygen', keygen_time),
+            ('carry_forward', carry_forward_time),
+            ('dumps_loads', persist_time),
+            ('size', len(serialized))
+        ]
+
+    def finish_measurements(self) -> None:
+        super().finish_measurements()
+        if self.revocation_results is not None:
+            self.output.output_case_results('revocation', self.revocation_results)
+            self.revocation_results = None
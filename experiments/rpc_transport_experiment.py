@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from os import path
+from typing import Dict, List, Tuple
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+from shared.connection.rpc import Address, RpcServer
+from shared.connection.socket_user_attribute_authority_connection import AttributeAuthorityRpcHandler
+from shared.connection.socket_user_insurance_connection import InsuranceServiceRpcHandler
+from shared.utils.measure_util import percentile
+
+
+class RpcTransportExperiment(BaseExperiment):
+    """
+    Experiment comparing in-process calls with the socket transport (see shared.connection.rpc) over TCP and Unix
+    sockets. The encryption, update and decryption are run through the transport, so the network measurements
+    contain the actual bytes sent. Afterwards, a number of concurrent clients request the record in a loop, and the
+    throughput and the median and 99th percentile round-trip latency are reported.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'always',
+        'policy_update': 'never',
+        'decrypt': 'always'
+    }
+    generated_file_sizes = [64 * 1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types_once = [
+        MeasurementType.storage_and_network
+    ]
+    clients = 8
+    """The amount of concurrent clients requesting the record."""
+    requests_per_client = 50
+    """The amount of record requests each client sends."""
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [
+                ExperimentCase('in-process', {'transport': None}),
+                ExperimentCase('tcp', {'transport': 'tcp'}),
+                ExperimentCase('unix', {'transport': 'unix'})
+            ]
+        super().__init__(cases)
+        self.servers = dict()  # type: Dict[str, List[RpcServer]]
+        self.socket_directory = None  # type: str
+        self.authkey = os.urandom(32)
+        self.rpc_results = None  # type: List[Tuple[str, float]]
+
+    def setup(self) -> None:
+        super().setup()
+        transport = self.state.case.arguments['transport']
+        for user_client in self.user_clients:
+            if transport is None:
+                user_client.connect_remote(None, None)
+            else:
+                insurance_address, authority_addresses = self.start_servers(transport)
+                user_client.connect_remote(insurance_address, authority_addresses, self.authkey,
+                                           pool_size=self.clients)
+
+    def start_servers(self, transport: str) -> Tuple[Address, Dict[str, Address]]:
+        """
+        Serve the insurance service and the attribute authorities using the given transport, if not already served.
+        :param transport: 'tcp' or 'unix'
+        :return: The address of the insurance service, and a dictionary from the name of each authority to its address
+        """
+        if transport not in self.servers:
+            serializer = self.state.implementation.serializer
+            if transport == 'unix' and self.socket_directory is None:
+                self.socket_directory = tempfile.mkdtemp()
+
+            def create_server(handler, name):
+                if transport == 'unix':
+                    server = RpcServer(handler, serializer, path.join(self.socket_directory, '%s.sock' % name),
+                                       authkey=self.authkey)
+                else:
+                    server = RpcServer(handler, serializer, authkey=self.authkey)
+                server.start()
+                return server
+
+            servers = [create_server(InsuranceServiceRpcHandler(self.insurance, serializer), 'insurance')]
+            for authority in self.attribute_authorities:
+                servers.append(create_server(AttributeAuthorityRpcHandler(authority, serializer), authority.name))
+            self.servers[transport] = servers
+        servers = self.servers[transport]
+        return servers[0].address, {
+            authority.name: server.address for authority, server in zip(self.attribute_authorities, servers[1:])
+        }
+
+    def reset_variables(self):
+        if self.user_clients is not None:
+            for user_client in self.user_clients:
+                user_client.reset_connections()
+        for servers in self.servers.values():
+            for server in servers:
+                server.close()
+        self.servers = dict()
+        if self.socket_directory is not None:
+            shutil.rmtree(self.socket_directory)
+            self.socket_directory = None
+        super().reset_variables()
+
+    def run_additional_steps(self) -> None:
+        if self.state.measurement_type != MeasurementType.timings:
+            return
+        connection = self.user_clients[1].insurance_connection
+        latencies = list()  # type: List[float]
+        latencies_lock = threading.Lock()
+
+        def run_client():
+            client_latencies = list()
+            for _ in range(self.requests_per_client):
+                start = time.perf_counter()
+                connection.request_record(self.location)
+                client_latencies.append(time.perf_counter() - start)
+            with latencies_lock:
+                latencies.extend(client_latencies)
+
+        threads = [threading.Thread(target=run_client) for _ in range(self.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        self.rpc_results = [
+            ('throughput', len(latencies) / elapsed),
+            ('latency_p50', percentile(latencies, 0.5)),
+            ('latency_p99', percentile(latencies, 0.99))
+        ]
+
+    def finish_measurements(self) -> None:
+        super().finish_measurements()
+        if self.rpc_results is not None:
+            self.output.output_case_results('rpc', self.rpc_results)
+            self.rpc_results = None
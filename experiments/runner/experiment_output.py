@@ -101,19 +101,24 @@ class ExperimentOutput(object):
     def output_storage_space(self, directories: List[dict]) -> None:
         """
         Output the storage space used by the different parties.
-        :param directories: A list of directory options. Each directory option contains at least a 'path' value.
-        An 'filename_mapper' value is optional.
+        :param directories: A list of directory options. Each directory option contains at least a 'path' value,
+        or a 'sizes' value containing a list of tuples of file name and size, which is used instead of listing the
+        directory. An 'filename_mapper' value is optional.
         """
         values = list()
 
         for directory_options in directories:
-            directory_path = directory_options['path']
             filename_mapper = directory_options['filename_mapper'] \
                 if 'filename_mapper' in directory_options \
                 else lambda x: x
 
-            for file in listdir(directory_path):
-                size = path.getsize(path.join(directory_path, file))
+            if 'sizes' in directory_options:
+                sizes = directory_options['sizes']
+            else:
+                directory_path = directory_options['path']
+                sizes = [(file, path.getsize(path.join(directory_path, file))) for file in listdir(directory_path)]
+
+            for file, size in sizes:
                 values.append((filename_mapper(file), size))
 
         self.output_case_results('storage', values)
@@ -0,0 +1,82 @@
+from typing import List, Any
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.abe_step import ABEStep
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+from shared.model.types import AbeEncryption
+
+ATTRIBUTES = ['A%d' % i for i in range(1, 61)]
+
+
+class SerializationExperiment(BaseExperiment):
+    """
+    Benchmark of the serialization and deserialization of ABE ciphertexts, for the policy sizes of the
+    PolicySizeExperiment extended to policies of more than 100 attributes.
+    """
+    generated_file_amount = 0
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'never',
+        'update_keys': 'never',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'never'
+    }
+    attribute_authority_descriptions = [
+        {
+            'name': 'AUTHORITY0',
+            'attributes': list(map(lambda a: a + '@AUTHORITY0', ATTRIBUTES))
+        },
+        {
+            'name': 'AUTHORITY1',
+            'attributes': list(map(lambda a: a + '@AUTHORITY1', ATTRIBUTES))
+        }
+    ]
+    user_descriptions = [
+        {
+            'gid': 'BOB',
+            'attributes': {
+                'AUTHORITY0': attribute_authority_descriptions[0]['attributes'][:1],
+                'AUTHORITY1': attribute_authority_descriptions[1]['attributes'][:1]
+            }
+        }
+    ]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = []  # type: List[MeasurementType]
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            attribute_pairs = list(map(lambda a: '(%s@AUTHORITY0 OR %s@AUTHORITY1)' % (a, a), ATTRIBUTES))
+            cases = list(map(
+                lambda size: ExperimentCase("size %d" % size,
+                                            {'policy': ' AND '.join(attribute_pairs[:size])}),
+                [1, 3, 5, 7, 9, 25, 50, 60]
+            ))
+        super().__init__(cases)
+        self.ciphertext = None  # type: AbeEncryption
+        self.serialized = None  # type: bytes
+
+    def setup(self):
+        super().setup()
+        self.read_policy = self.state.case.arguments['policy']
+        user_client = self.user_clients[0]
+        key, _ = self.state.implementation.generate_abe_key(user_client.global_parameters)
+        self.ciphertext = self.state.implementation.abe_encrypt(user_client.global_parameters,
+                                                                user_client.authorities_public_keys(1), key,
+                                                                self.read_policy, 1)
+
+    def run_additional_steps(self) -> None:
+        self.run_step(ABEStep.serialize, self._run_serialize)
+        self.run_step(ABEStep.deserialize, self._run_deserialize)
+
+    def _run_serialize(self) -> None:
+        serializer = self.state.implementation.serializer
+        self.serialized = serializer.encode(serializer.serialize_abe_ciphertext(self.ciphertext))
+
+    def _run_deserialize(self) -> None:
+        serializer = self.state.implementation.serializer
+        assert serializer.deserialize_abe_ciphertext(serializer.decode(self.serialized)) == self.ciphertext
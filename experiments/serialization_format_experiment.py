@@ -0,0 +1,50 @@
+from typing import List
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+
+
+class SerializationFormatExperiment(BaseExperiment):
+    """
+    Experiment comparing the pickle format and the compact binary format of the serializers, for the storage
+    and network usage of records and the time needed to create, update and read them.
+    A small file is used, so the size of the record is mostly determined by the serialized metadata.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'always',
+        'policy_update': 'always',
+        'decrypt': 'always'
+    }
+    generated_file_sizes = [1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = [
+        MeasurementType.storage_and_network
+    ]
+    measurement_repeat = 20
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [
+                ExperimentCase('pickle', {'binary_format': False}),
+                ExperimentCase('binary', {'binary_format': True})
+            ]
+        super().__init__(cases)
+
+    def setup(self):
+        super().setup()
+        self.state.implementation.serializer.binary_format = self.state.case.arguments['binary_format']
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            for implementation in self.implementations:
+                implementation.serializer.binary_format = False
@@ -0,0 +1,77 @@
+from typing import List
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.abe_step import ABEStep
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+from service.packfile_storage import PackfileStorage
+from service.sharded_storage import ShardedStorage
+from service.storage import Storage
+
+STORAGE_BACKENDS = {
+    'file': Storage,
+    'sharded': ShardedStorage,
+    'packfile': PackfileStorage
+}
+
+
+class StorageBackendExperiment(BaseExperiment):
+    """
+    Experiment comparing the update throughput and storage space of the storage backends of the insurance service.
+    Besides the regular data and policy updates, the record is stored repeatedly in the storage_update step, so the
+    cost of the storage itself is measured without the cryptography.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'once',
+        'register_keygen': 'once',
+        'encrypt': 'always',
+        'update_keys': 'never',
+        'data_update': 'always',
+        'policy_update': 'always',
+        'decrypt': 'never'
+    }
+    generated_file_sizes = [64 * 1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = [
+        MeasurementType.storage_and_network
+    ]
+    measurement_repeat = 20
+    storage_update_amount = 50
+    """The amount of times the record is stored in the storage_update step."""
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [ExperimentCase(name, {'storage': name}) for name in STORAGE_BACKENDS]
+        super().__init__(cases)
+
+    def create_insurance_storage(self) -> Storage:
+        # The insurance is created before the first case, its storage is replaced in setup
+        backend = STORAGE_BACKENDS['file'] if self.state.case is None \
+            else STORAGE_BACKENDS[self.state.case.arguments['storage']]
+        return backend(self.state.implementation.serializer, self.get_insurance_storage_path())
+
+    def setup(self):
+        if self.insurance is not None:
+            self.insurance.storage.close()
+        super().setup()
+        if self.insurance is not None:
+            self.insurance.storage = self.create_insurance_storage()
+
+    def reset_variables(self):
+        if self.insurance is not None:
+            self.insurance.storage.close()
+        super().reset_variables()
+
+    def run_additional_steps(self) -> None:
+        self.run_step(ABEStep.storage_update, self._run_storage_update)
+
+    def _run_storage_update(self) -> None:
+        storage = self.insurance.storage
+        record = storage.load(self.location)
+        with open(self.update_file_name, 'rb') as update_file:
+            record.data = update_file.read()
+        for _ in range(self.storage_update_amount):
+            storage.store(self.location, record)
@@ -0,0 +1,81 @@
+import time
+from typing import List, Tuple
+
+from experiments.base_experiment import BaseExperiment
+from experiments.enum.measurement_type import MeasurementType
+from experiments.runner.experiment_case import ExperimentCase
+
+
+class UpdateKeysExperiment(BaseExperiment):
+    """
+    Experiment on the generation of update keys for a growing amount of attributes. The update_keys step generates
+    the update keys of all attributes. Afterwards, a single attribute is revoked, after which the incremental
+    generation (only regenerating the update keys of the revoked attribute), a cached request and a full
+    regeneration are timed. Only implementations using update keys (TAAC) report these additional timings.
+    """
+    run_descriptions = {
+        'setup_authsetup': 'always',
+        'register_keygen': 'never',
+        'encrypt': 'never',
+        'update_keys': 'always',
+        'data_update': 'never',
+        'policy_update': 'never',
+        'decrypt': 'never'
+    }
+    generated_file_sizes = [1024]
+    encrypted_file_size = generated_file_sizes[0]
+    measurement_types = [
+        MeasurementType.timings
+    ]
+    measurement_types_once = []  # type: List[MeasurementType]
+    measurement_repeat = 5
+
+    def __init__(self, cases: List[ExperimentCase] = None) -> None:
+        if cases is None:
+            cases = [ExperimentCase('%d attributes' % amount, {'attributes': amount}) for amount in [10, 50, 100]]
+        super().__init__(cases)
+        self.update_keys_results = None  # type: List[Tuple[str, float]]
+
+    def setup(self) -> None:
+        super().setup()
+        amount = self.state.case.arguments['attributes']
+        self.attribute_authority_descriptions = [
+            {
+                'name': 'AUTHORITY%d' % index,
+                'attributes': ['ATTRIBUTE%d@AUTHORITY%d' % (attribute, index) for attribute in range(amount)]
+            }
+            for index in range(2)
+        ]
+        # Each case has a different amount of attributes, so the keys of the previous case should not be reused
+        self.clear_attribute_authority_storage()
+
+    def run_additional_steps(self) -> None:
+        if not self.state.implementation.uses_update_keys:
+            return
+        authority = self.attribute_authorities[0]
+        authority.revoke_attribute_indirect('REVOKED', authority.attributes[0], 1)
+
+        start = time.perf_counter()
+        authority.update_keys(1)
+        incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        authority.update_keys(1)
+        cached_time = time.perf_counter() - start
+
+        authority.clear_update_keys()
+        start = time.perf_counter()
+        authority.update_keys(1)
+        full_time = time.perf_counter() - start
+
+        self.update_keys_results = [
+            ('incremental', incremental_time),
+            ('cached', cached_time),
+            ('full', full_time)
+        ]
+
+    def finish_measurements(self) -> None:
+        super().finish_measurements()
+        if self.update_keys_results is not None:
+            self.output.output_case_results('update_keys', self.update_keys_results)
+            self.update_keys_results = None
@@ -2,8 +2,19 @@ from experiments.authorities_amount_experiment import AuthoritiesAmountExperimen
 from experiments.base_experiment import BaseExperiment
 from experiments.disjunctive_policy_size_experiment import DisjunctivePolicySizeExperiment
 from experiments.file_size_experiment import FileSizeExperiment
+from experiments.fixed_base_precomputation_experiment import FixedBasePrecomputationExperiment
+from experiments.insurance_load_experiment import InsuranceLoadExperiment
+from experiments.parallel_encryption_experiment import ParallelEncryptionExperiment
+from experiments.policy_cache_experiment import PolicyCacheExperiment
 from experiments.policy_size_experiment import PolicySizeExperiment
+from experiments.public_key_scheme_experiment import PublicKeySchemeExperiment
+from experiments.revocation_index_experiment import RevocationIndexExperiment
+from experiments.rpc_transport_experiment import RpcTransportExperiment
 from experiments.runner.experiments_runner import ExperimentsRunner
+from experiments.serialization_experiment import SerializationExperiment
+from experiments.serialization_format_experiment import SerializationFormatExperiment
+from experiments.storage_backend_experiment import StorageBackendExperiment
+from experiments.update_keys_experiment import UpdateKeysExperiment
 from experiments.user_key_size_experiment import UserKeySizeExperiment
 
 IS_MOBILE = False
@@ -16,6 +27,17 @@ if __name__ == '__main__':
     user_key_size_experiment = UserKeySizeExperiment()
     authorities_amount_experiment = AuthoritiesAmountExperiment()
     file_size_experiment = FileSizeExperiment()
+    parallel_encryption_experiment = ParallelEncryptionExperiment()
+    public_key_scheme_experiment = PublicKeySchemeExperiment()
+    policy_cache_experiment = PolicyCacheExperiment()
+    fixed_base_precomputation_experiment = FixedBasePrecomputationExperiment()
+    serialization_experiment = SerializationExperiment()
+    serialization_format_experiment = SerializationFormatExperiment()
+    storage_backend_experiment = StorageBackendExperiment()
+    insurance_load_experiment = InsuranceLoadExperiment()
+    rpc_transport_experiment = RpcTransportExperiment()
+    revocation_index_experiment = RevocationIndexExperiment()
+    update_keys_experiment = UpdateKeysExperiment()
 
     if IS_MOBILE:
         base_experiment.run_descriptions = {
@@ -37,3 +59,14 @@ if __name__ == '__main__':
         runner.run_experiment(disjunctive_policy_size_experiment)
         runner.run_experiment(user_key_size_experiment)
         runner.run_experiment(file_size_experiment)
+        runner.run_experiment(parallel_encryption_experiment)
+        runner.run_experiment(public_key_scheme_experiment)
+        runner.run_experiment(policy_cache_experiment)
+        runner.run_experiment(fixed_base_precomputation_experiment)
+        runner.run_experiment(serialization_experiment)
+        runner.run_experiment(serialization_format_experiment)
+        runner.run_experiment(storage_backend_experiment)
+        runner.run_experiment(insurance_load_experiment)
+        runner.run_experiment(rpc_transport_experiment)
+        runner.run_experiment(revocation_index_experiment)
+        runner.run_experiment(update_keys_experiment)
@@ -3,6 +3,7 @@ import os
 from charm.toolbox.pairinggroup import PairingGroup
 from shared.implementations.serializer.base_serializer import BaseSerializer
 from shared.model.global_parameters import GlobalParameters
+from shared.utils.precomputation_util import precompute_fixed_bases
 
 DEFAULT_STORAGE_PATH = 'data/central_authority'
 GLOBAL_PARAMETERS_FILENAME = 'gp.dat'
@@ -48,3 +49,4 @@ class CentralAuthority(object):
         save_file_path = os.path.join(self.storage_path, GLOBAL_PARAMETERS_FILENAME)
         with open(save_file_path, 'rb') as f:
             self.global_parameters = self.serializer.deserialize_global_parameters(f.read())
+        precompute_fixed_bases(self.global_parameters.scheme_parameters)
@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from service.central_authority import CentralAuthority
+from service.insurance_service import InsuranceService, RECORD_CACHE_SIZE
+from service.storage import Storage
+from shared.implementations.public_key.base_public_key import BasePublicKey
+from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.model.records.create_record import CreateRecord
+from shared.model.records.data_record import DataRecord
+from shared.model.records.policy_update_record import PolicyUpdateRecord
+from shared.model.records.update_record import UpdateRecord
+
+
+class ConcurrentInsuranceService(InsuranceService):
+    """
+    Insurance service handling requests concurrently. Requests submitted using the submit_* methods are handled by a
+    pool of worker threads, which perform the storage I/O. Requests on the same location are serialized by a lock per
+    location, while requests on different locations proceed in parallel. Loads only take the lock of the location
+    when the meta of the record is not cached.
+
+    Signature verification can be moved to a separate executor, like a process pool, so verifications are not limited
+    by the global interpreter lock. The public keys and signatures are then pickled to the worker processes.
+    """
+
+    def __init__(self, serializer: BaseSerializer, central_authority: CentralAuthority,
+                 public_key_scheme: BasePublicKey, storage_path: str = None, storage: Storage = None,
+                 record_cache_size: int = RECORD_CACHE_SIZE, workers: int = 4,
+                 verify_executor: Executor = None) -> None:
+        """
+        :param workers: The amount of worker threads handling the requests
+        :param verify_executor: The executor to verify signatures with. When None, signatures are verified on the
+        worker thread handling the request.
+        """
+        super().__init__(serializer, central_authority, public_key_scheme, storage_path=storage_path,
+                         storage=storage, record_cache_size=record_cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.verify_executor = verify_executor
+        self._cache_lock = threading.Lock()
+        self._location_locks_lock = threading.Lock()
+        self._location_locks = dict()  # type: Dict[str, List[Any]]
+
+    def close(self) -> None:
+        """
+        Wait for the pending requests and shut down the worker pool.
+        """
+        self.executor.shutdown()
+
+    @contextmanager
+    def location_lock(self, location: str):
+        """
+        Context manager holding the lock of a location. Locks are removed when no thread holds or waits for them,
+        so the amount of locks is bounded by the amount of concurrent requests.
+        :param location: The location to lock
+        """
+        with self._location_locks_lock:
+            entry = self._location_locks.get(location)
+            if entry is None:
+                # Reentrant, as updates load the current record while holding the lock
+                entry = [threading.RLock(), 0]
+                self._location_locks[location] = entry
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._location_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._location_locks[location]
+
+    def create(self, create_record: CreateRecord) -> str:
+        location = InsuranceService.determine_record_location(create_record)
+        with self.location_lock(location):
+            return super().create(create_record)
+
+    def update(self, location: str, update_record: UpdateRecord):
+        with self.location_lock(location):
+            super().update(location, update_record)
+
+    def policy_update(self, location: str, policy_update_record: PolicyUpdateRecord):
+        with self.location_lock(location):
+            super().policy_update(location, policy_update_record)
+
+    def _load_record_meta(self, location: str) -> DataRecord:
+        # Fill the cache under the lock of the location. Otherwise, a load could read the meta from the storage before
+        # a concurrent update, and cache it after the update, after which the next update stores the stale meta.
+        with self.location_lock(location):
+            return super()._load_record_meta(location)
+
+    def verify(self, public_key: Any, signature: bytes, data: bytes) -> bool:
+        if self.verify_executor is None:
+            return super().verify(public_key, signature, data)
+        return self.verify_executor.submit(self.public_key_scheme.verify, public_key, signature, data).result()
+
+    def _cached_record_meta(self, location: str) -> DataRecord:
+        with self._cache_lock:
+            return super()._cached_record_meta(location)
+
+    def _cache_record_meta(self, location: str, record: DataRecord) -> None:
+        with self._cache_lock:
+            super()._cache_record_meta(location, record)
+
+    def invalidate_record_cache(self, location: str = None) -> None:
+        with self._cache_lock:
+            super().invalidate_record_cache(location)
+
+    def submit_create(self, create_record: CreateRecord) -> Future:
+        """
+        Handle a create request on a worker.
+        :return: A future resolving to the location of the record
+        """
+        return self.executor.submit(self.create, create_record)
+
+    def submit_update(self, location: str, update_record: UpdateRecord) -> Future:
+        """
+        Handle an update request on a worker.
+        :return: A future resolving when the update is stored
+        """
+        return self.executor.submit(self.update, location, update_record)
+
+    def submit_policy_update(self, location: str, policy_update_record: PolicyUpdateRecord) -> Future:
+        """
+        Handle a policy update request on a worker.
+        :return: A future resolving when the update is stored
+        """
+        return self.executor.submit(self.policy_update, location, policy_update_record)
+
+    def submit_load(self, location: str) -> Future:
+        """
+        Handle a load request on a worker.
+        :return: A future resolving to the record
+        """
+        return self.executor.submit(self.load, location)
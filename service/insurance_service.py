@@ -1,5 +1,7 @@
+import copy
 import pickle
-from typing import Dict
+from collections import OrderedDict
+from typing import Any, Dict
 
 from Crypto.Hash import SHA
 
@@ -13,6 +15,9 @@ from shared.model.records.data_record import DataRecord
 from shared.model.records.policy_update_record import PolicyUpdateRecord
 from shared.model.records.update_record import UpdateRecord
 
+RECORD_CACHE_SIZE = 128
+"""The default maximum amount of deserialized record metas kept in memory by the insurance service."""
+
 
 class InsuranceService(object):
     """
@@ -21,11 +26,22 @@ class InsuranceService(object):
     """
 
     def __init__(self, serializer: BaseSerializer, central_authority: CentralAuthority,
-                 public_key_scheme: BasePublicKey, storage_path: str = None) -> None:
+                 public_key_scheme: BasePublicKey, storage_path: str = None, storage: Storage = None,
+                 record_cache_size: int = RECORD_CACHE_SIZE) -> None:
+        """
+        :param storage_path: The path of the directory to store the records in, when no storage is given.
+        :param storage: The storage backend to store the records in. Defaults to a Storage in the storage_path.
+        :param record_cache_size: The maximum amount of deserialized record metas to keep in memory. The data of the
+        records is never cached. 0 disables the cache.
+        """
         self.central_authority = central_authority
-        self.storage = Storage(serializer, storage_path)
+        self.storage = Storage(serializer, storage_path) if storage is None else storage
         self.public_key_scheme = public_key_scheme
         self.authorities = dict()  # type: Dict[str, AttributeAuthority]
+        self.record_cache_size = record_cache_size
+        self._record_cache = OrderedDict()  # type: OrderedDict
+        self.record_cache_hits = 0
+        self.record_cache_misses = 0
 
     @property
     def global_parameters(self):
@@ -48,6 +64,7 @@ class InsuranceService(object):
 
         location = InsuranceService.determine_record_location(create_record)
         self.storage.store(location, create_record)
+        self.invalidate_record_cache(location)
         return location
 
     def update(self, location: str, update_record: UpdateRecord):
@@ -58,10 +75,10 @@ class InsuranceService(object):
         """
         current_record = self.load(location)
         assert current_record is not None, 'Only existing records can be updated'
-        assert self.public_key_scheme.verify(current_record.write_public_key, update_record.signature,
-                                             update_record.data), 'Signature should be valid'
+        assert self.verify(current_record.write_public_key, update_record.signature, update_record.data), 'Signature should be valid'
         current_record.update(update_record)
         self.storage.store(location, current_record)
+        self._cache_record_meta(location, current_record)
 
     def policy_update(self, location: str, policy_update_record: PolicyUpdateRecord):
         """
@@ -71,12 +88,28 @@ class InsuranceService(object):
         """
         current_record = self.load(location)
         assert current_record is not None, 'Only existing records can be updated'
-        assert self.public_key_scheme.verify(current_record.owner_public_key, policy_update_record.signature,
-                                             pickle.dumps((policy_update_record.read_policy,
-                                                           policy_update_record.write_policy,
-                                                           policy_update_record.time_period))), 'Signature should be valid'
+        assert self.verify(current_record.owner_public_key, policy_update_record.signature,
+                           pickle.dumps((policy_update_record.read_policy,
+                                         policy_update_record.write_policy,
+                                         policy_update_record.time_period,
+                                         policy_update_record.wrapped_data_key))), 'Signature should be valid'
         current_record.update_policy(policy_update_record)
-        self.storage.store(location, current_record)
+        if policy_update_record.data is None:
+            # Only the keys are updated, so the data file is left untouched
+            self.storage.store_meta(location, current_record)
+        else:
+            self.storage.store(location, current_record)
+        self._cache_record_meta(location, current_record)
+
+    def verify(self, public_key: Any, signature: bytes, data: bytes) -> bool:
+        """
+        Verify the signature of a request.
+        :param public_key: The public key to verify the signature with
+        :param signature: The signature
+        :param data: The signed data
+        :return: Whether the signature is valid
+        """
+        return self.public_key_scheme.verify(public_key, signature, data)
 
     @staticmethod
     def determine_record_location(record: DataRecord) -> str:
@@ -89,4 +122,65 @@ class InsuranceService(object):
         return SHA.new(record.info).hexdigest()
 
     def load(self, location: str) -> DataRecord:
-        return self.storage.load(location)
+        """
+        Load the data record on the given location. The meta of the record is taken from the cache if possible,
+        the data is always a fresh view on the storage.
+        :param location: The location of the record
+        :return: The record, which can be modified without affecting the cache
+        """
+        meta = self._cached_record_meta(location)
+        if meta is None:
+            meta = self._load_record_meta(location)
+        # Also copied on a miss, as the cached meta of a LazyDataRecord decodes its fields through the loaded meta
+        record = copy.copy(meta)
+        record.data = self.storage.load_data(location)
+        return record
+
+    def _load_record_meta(self, location: str) -> DataRecord:
+        """
+        Load the meta of a record from the storage, and put it in the cache.
+        :param location: The location of the record
+        :return: The record, without data, which should not be modified
+        """
+        record = self.storage.load_meta(location)
+        self._cache_record_meta(location, record)
+        return record
+
+    def _cached_record_meta(self, location: str) -> DataRecord:
+        """
+        Get the meta of a record from the cache, and count the hit or miss.
+        :param location: The location of the record
+        :return: The cached meta, which should not be modified, or None
+        """
+        meta = self._record_cache.get(location) if self.record_cache_size > 0 else None
+        if meta is not None:
+            self._record_cache.move_to_end(location)
+            self.record_cache_hits += 1
+        else:
+            self.record_cache_misses += 1
+        return meta
+
+    def _cache_record_meta(self, location: str, record: DataRecord) -> None:
+        """
+        Put the meta of the record in the cache, evicting the least recently used records when the cache is full.
+        :param location: The location of the record
+        :param record: The record, which is copied without its data
+        """
+        if self.record_cache_size <= 0:
+            return
+        meta = copy.copy(record)
+        meta.data = None
+        self._record_cache[location] = meta
+        self._record_cache.move_to_end(location)
+        while len(self._record_cache) > self.record_cache_size:
+            self._record_cache.popitem(last=False)
+
+    def invalidate_record_cache(self, location: str = None) -> None:
+        """
+        Remove a record from the cache.
+        :param location: The location of the record, or None to clear the whole cache
+        """
+        if location is None:
+            self._record_cache.clear()
+        else:
+            self._record_cache.pop(location, None)
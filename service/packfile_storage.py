@@ -0,0 +1,322 @@
+import os
+import re
+import threading
+import weakref
+from collections import namedtuple
+from os import path
+from struct import pack, unpack, calcsize
+from typing import Any, Dict, Iterator, List, Tuple
+
+from service.storage import Storage
+from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.model.records.data_record import DataRecord
+from shared.utils.data_util import iterate_chunks, FileChunks
+
+PACKFILE_NAME = 'pack-%08d.pack'
+PACKFILE_PATTERN = re.compile(r'^pack-(\d{8})\.pack$')
+ENTRY_MAGIC = b'PKR1'
+ENTRY_HEADER_FORMAT = '>4sBHIQ'
+"""Header of each entry: magic, flags, location length, meta length, data length."""
+ENTRY_HEADER_SIZE = calcsize(ENTRY_HEADER_FORMAT)
+FLAG_META = 1
+FLAG_DATA = 2
+FLAG_COMMITTED = 4
+
+MAX_PACKFILE_SIZE = 256 * 1024 * 1024
+"""Size after which a new packfile is started."""
+COMPACTION_THRESHOLD = 0.5
+"""Packfiles of which less than this fraction is live are compacted."""
+
+Region = namedtuple('Region', ['pack_id', 'offset', 'length'])
+"""A range of bytes in a packfile."""
+
+
+class PackfileStorage(Storage):
+    """
+    Log-structured storage, which appends each version of a record to a packfile instead of rewriting the files of
+    the record. An in-memory index maps each location to the regions of the live meta and data. The index is rebuilt
+    on start by scanning the entry headers of the packfiles, without reading their content.
+
+    Each entry is committed atomically: the entry is appended with an uncommitted header, synced to disk, after which
+    the header is marked as committed and synced again. Uncommitted entries at the end of a packfile, for example
+    after a crash during a write, are discarded when the storage is opened.
+
+    Versions which are replaced leave dead bytes in the packfiles. The compactor copies the live entries of packfiles
+    which are mostly dead to the active packfile, after which the old packfile is removed. Removal is deferred until
+    the next compaction in which no data loaded from the packfile (see PackfileChunks) is referenced anymore, so
+    records loaded before the compaction can still be read. The compactor can run in a background thread, see
+    start_compactor.
+    """
+
+    def __init__(self, serializer: BaseSerializer, storage_path: str = None, max_packfile_size: int = MAX_PACKFILE_SIZE,
+                 sync: bool = True) -> None:
+        """
+        :param max_packfile_size: The size after which a new packfile is started
+        :param sync: Whether to sync each entry to disk before committing it. When disabled, entries are only
+        committed in order, and can be lost on a crash.
+        """
+        super().__init__(serializer, storage_path)
+        self.max_packfile_size = max_packfile_size
+        self.sync = sync
+        self._lock = threading.RLock()
+        self._index = dict()  # type: Dict[str, Tuple[Region, Region]]
+        self._live_sizes = dict()  # type: Dict[int, int]
+        self._retired = list()  # type: List[int]
+        self._views = dict()  # type: Dict[int, int]
+        self._compactor = None  # type: threading.Thread
+        self._compactor_stop = threading.Event()
+        self._active_id = None  # type: int
+        self._active_file = None  # type: Any
+        self._active_size = 0
+
+        pack_ids = sorted(int(match.group(1)) for match in
+                          (PACKFILE_PATTERN.match(file) for file in os.listdir(self.storage_path)) if match)
+        for pack_id in pack_ids:
+            self._scan(pack_id)
+        self._open_active(pack_ids[-1] if len(pack_ids) > 0 else 0)
+
+    def close(self) -> None:
+        # Stop the compactor and close the active packfile
+        self.stop_compactor()
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+
+    def pack_path(self, pack_id: int) -> str:
+        return path.join(self.storage_path, PACKFILE_NAME % pack_id)
+
+    def _scan(self, pack_id: int) -> None:
+        """
+        Add the committed entries of a packfile to the index. Uncommitted entries at the end are truncated.
+        """
+        file_path = self.pack_path(pack_id)
+        size = path.getsize(file_path)
+        self._live_sizes[pack_id] = 0
+        with open(file_path, 'r+b') as f:
+            offset = 0
+            while offset + ENTRY_HEADER_SIZE <= size:
+                f.seek(offset)
+                magic, flags, location_length, meta_length, data_length = \
+                    unpack(ENTRY_HEADER_FORMAT, f.read(ENTRY_HEADER_SIZE))
+                end = offset + ENTRY_HEADER_SIZE + location_length + meta_length + data_length
+                if magic != ENTRY_MAGIC or not flags & FLAG_COMMITTED or end > size:
+                    break
+                location = f.read(location_length).decode('utf-8')
+                content_offset = offset + ENTRY_HEADER_SIZE + location_length
+                self._set_regions(
+                    location,
+                    Region(pack_id, content_offset, meta_length) if flags & FLAG_META else None,
+                    Region(pack_id, content_offset + meta_length, data_length) if flags & FLAG_DATA else None)
+                offset = end
+            if offset < size:
+                f.truncate(offset)
+
+    def _open_active(self, pack_id: int) -> None:
+        if self._active_file is not None:
+            self._active_file.close()
+        self._active_id = pack_id
+        # Not opened in append mode, as the header of each entry is rewritten to commit it
+        self._active_file = os.fdopen(os.open(self.pack_path(pack_id), os.O_RDWR | os.O_CREAT), 'r+b')
+        self._active_size = self._active_file.seek(0, os.SEEK_END)
+        self._live_sizes.setdefault(pack_id, 0)
+
+    def _set_regions(self, location: str, meta: Region, data: Region) -> None:
+        """
+        Point the index entry of the location to the given regions. None leaves the current region in place.
+        """
+        current_meta, current_data = self._index.get(location, (None, None))
+        for current, new in ((current_meta, meta), (current_data, data)):
+            if new is not None:
+                if current is not None:
+                    self._live_sizes[current.pack_id] -= current.length
+                self._live_sizes[new.pack_id] = self._live_sizes.get(new.pack_id, 0) + new.length
+        self._index[location] = (meta if meta is not None else current_meta,
+                                 data if data is not None else current_data)
+
+    def _append(self, location: str, meta: bytes = None, data: Any = None) -> None:
+        """
+        Append an entry to the active packfile and commit it.
+        :param location: The location of the record
+        :param meta: The serialized meta, or None to keep the current meta
+        :param data: The data, see shared.utils.data_util.iterate_chunks, or None to keep the current data
+        """
+        with self._lock:
+            if self._active_size >= self.max_packfile_size:
+                self._open_active(self._active_id + 1)
+            f = self._active_file
+            offset = self._active_size
+            flags = (FLAG_META if meta is not None else 0) | (FLAG_DATA if data is not None else 0)
+            location_bytes = location.encode('utf-8')
+            meta = b'' if meta is None else meta
+
+            # Append the uncommitted entry, the data length is only known after writing the data
+            f.seek(offset)
+            f.write(pack(ENTRY_HEADER_FORMAT, ENTRY_MAGIC, flags, len(location_bytes), len(meta), 0))
+            f.write(location_bytes)
+            f.write(meta)
+            data_length = 0
+            if data is not None:
+                for chunk in iterate_chunks(data):
+                    f.write(chunk)
+                    data_length += len(chunk)
+            self._flush()
+
+            # Commit the entry by rewriting its header
+            f.seek(offset)
+            f.write(pack(ENTRY_HEADER_FORMAT, ENTRY_MAGIC, flags | FLAG_COMMITTED, len(location_bytes), len(meta),
+                         data_length))
+            self._flush()
+
+            content_offset = offset + ENTRY_HEADER_SIZE + len(location_bytes)
+            self._active_size = content_offset + len(meta) + data_length
+            self._set_regions(location,
+                              Region(self._active_id, content_offset, len(meta)) if flags & FLAG_META else None,
+                              Region(self._active_id, content_offset + len(meta), data_length)
+                              if flags & FLAG_DATA else None)
+
+    def _flush(self) -> None:
+        self._active_file.flush()
+        if self.sync:
+            os.fsync(self._active_file.fileno())
+
+    def store(self, name: str, record: DataRecord) -> None:
+        # The data might be streamed from the current version, which stays in place until compaction
+        self._append(name, self.serializer.serialize_data_record_meta(record), record.data)
+
+    def store_meta(self, name: str, record: DataRecord) -> None:
+        self._append(name, meta=self.serializer.serialize_data_record_meta(record))
+
+    def store_data(self, name: str, data: Any) -> None:
+        self._append(name, data=data)
+
+    def load_meta(self, name: str) -> DataRecord:
+        with self._lock:
+            meta, _ = self._index[name]
+            if meta is None:
+                # Only the data is stored, for example after a crash between storing the data and the meta
+                raise KeyError('No meta stored for %s' % name)
+            # Opened while locked, so the packfile is not removed by a compaction in between
+            f = open(self.pack_path(meta.pack_id), 'rb')
+        with f:
+            f.seek(meta.offset)
+            return self.serializer.deserialize_data_record_meta(f.read(meta.length), lazy=True)
+
+    def load_data(self, name: str) -> FileChunks:
+        with self._lock:
+            _, data = self._index[name]
+            if data is None:
+                return None
+            return PackfileChunks(self, data)
+
+    def _acquire_view(self, pack_id: int) -> None:
+        with self._lock:
+            self._views[pack_id] = self._views.get(pack_id, 0) + 1
+
+    def _release_view(self, pack_id: int) -> None:
+        with self._lock:
+            self._views[pack_id] -= 1
+            if self._views[pack_id] == 0:
+                del self._views[pack_id]
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self._index
+
+    def locations(self) -> Iterator[str]:
+        with self._lock:
+            locations = list(self._index.keys())
+        for location in locations:
+            yield location
+
+    def storage_space(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            result = list()  # type: List[Tuple[str, int]]
+            for location, (meta, data) in self._index.items():
+                result.append(('%s.meta' % location, meta.length if meta is not None else 0))
+                result.append(('%s.dat' % location, data.length if data is not None else 0))
+            # Headers and dead versions
+            total_size = sum(path.getsize(self.pack_path(pack_id)) for pack_id in self._live_sizes)
+            result.append(('packfiles.overhead', total_size - sum(self._live_sizes.values())))
+            return result
+
+    def dead_fraction(self, pack_id: int) -> float:
+        """
+        Get the fraction of the packfile which is not live.
+        :param pack_id: The id of the packfile
+        :return: The dead fraction, between 0 and 1
+        """
+        size = path.getsize(self.pack_path(pack_id))
+        return 1 - self._live_sizes[pack_id] / size if size > 0 else 0
+
+    def compact(self) -> int:
+        """
+        Compact the packfiles (except the active one) of which less than COMPACTION_THRESHOLD is live, by copying
+        the live versions of their records to the active packfile. Packfiles compacted in a previous run are removed,
+        unless data loaded from them is still referenced.
+        :return: The amount of packfiles compacted
+        """
+        with self._lock:
+            for pack_id in self._retired:
+                if pack_id not in self._views:
+                    os.remove(self.pack_path(pack_id))
+            self._retired = [pack_id for pack_id in self._retired if pack_id in self._views]
+            pack_ids = [pack_id for pack_id in self._live_sizes
+                        if pack_id != self._active_id and self.dead_fraction(pack_id) > 1 - COMPACTION_THRESHOLD]
+
+        for pack_id in pack_ids:
+            with self._lock:
+                locations = [location for location, regions in self._index.items()
+                             if any(region is not None and region.pack_id == pack_id for region in regions)]
+            for location in locations:
+                # Each record is copied separately, so writers are only blocked for a single copy
+                with self._lock:
+                    meta, data = self._index[location]
+                    meta_bytes = None
+                    if meta is not None:
+                        with open(self.pack_path(meta.pack_id), 'rb') as f:
+                            f.seek(meta.offset)
+                            meta_bytes = f.read(meta.length)
+                    self._append(location, meta_bytes, None if data is None else
+                                 FileChunks(self.pack_path(data.pack_id), offset=data.offset, length=data.length))
+            with self._lock:
+                del self._live_sizes[pack_id]
+                self._retired.append(pack_id)
+        return len(pack_ids)
+
+    def start_compactor(self, interval: float = 60) -> None:
+        """
+        Start compacting the packfiles periodically in a background thread.
+        :param interval: The amount of seconds between compactions
+        """
+        if self._compactor is not None:
+            return
+        self._compactor_stop.clear()
+
+        def run():
+            while not self._compactor_stop.wait(interval):
+                self.compact()
+
+        self._compactor = threading.Thread(target=run, name='packfile-compactor', daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self) -> None:
+        """
+        Stop the background compactor, if it is running.
+        """
+        if self._compactor is not None:
+            self._compactor_stop.set()
+            self._compactor.join()
+            self._compactor = None
+
+
+class PackfileChunks(FileChunks):
+    """
+    Chunked view on the data of a record in a packfile. The packfile is not removed by the compactor as long as the
+    view is referenced, so the view can be iterated after the record is compacted.
+    """
+
+    def __init__(self, storage: PackfileStorage, region: Region) -> None:
+        super().__init__(storage.pack_path(region.pack_id), offset=region.offset, length=region.length)
+        storage._acquire_view(region.pack_id)
+        weakref.finalize(self, storage._release_view, region.pack_id)
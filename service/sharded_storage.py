@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import threading
+from os import path
+from typing import Any, Iterator, List, Tuple
+
+from service.storage import Storage
+from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.model.records.data_record import DataRecord
+
+INDEX_FILENAME = 'index.sqlite'
+SHARD_LEVELS = 2
+"""The amount of directory levels records are spread over."""
+SHARD_WIDTH = 2
+"""The amount of characters of the location used for the directory name on each level."""
+
+
+def shard_directory(location: str) -> str:
+    """
+    Get the directory, relative to the storage directory, in which the record on the given location is stored.
+    :param location: The location of the data record
+    :return: The relative path of the directory
+
+    >>> shard_directory('abcdef')
+    'ab/cd'
+    """
+    parts = [location[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH] for level in range(SHARD_LEVELS)]
+    return path.join(*[part for part in parts if part])
+
+
+class ShardedStorage(Storage):
+    """
+    Storage which spreads the records over subdirectories, based on a prefix of their (hash) location. For example,
+    the record on location 'abcdef' is stored in 'ab/cd/abcdef.meta' and 'ab/cd/abcdef.dat'. This keeps the
+    directories small, regardless of the amount of records.
+
+    A persistent index (an sqlite database in the storage directory) records the location, policies, time period
+    and file sizes of each record. Existence checks, listings and size accounting are answered from the index,
+    so the directories are never listed.
+    """
+
+    def __init__(self, serializer: BaseSerializer, storage_path: str = None) -> None:
+        super().__init__(serializer, storage_path)
+        self.index_path = path.join(self.storage_path, INDEX_FILENAME)
+        self._index_lock = threading.Lock()
+        self._index = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._index.execute('PRAGMA journal_mode=WAL')
+        self._index.execute('PRAGMA synchronous=NORMAL')
+        self._index.execute('CREATE TABLE IF NOT EXISTS records ('
+                            'location TEXT PRIMARY KEY, '
+                            'read_policy TEXT, '
+                            'write_policy TEXT, '
+                            'time_period INTEGER, '
+                            'meta_size INTEGER NOT NULL DEFAULT 0, '
+                            'data_size INTEGER NOT NULL DEFAULT 0)')
+        self._index.commit()
+
+    def close(self) -> None:
+        """
+        Close the index.
+        """
+        self._index.close()
+
+    def store_meta(self, name: str, record: DataRecord) -> None:
+        os.makedirs(path.join(self.storage_path, shard_directory(name)), exist_ok=True)
+        super().store_meta(name, record)
+        self._update_index(name,
+                           'UPDATE records SET read_policy = ?, write_policy = ?, time_period = ?, meta_size = ? '
+                           'WHERE location = ?',
+                           (record.read_policy, record.write_policy, record.time_period,
+                            path.getsize(self.file_path(name, 'meta')), name))
+
+    def store_data(self, name: str, data: Any) -> None:
+        os.makedirs(path.join(self.storage_path, shard_directory(name)), exist_ok=True)
+        super().store_data(name, data)
+        self._update_index(name, 'UPDATE records SET data_size = ? WHERE location = ?',
+                           (path.getsize(self.file_path(name, 'dat')), name))
+
+    def _update_index(self, name: str, statement: str, parameters: tuple) -> None:
+        """
+        Update the index entry of a record, creating the entry first if it does not exist. Both happen in a single
+        transaction. Upserts (ON CONFLICT) are not used, as they require sqlite 3.24.
+        :param name: The location of the data record
+        :param statement: The update statement
+        :param parameters: The parameters of the update statement
+        """
+        with self._index_lock:
+            with self._index:
+                self._index.execute('INSERT OR IGNORE INTO records (location) VALUES (?)', (name,))
+                self._index.execute(statement, parameters)
+
+    def _query_index(self, statement: str, parameters: tuple = ()) -> List[tuple]:
+        with self._index_lock:
+            return self._index.execute(statement, parameters).fetchall()
+
+    def exists(self, name: str) -> bool:
+        return len(self._query_index('SELECT 1 FROM records WHERE location = ?', (name,))) > 0
+
+    def locations(self) -> Iterator[str]:
+        for location, in self._query_index('SELECT location FROM records ORDER BY location'):
+            yield location
+
+    def index_entry(self, name: str) -> dict:
+        """
+        Get the index entry of the record on the given location.
+        :param name: The location of the data record
+        :return: A dict with the read_policy, write_policy, time_period, meta_size and data_size of the record,
+        or None when the record does not exist
+        """
+        rows = self._query_index('SELECT read_policy, write_policy, time_period, meta_size, data_size '
+                                 'FROM records WHERE location = ?', (name,))
+        if len(rows) == 0:
+            return None
+        return dict(zip(('read_policy', 'write_policy', 'time_period', 'meta_size', 'data_size'), rows[0]))
+
+    def storage_space(self) -> List[Tuple[str, int]]:
+        result = list()  # type: List[Tuple[str, int]]
+        for location, meta_size, data_size in self._query_index('SELECT location, meta_size, data_size FROM records'):
+            result.append(('%s.meta' % location, meta_size))
+            result.append(('%s.dat' % location, data_size))
+        result.append((INDEX_FILENAME, path.getsize(self.index_path)))
+        return result
+
+    def file_path(self, name: str, extension: str) -> str:
+        return path.join(self.storage_path, shard_directory(name), '%s.%s' % (name, extension))
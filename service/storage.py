@@ -1,8 +1,10 @@
 import os
 from os import path
+from typing import Any, Iterator, List, Tuple
 
 from shared.implementations.serializer.base_serializer import BaseSerializer
 from shared.model.records.data_record import DataRecord
+from shared.utils.data_util import iterate_chunks, FileChunks
 
 STORAGE_DATA_DIRECTORY = 'data/storage'
 
@@ -14,31 +16,106 @@ class Storage(object):
         if not os.path.exists(self.storage_path):
             os.makedirs(self.storage_path)
 
+    def close(self) -> None:
+        """
+        Release the resources held by this storage.
+        """
+        pass
+
     def store(self, name: str, record: DataRecord) -> None:
         """
-        Store the data record.
+        Store the data record. The data of the record is written in chunks, so it can be a stream of
+        data instead of a bytes object.
         :param name: The location of the data record
         :param record: The record to store
         """
-        f = open(path.join(self.storage_path, '%s.meta' % name), 'wb')
-        f.write(self.serializer.serialize_data_record_meta(record))
-        f.close()
+        self.store_meta(name, record)
+        self.store_data(name, record.data)
 
-        f = open(path.join(self.storage_path, '%s.dat' % name), 'wb')
-        f.write(record.data)
-        f.close()
+    def store_data(self, name: str, data: Any) -> None:
+        """
+        Store only the data of a data record.
+        :param name: The location of the data record
+        :param data: The data to store, see shared.utils.data_util.iterate_chunks
+        """
+        # Write to a temporary file first, as the data might be streamed from the file which is overwritten
+        data_path = self.file_path(name, 'dat')
+        with open(data_path + '.tmp', 'wb') as f:
+            for chunk in iterate_chunks(data):
+                f.write(chunk)
+        os.replace(data_path + '.tmp', data_path)
+
+    def store_meta(self, name: str, record: DataRecord) -> None:
+        """
+        Store only the meta of the data record, leaving the stored data untouched.
+        :param name: The location of the data record
+        :param record: The record to store the meta of
+        """
+        meta_path = self.file_path(name, 'meta')
+        with open(meta_path + '.tmp', 'wb') as f:
+            f.write(self.serializer.serialize_data_record_meta(record))
+        os.replace(meta_path + '.tmp', meta_path)
 
     def load(self, name: str) -> DataRecord:
         """
-        Load a data record from storage.
+        Load a data record from storage. The data of the record is not read into memory, but is
+        a chunked view on the stored data file. The keys in the meta are deserialized when they are first used.
         :param name: The location of the data record
         :return: The loaded data record
         """
-        f = open(path.join(self.storage_path, '%s.meta' % name), 'rb')
-        result = self.serializer.deserialize_data_record_meta(f.read())
-        f.close()
+        result = self.load_meta(name)
+        result.data = self.load_data(name)
+        return result
 
-        f = open(path.join(self.storage_path, '%s.dat' % name), 'rb')
-        result.data = f.read()
+    def load_meta(self, name: str) -> DataRecord:
+        """
+        Load only the meta of a data record. The data of the returned record is None.
+        :param name: The location of the data record
+        :return: The loaded data record
+        """
+        f = open(self.file_path(name, 'meta'), 'rb')
+        result = self.serializer.deserialize_data_record_meta(f.read(), lazy=True)
         f.close()
         return result
+
+    def load_data(self, name: str) -> FileChunks:
+        """
+        Get a chunked view on the stored data of a data record.
+        :param name: The location of the data record
+        :return: The view on the data
+        """
+        return FileChunks(self.file_path(name, 'dat'))
+
+    def exists(self, name: str) -> bool:
+        """
+        Check whether a data record is stored on the given location.
+        :param name: The location of the data record
+        :return: True if the record exists
+        """
+        return path.exists(self.file_path(name, 'meta'))
+
+    def locations(self) -> Iterator[str]:
+        """
+        List the locations of all stored data records.
+        :return: A generator yielding the locations
+        """
+        for file in os.listdir(self.storage_path):
+            name, extension = path.splitext(file)
+            if extension == '.meta':
+                yield name
+
+    def storage_space(self) -> List[Tuple[str, int]]:
+        """
+        Get the sizes of all stored files.
+        :return: A list of tuples of file name and size
+        """
+        return [(file, path.getsize(path.join(self.storage_path, file))) for file in os.listdir(self.storage_path)]
+
+    def file_path(self, name: str, extension: str) -> str:
+        """
+        Get the path of a file of a data record.
+        :param name: The location of the data record
+        :param extension: The extension of the file, either 'meta' or 'dat'
+        :return: The path of the file
+        """
+        return path.join(self.storage_path, '%s.%s' % (name, extension))
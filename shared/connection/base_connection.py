@@ -10,6 +10,12 @@ class BaseConnection(object):
         self.identifier = identifier
         self.benchmarks = dict()  # type: Dict[str, List[int]]
 
+    def close(self) -> None:
+        """
+        Release the resources of the connection. In-process connections have nothing to release.
+        """
+        pass
+
     def dumps(self):
         return json.dumps(self.benchmarks)
 
@@ -0,0 +1,291 @@
+import hashlib
+import hmac
+import os
+import socket
+import socketserver
+import threading
+from queue import LifoQueue, Empty
+from struct import pack, unpack, calcsize
+from typing import Any, Tuple, Union
+
+from shared.exception.remote_call_exception import RemoteCallException
+from shared.implementations.serializer.base_serializer import BaseSerializer
+
+FRAME_HEADER_FORMAT = '>I'
+"""Each message is prefixed with its length."""
+FRAME_HEADER_SIZE = calcsize(FRAME_HEADER_FORMAT)
+
+Address = Union[Tuple[str, int], str]
+"""A TCP address (host and port) or the path of a Unix socket."""
+
+CHALLENGE_SIZE = 32
+"""The size of the random challenge each side of a connection sends, see deliver_challenge."""
+CHALLENGE_DIGEST = hashlib.sha256
+CHALLENGE_RESPONSE_SIZE = CHALLENGE_DIGEST().digest_size
+
+
+def send_frame(connection: socket.socket, payload: bytes) -> int:
+    """
+    Send a message, prefixed with its length.
+    :param connection: The socket to send the message over
+    :param payload: The message
+    :return: The amount of bytes sent, including the length prefix
+    """
+    connection.sendall(pack(FRAME_HEADER_FORMAT, len(payload)) + payload)
+    return FRAME_HEADER_SIZE + len(payload)
+
+
+def receive_frame(connection: socket.socket) -> bytes:
+    """
+    Receive a message sent with send_frame.
+    :param connection: The socket to receive the message from
+    :return: The message, or None when the connection was closed before a new message started
+    """
+    header = _receive_exactly(connection, FRAME_HEADER_SIZE)
+    if header is None:
+        return None
+    length, = unpack(FRAME_HEADER_FORMAT, header)
+    payload = _receive_exactly(connection, length)
+    if payload is None:
+        raise ConnectionError('Connection closed during a message')
+    return payload
+
+
+def _receive_exactly(connection: socket.socket, length: int) -> bytes:
+    buffer = bytearray(length)
+    view = memoryview(buffer)
+    received = 0
+    while received < length:
+        amount = connection.recv_into(view[received:])
+        if amount == 0:
+            if received == 0:
+                return None
+            raise ConnectionError('Connection closed during a message')
+        received += amount
+    return bytes(buffer)
+
+
+def _receive_fixed_frame(connection: socket.socket, length: int) -> bytes:
+    """
+    Receive a message of a known length sent with send_frame, without trusting the length prefix.
+    :return: The message, or None when the connection was closed or the message has a different length
+    """
+    header = _receive_exactly(connection, FRAME_HEADER_SIZE)
+    if header is None or unpack(FRAME_HEADER_FORMAT, header)[0] != length:
+        return None
+    return _receive_exactly(connection, length)
+
+
+def deliver_challenge(connection: socket.socket, authkey: bytes) -> bool:
+    """
+    Check that the other side of the connection knows the shared secret, by sending a random challenge and
+    verifying the HMAC of it (like multiprocessing.connection). Nothing received before is unpickled.
+    :param connection: The socket to authenticate the other side of
+    :param authkey: The shared secret
+    :return: Whether the other side answered the challenge correctly
+    """
+    challenge = os.urandom(CHALLENGE_SIZE)
+    send_frame(connection, challenge)
+    response = _receive_fixed_frame(connection, CHALLENGE_RESPONSE_SIZE)
+    expected = hmac.new(authkey, challenge, CHALLENGE_DIGEST).digest()
+    return response is not None and hmac.compare_digest(response, expected)
+
+
+def answer_challenge(connection: socket.socket, authkey: bytes) -> None:
+    """
+    Answer the challenge sent by deliver_challenge on the other side of the connection.
+    :param connection: The socket to authenticate over
+    :param authkey: The shared secret
+    """
+    challenge = _receive_fixed_frame(connection, CHALLENGE_SIZE)
+    if challenge is None:
+        raise ConnectionError('Connection closed during the authentication')
+    send_frame(connection, hmac.new(authkey, challenge, CHALLENGE_DIGEST).digest())
+
+
+def create_socket(address: Address, authkey: bytes) -> socket.socket:
+    """
+    Create a socket connected to the given address, and authenticate both sides using the shared secret.
+    :param address: A TCP address or the path of a Unix socket
+    :param authkey: The shared secret of the server
+    :raise ConnectionError: When the authentication failed
+    :return: The connected socket
+    """
+    if isinstance(address, str):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        connection.connect(address)
+        answer_challenge(connection, authkey)
+        if not deliver_challenge(connection, authkey):
+            raise ConnectionError('The server could not be authenticated')
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+
+class RpcServer(object):
+    """
+    Server exposing the methods of a handler over a TCP or Unix socket. Each client connection is handled by its own
+    thread, and can be used for any amount of calls. Requests and responses are pickled using the serializer, so
+    each connection first authenticates both sides using a shared secret (the authkey), and only then unpickles
+    anything. Unix sockets are additionally only accessible by the owner.
+
+    A request is a tuple of method name and arguments, a response is a tuple of a success flag and either the
+    result or the error message. Only the methods listed in the rpc_methods attribute of the handler can be called.
+    """
+
+    def __init__(self, handler: Any, serializer: BaseSerializer, address: Address = ('127.0.0.1', 0),
+                 authkey: bytes = None) -> None:
+        """
+        :param handler: The object handling the calls
+        :param serializer: The serializer to pickle the requests and responses with
+        :param address: The address to listen on. Port 0 selects a free port, see the address property.
+        :param authkey: The shared secret clients should know, or None to generate a random one, see the authkey
+        attribute
+        """
+        self.handler = handler
+        self.serializer = serializer
+        self.authkey = os.urandom(CHALLENGE_SIZE) if authkey is None else authkey
+        server = self
+
+        class RequestHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                try:
+                    if not deliver_challenge(self.request, server.authkey):
+                        return
+                    answer_challenge(self.request, server.authkey)
+                except ConnectionError:
+                    return
+                while True:
+                    request = receive_frame(self.request)
+                    if request is None:
+                        return
+                    send_frame(self.request, server.handle_request(request))
+
+        if isinstance(address, str):
+            # Create the socket file without any permissions for others, and restrict it to the owner afterwards
+            umask = os.umask(0o177)
+            try:
+                self._server = socketserver.ThreadingUnixStreamServer(address, RequestHandler)
+            finally:
+                os.umask(umask)
+            os.chmod(address, 0o600)
+        else:
+            self._server = socketserver.ThreadingTCPServer(address, RequestHandler)
+        self._server.daemon_threads = True
+        self._thread = None  # type: threading.Thread
+
+    @property
+    def address(self) -> Address:
+        """
+        The address the server listens on.
+        """
+        return self._server.server_address
+
+    def handle_request(self, request: bytes) -> bytes:
+        """
+        Handle a single request.
+        :param request: The pickled request
+        :return: The pickled response
+        """
+        method, args = self.serializer.loads(request)
+        if method not in self.handler.rpc_methods:
+            return self.serializer.dumps((False, 'Unknown method %s' % method))
+        try:
+            return self.serializer.dumps((True, getattr(self.handler, method)(*args)))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except BaseException as e:
+            # The exceptions of this project derive from BaseException
+            return self.serializer.dumps((False, '%s: %s' % (type(e).__name__, e)))
+
+    def start(self) -> None:
+        """
+        Start serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name='rpc-server', daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """
+        Stop serving and close the listening socket.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class RpcClient(object):
+    """
+    Client calling the methods of an RpcServer. Sockets are kept open and reused for later calls. At most pool_size
+    sockets are opened, concurrent calls beyond that wait for a socket to become available. Each socket is
+    authenticated once, using the authkey of the server.
+    """
+
+    def __init__(self, address: Address, serializer: BaseSerializer, authkey: bytes, pool_size: int = 4) -> None:
+        self.address = address
+        self.serializer = serializer
+        self.authkey = authkey
+        self.pool_size = pool_size
+        self._idle = LifoQueue()  # type: LifoQueue
+        self._available = threading.BoundedSemaphore(pool_size)
+
+    def _acquire(self) -> socket.socket:
+        self._available.acquire()
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        try:
+            return create_socket(self.address, self.authkey)
+        except BaseException:
+            self._available.release()
+            raise
+
+    def _release(self, connection: socket.socket, reuse: bool) -> None:
+        if reuse:
+            self._idle.put(connection)
+        else:
+            connection.close()
+        self._available.release()
+
+    def call(self, method: str, *args: Any) -> Tuple[Any, int, int]:
+        """
+        Call a method on the server.
+        :param method: The name of the method
+        :param args: The arguments, which are pickled using the serializer
+        :raise shared.exception.remote_call_exception.RemoteCallException: When the call failed on the server
+        :return: The result, the amount of bytes sent and the amount of bytes received
+        """
+        connection = self._acquire()
+        try:
+            sent = send_frame(connection, self.serializer.dumps((method, args)))
+            response = receive_frame(connection)
+            if response is None:
+                raise ConnectionError('Connection closed by the server')
+        except BaseException:
+            # The state of the socket is unknown, so it is not reused
+            self._release(connection, False)
+            raise
+        self._release(connection, True)
+        success, result = self.serializer.loads(response)
+        if not success:
+            raise RemoteCallException(result)
+        return result, sent, FRAME_HEADER_SIZE + len(response)
+
+    def close(self) -> None:
+        """
+        Close the idle sockets.
+        """
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except Empty:
+                return
+            connection.close()
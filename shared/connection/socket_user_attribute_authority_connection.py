@@ -0,0 +1,80 @@
+from typing import Any, List
+
+from authority.attribute_authority import AttributeAuthority, KeygenRequest
+from shared.connection.rpc import Address, RpcClient
+from shared.connection.user_attribute_authority_connection import UserAttributeAuthorityConnection
+from shared.implementations.serializer.base_serializer import BaseSerializer
+
+
+class AttributeAuthorityRpcHandler(object):
+    """
+    Handler exposing an AttributeAuthority to an RpcServer. The messages are serialized with the serializer methods
+    also used for the network measurements.
+    """
+    rpc_methods = ['public_keys', 'keygen', 'keygen_batch', 'update_keys']
+
+    def __init__(self, attribute_authority: AttributeAuthority, serializer: BaseSerializer) -> None:
+        self.attribute_authority = attribute_authority
+        self.serializer = serializer
+
+    def public_keys(self, time_period: int) -> bytes:
+        return self.serializer.serialize_authority_public_keys(self.attribute_authority.public_keys(time_period))
+
+    def keygen(self, request: bytes) -> bytes:
+        request = self.serializer.deserialize_keygen_request(request)
+        return self.serializer.serialize_user_secret_keys(
+            self.attribute_authority.keygen(request['gid'], request['registration_data'], request['attributes'],
+                                            request['time_period']))
+
+    def keygen_batch(self, requests: bytes) -> bytes:
+        return self.serializer.serialize_user_secret_keys(
+            self.attribute_authority.keygen_batch(self.serializer.deserialize_keygen_request(requests)))
+
+    def update_keys(self, time_period: int) -> bytes:
+        return self.serializer.serialize_authority_update_keys(self.attribute_authority.update_keys(time_period))
+
+
+class SocketUserAttributeAuthorityConnection(UserAttributeAuthorityConnection):
+    """
+    Connection to an attribute authority served by an RpcServer with an AttributeAuthorityRpcHandler. The benchmarks
+    contain the actual amount of bytes sent and received, including the framing.
+    """
+
+    def __init__(self, address: Address, serializer: BaseSerializer, authkey: bytes, benchmark: bool = False,
+                 identifier: str = None, pool_size: int = 4) -> None:
+        super().__init__(None, serializer, benchmark, identifier)
+        self.client = RpcClient(address, serializer, authkey, pool_size)
+
+    def close(self) -> None:
+        self.client.close()
+
+    def request_public_keys(self, time_period: int) -> Any:
+        response, _, _ = self.client.call('public_keys', time_period)
+        return self.serializer.deserialize_authority_public_keys(response)
+
+    def request_keygen(self, gid: str, registration_data: Any, attributes: list, time_period: int):
+        request = {
+            'gid': gid,
+            'registration_data': registration_data,
+            'attributes': attributes,
+            'time_period': time_period
+        }
+        response, sent, received = self.client.call('keygen', self.serializer.serialize_keygen_request(request))
+        if self.benchmark:
+            self.add_benchmark('Keygen out', sent)
+            self.add_benchmark('Keygen in', received)
+        return self.serializer.deserialize_user_secret_keys(response)
+
+    def request_keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        response, sent, received = self.client.call('keygen_batch', self.serializer.serialize_keygen_request(requests))
+        if self.benchmark:
+            self.add_benchmark('Keygen Batch out', sent)
+            self.add_benchmark('Keygen Batch in', received)
+        return self.serializer.deserialize_user_secret_keys(response)
+
+    def request_update_keys(self, time_period):
+        response, sent, received = self.client.call('update_keys', time_period)
+        if self.benchmark:
+            self.add_benchmark('Update Keys out', sent)
+            self.add_benchmark('Update Keys in', received)
+        return self.serializer.deserialize_authority_update_keys(response)
@@ -0,0 +1,97 @@
+import pickle
+from typing import Any, Dict
+
+from service.insurance_service import InsuranceService
+from shared.connection.rpc import Address, RpcClient
+from shared.connection.user_insurance_connection import UserInsuranceConnection
+from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.model.global_parameters import GlobalParameters
+from shared.model.records.create_record import CreateRecord
+from shared.model.records.data_record import DataRecord
+from shared.model.records.policy_update_record import PolicyUpdateRecord
+from shared.model.records.update_record import UpdateRecord
+
+
+class InsuranceServiceRpcHandler(object):
+    """
+    Handler exposing an InsuranceService to an RpcServer. The messages are serialized with the serializer methods
+    also used for the network measurements.
+    """
+    rpc_methods = ['global_parameters', 'authorities', 'load', 'create', 'update', 'policy_update', 'register_user']
+
+    def __init__(self, insurance_service: InsuranceService, serializer: BaseSerializer) -> None:
+        self.insurance_service = insurance_service
+        self.serializer = serializer
+
+    def global_parameters(self) -> bytes:
+        return self.serializer.serialize_global_parameters(self.insurance_service.global_parameters)
+
+    def authorities(self) -> bytes:
+        return self.serializer.serialize_authorities(self.insurance_service.authorities)
+
+    def load(self, location: str) -> bytes:
+        return self.serializer.serialize_data_record(self.insurance_service.load(location))
+
+    def create(self, create_record: bytes) -> str:
+        return self.insurance_service.create(self.serializer.deserialize_data_record(create_record))
+
+    def update(self, location: str, update_record: bytes) -> None:
+        self.insurance_service.update(location, self.serializer.deserialize_update_record(update_record))
+
+    def policy_update(self, location: str, policy_update_record: bytes) -> None:
+        self.insurance_service.policy_update(location,
+                                             self.serializer.deserialize_policy_update_record(policy_update_record))
+
+    def register_user(self, gid: str) -> bytes:
+        return self.serializer.serialize_registration_data(
+            self.insurance_service.central_authority.register_user(gid))
+
+
+class SocketUserInsuranceConnection(UserInsuranceConnection):
+    """
+    Connection to an insurance service served by an RpcServer with an InsuranceServiceRpcHandler. The benchmarks
+    contain the actual amount of bytes sent and received, including the framing.
+    """
+
+    def __init__(self, address: Address, serializer: BaseSerializer, authkey: bytes, benchmark: bool = False,
+                 identifier: str = None, pool_size: int = 4) -> None:
+        super().__init__(None, serializer, benchmark, identifier)
+        self.client = RpcClient(address, serializer, authkey, pool_size)
+
+    def close(self) -> None:
+        self.client.close()
+
+    def request_global_parameters(self) -> GlobalParameters:
+        response, _, _ = self.client.call('global_parameters')
+        return self.serializer.deserialize_global_parameters(response)
+
+    def request_authorities(self) -> Dict[str, Any]:
+        """
+        Request the authorities known to the insurance service.
+        :return: A dictionary from the name of the authority to a dictionary with its name and attributes
+        """
+        response, _, _ = self.client.call('authorities')
+        return pickle.loads(response)
+
+    def request_record(self, location: str) -> DataRecord:
+        response, _, _ = self.client.call('load', location)
+        return self.serializer.deserialize_data_record(response)
+
+    def send_create_record(self, create_record: CreateRecord) -> str:
+        location, _, _ = self.client.call('create', self.serializer.serialize_create_record(create_record))
+        return location
+
+    def send_update_record(self, location: str, update_record: UpdateRecord) -> None:
+        _, sent, _ = self.client.call('update', location, self.serializer.serialize_update_record(update_record))
+        if self.benchmark:
+            self.add_benchmark('Record Update out', sent)
+
+    def send_policy_update_record(self, location: str, policy_update_record: PolicyUpdateRecord) -> None:
+        _, sent, _ = self.client.call('policy_update', location,
+                                      self.serializer.serialize_policy_update_record(policy_update_record))
+        if self.benchmark:
+            self.add_benchmark('Policy Update out', sent)
+
+    def send_register_user(self, gid):
+        response, _, _ = self.client.call('register_user', gid)
+        return self.serializer.deserialize_registration_data(response)
@@ -1,6 +1,6 @@
-from typing import Any
+from typing import Any, List
 
-from authority.attribute_authority import AttributeAuthority
+from authority.attribute_authority import AttributeAuthority, KeygenRequest
 from shared.connection.base_connection import BaseConnection
 from shared.implementations.serializer.base_serializer import BaseSerializer
 
@@ -32,6 +32,18 @@ class UserAttributeAuthorityConnection(BaseConnection):
             self.add_benchmark('Keygen in', len(self.serializer.serialize_user_secret_keys(response)))
         return response
 
+    def request_keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        """
+        Request secret keys for multiple users in a single request.
+        :param requests: The keygen requests, see authority.attribute_authority.KeygenRequest
+        :return: The secret keys of each request, in the order of the requests
+        """
+        response = self.attribute_authority.keygen_batch(requests)
+        if self.benchmark:
+            self.add_benchmark('Keygen Batch out', len(self.serializer.serialize_keygen_request(requests)))
+            self.add_benchmark('Keygen Batch in', len(self.serializer.serialize_user_secret_keys(response)))
+        return response
+
     def request_update_keys(self, time_period):
         response = self.attribute_authority.update_keys(time_period)
         if self.benchmark:
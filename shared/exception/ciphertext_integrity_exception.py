@@ -0,0 +1,2 @@
+class CiphertextIntegrityException(BaseException):
+    pass
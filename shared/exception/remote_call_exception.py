@@ -0,0 +1,2 @@
+class RemoteCallException(BaseException):
+    pass
@@ -1,5 +1,7 @@
 from typing import Any, Dict, Tuple
 
+from Crypto import Random
+
 from authority.attribute_authority import AttributeAuthority
 from charm.core.math.pairing import GT
 from charm.toolbox.pairinggroup import PairingGroup
@@ -13,6 +15,7 @@ from shared.implementations.symmetric_key.base_symmetric_key import BaseSymmetri
 from shared.model.global_parameters import GlobalParameters
 from shared.model.types import SecretKeyStore, SecretKeys, AbeEncryption, RegistrationData, DecryptionKeys, \
     AuthorityPublicKeysStore
+from shared.utils import policy_cache
 from shared.utils.key_utils import extract_key_from_group_element
 
 
@@ -21,11 +24,15 @@ class BaseImplementation(object):
     The base implementation provider for different ABE implementations. Acts as an abstract factory for
     implementation specific subclasses of various scheme classes.
     """
+    uses_update_keys = False
+    """Whether decryption_keys requests the update keys of the authorities."""
 
     def __init__(self, group: PairingGroup = None) -> None:
         self.group = PairingGroup('SS512') if group is None else group
         self._public_key_scheme = None  # type:BasePublicKey
         self._symmetric_key_scheme = None  # type:BaseSymmetricKey
+        self._serializer = None  # type:BaseSerializer
+        self._scheme = None  # type:Any
 
     def get_name(self):
         return self.__class__.__name__
@@ -64,6 +71,19 @@ class BaseImplementation(object):
             self._public_key_scheme = RSAPublicKey()
         return self._public_key_scheme
 
+    @public_key_scheme.setter
+    def public_key_scheme(self, value: BasePublicKey) -> None:
+        """
+        Select the public key scheme to use, for example an ECPublicKey instead of RSA keys.
+        As the serializer depends on the public key scheme, a new serializer is created, with the same binary_format.
+        :param value: The public key scheme
+        """
+        self._public_key_scheme = value
+        if self._serializer is not None:
+            binary_format = self._serializer.binary_format
+            self._serializer = None
+            self.serializer.binary_format = binary_format
+
     @property
     def symmetric_key_scheme(self) -> BaseSymmetricKey:
         """
@@ -74,6 +94,34 @@ class BaseImplementation(object):
             self._symmetric_key_scheme = AESSymmetricKey()
         return self._symmetric_key_scheme
 
+    @symmetric_key_scheme.setter
+    def symmetric_key_scheme(self, value: BaseSymmetricKey) -> None:
+        """
+        Select the symmetric key scheme to use, for example a ChunkedAESSymmetricKey to support decryption of ranges.
+        :param value: The symmetric key scheme
+        """
+        self._symmetric_key_scheme = value
+
+    def create_scheme(self) -> Any:
+        """
+        Create a new instance of the ABE scheme of this implementation.
+        :return: The scheme object
+        """
+        raise NotImplementedError()
+
+    @property
+    def scheme(self) -> Any:
+        """
+        Gets the ABE scheme of this implementation. The scheme object is kept for the lifetime of the implementation,
+        and parses policies using a cache, unless caching is disabled in shared.utils.policy_cache.
+        :return: The scheme object
+        """
+        if not policy_cache.POLICY_CACHE_ENABLED:
+            return self.create_scheme()
+        if self._scheme is None:
+            self._scheme = policy_cache.cache_scheme_policies(self.create_scheme(), self.group)
+        return self._scheme
+
     def setup_secret_keys(self, gid: str) -> SecretKeyStore:
         """
         Setup the secret key store for the given user.
@@ -122,6 +170,14 @@ class BaseImplementation(object):
                                                        ske.ske_key_size())
         return key, symmetric_key
 
+    def generate_data_key(self) -> bytes:
+        """
+        Generate a random key for the symmetric encryption of the data of a single record. The data key is
+        wrapped (encrypted) with a key generated by generate_abe_key.
+        :return: The data key
+        """
+        return Random.new().read(self.symmetric_key_scheme.ske_key_size())
+
     def abe_encrypt(self, global_parameters: GlobalParameters, public_keys: Dict[str, Any], message: bytes,
                     policy: str, time_period: int) -> AbeEncryption:
         """
@@ -170,6 +226,16 @@ class BaseImplementation(object):
         """
         return secret_keys
 
+    def decryption_keys_cache_key(self, ciphertext: AbeEncryption, time_period: int) -> Any:
+        """
+        Gets the key to cache the decryption keys of a ciphertext with. Decryption keys with the same cache key are
+        equal, as long as the secret keys of the user do not change.
+        :param ciphertext: The ciphertext the decryption keys are calculated for.
+        :param time_period: The time period the decryption keys are calculated for.
+        :return: The cache key, or None when the decryption keys are not worth caching.
+        """
+        return None
+
     def abe_decrypt(self, global_parameters: GlobalParameters, decryption_keys: DecryptionKeys, gid: str,
                     ciphertext: AbeEncryption, registration_data: RegistrationData) -> bytes:
         """
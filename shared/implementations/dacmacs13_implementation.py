@@ -1,17 +1,19 @@
+import hashlib
 import inspect
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from authority.attribute_authority import AttributeAuthority
+from authority.attribute_authority import AttributeAuthority, KeygenRequest
 from charm.schemes.abenc.abenc_dacmacs_yj14 import DACMACS
 from charm.toolbox.pairinggroup import G1, PairingGroup
 from service.central_authority import CentralAuthority
 from shared.connection.user_attribute_authority_connection import UserAttributeAuthorityConnection
 from shared.exception.policy_not_satisfied_exception import PolicyNotSatisfiedException
 from shared.implementations.base_implementation import BaseImplementation, SecretKeyStore, AbeEncryption
-from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.implementations.serializer.base_serializer import BaseSerializer, AttributeReplacementTable
 from shared.model.global_parameters import GlobalParameters
 from shared.utils.attribute_util import add_time_period_to_attribute, add_time_periods_to_policy
+from shared.utils.precomputation_util import precompute_fixed_bases
 
 
 class DACMACS13Implementation(BaseImplementation):
@@ -28,7 +30,6 @@ class DACMACS13Implementation(BaseImplementation):
 
     def __init__(self, group: PairingGroup = None) -> None:
         super().__init__(group)
-        self._serializer = None  # type: BaseSerializer
 
     def get_name(self):
         return "DAC-MACS"
@@ -45,9 +46,12 @@ class DACMACS13Implementation(BaseImplementation):
             self._serializer = DACMACS13Serializer(self.group, self.public_key_scheme)
         return self._serializer
 
+    def create_scheme(self) -> DACMACS:
+        return DACMACS(self.group)
+
     def abe_encrypt(self, global_parameters: GlobalParameters, public_keys: Dict[str, Any], message: bytes,
                     policy: str, time_period: int) -> AbeEncryption:
-        dacmacs = DACMACS(self.group)
+        dacmacs = self.scheme
         policy = add_time_periods_to_policy(policy, time_period, self.group)
         return dacmacs.encrypt(global_parameters.scheme_parameters, public_keys, message, policy)
 
@@ -55,7 +59,7 @@ class DACMACS13Implementation(BaseImplementation):
                         authorities: Dict[str, UserAttributeAuthorityConnection],
                         secret_keys: SecretKeyStore,
                         registration_data: Any, ciphertext: AbeEncryption, time_period: int):
-        dacmacs = DACMACS(self.group)
+        dacmacs = self.scheme
         try:
             # This token generation is done internally at the client, so no network traffic is happening
             # This can only be the case when decryption is outsourced, in this case this token generation is performed
@@ -65,9 +69,13 @@ class DACMACS13Implementation(BaseImplementation):
         except Exception:
             raise PolicyNotSatisfiedException()
 
+    def decryption_keys_cache_key(self, ciphertext: AbeEncryption, time_period: int) -> Any:
+        # The token is only valid for the ciphertext it is generated for. A digest is kept instead of the ciphertext.
+        return hashlib.sha256(self.serializer.dumps(self.serializer.serialize_abe_ciphertext(ciphertext))).digest()
+
     def abe_decrypt(self, global_parameters: GlobalParameters, secret_keys: SecretKeyStore, gid: str,
                     ciphertext: AbeEncryption, registration_data) -> bytes:
-        dacmacs = DACMACS(self.group)
+        dacmacs = self.scheme
 
         try:
             return dacmacs.decrypt(ciphertext, secret_keys, registration_data['private'])
@@ -92,6 +100,7 @@ class DACMACS13CentralAuthority(CentralAuthority):
         public_key, master_key = dacmacs.setup()
         self.master_key = master_key
         self.global_parameters.scheme_parameters = public_key
+        precompute_fixed_bases(self.global_parameters.scheme_parameters)
         return self.global_parameters
 
 
@@ -111,45 +120,47 @@ class DACMACS13AttributeAuthority(AttributeAuthority):
             self.attributes)
         del self._public_keys['main']['attr']
         del self._secret_keys['main']['attr']
+        precompute_fixed_bases(self._public_keys['main'])
+        self.clear_keys_for_time_periods()
         self.generate_keys_for_time_period(time_period)
 
     def public_keys(self, time_period: int) -> Any:
-        if time_period not in self._public_keys:
+        with self._keys_lock:
+            attribute_public_keys = self._public_keys.get(time_period)
+        if attribute_public_keys is None:
             logging.error("UGH, this should not happen in an experiment as it messes the timings up.")
             logging.error(
                 "DAC-MACS generating authority (%s) public keys for time period %d" % (self.name, time_period))
             curframe = inspect.currentframe()
             calframe = inspect.getouterframes(curframe, 2)
             logging.error('caller name: %s', calframe[1][3])
-            self.generate_keys_for_time_period(time_period)
+            attribute_public_keys, _ = self.generate_keys_for_time_period(time_period)
         return {
             'e(g,g)^alpha': self._public_keys['main']['e(g,g)^alpha'],
             'g^(1/beta)': self._public_keys['main']['g^(1/beta)'],
             'g^(gamma/beta)': self._public_keys['main']['g^(gamma/beta)'],
-            'attr': self._public_keys[time_period]
+            'attr': attribute_public_keys
         }
 
     def secret_keys(self, time_period: int) -> Any:
-        if time_period not in self._secret_keys:
+        with self._keys_lock:
+            attribute_secret_keys = self._secret_keys.get(time_period)
+        if attribute_secret_keys is None:
             logging.error("UGH, this should not happen in an experiment as it messes the timings up.")
             logging.error(
                 "DAC-MACS generating authority (%s) public keys for time period %d" % (self.name, time_period))
             curframe = inspect.currentframe()
             calframe = inspect.getouterframes(curframe, 2)
             logging.error('caller name: %s', calframe[1][3])
-            self.generate_keys_for_time_period(time_period)
+            _, attribute_secret_keys = self.generate_keys_for_time_period(time_period)
         return {
             'alpha': self._secret_keys['main']['alpha'],
             'beta': self._secret_keys['main']['beta'],
             'gamma': self._secret_keys['main']['gamma'],
-            'attr': self._secret_keys[time_period]
+            'attr': attribute_secret_keys
         }
 
-    def generate_keys_for_time_period(self, time_period):
-        """
-        Generate the public and secret keys for the given time period.
-        :param time_period: The time period
-        """
+    def create_keys_for_time_period(self, time_period):
         attributes = list(map(lambda x: add_time_period_to_attribute(x, time_period), self.attributes))
 
         dabe = DACMACS(self.global_parameters.group)
@@ -160,8 +171,8 @@ class DACMACS13AttributeAuthority(AttributeAuthority):
         pk, sk = dabe.authsetup(self.global_parameters.scheme_parameters, attributes, secret_keys=secret_keys,
                                 public_keys=public_keys)
 
-        self._public_keys[time_period] = pk['attr']
-        self._secret_keys[time_period] = sk['attr']
+        precompute_fixed_bases(pk['attr'])
+        return pk['attr'], sk['attr']
 
     def _keygen(self, gid, registration_data, attributes, time_period):
         dacmacs = DACMACS(self.global_parameters.group)
@@ -171,6 +182,22 @@ class DACMACS13AttributeAuthority(AttributeAuthority):
                                           self.public_keys(time_period), attributes,
                                           registration_data['cert'])}
 
+    def _keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        dacmacs = DACMACS(self.global_parameters.group)
+        # The keys of a time period are combined with the main keys on each access, so they are combined only once
+        keys = dict()  # type: Dict[int, Any]
+        result = list()
+        for request in requests:
+            time_period = request['time_period']
+            if time_period not in keys:
+                keys[time_period] = (self.secret_keys(time_period), self.public_keys(time_period))
+            secret_keys, public_keys = keys[time_period]
+            attributes = [add_time_period_to_attribute(x, time_period) for x in request['attributes']]
+            result.append({self.name: dacmacs.keygen(self.global_parameters.scheme_parameters, secret_keys,
+                                                     public_keys, attributes,
+                                                     request['registration_data']['cert'])})
+        return result
+
 
 class DACMACS13Serializer(BaseSerializer):
     def serialize_global_scheme_parameters(self, scheme_parameters):
@@ -195,33 +222,33 @@ class DACMACS13Serializer(BaseSerializer):
         # C2[i] = gp['g1'] ** (-tx)
         # C3[i] = pks[auth]['gy'] ** tx * gp['g1'] ** zero_shares[i]
         # C4[i] = gp['F'](attr) ** tx
-        dictionary = dict()  # type: dict
+        replacements = AttributeReplacementTable()
         return {
             'p': ciphertext['policy'],
-            'C': self.group.serialize(ciphertext['C']),
-            'C1': self.group.serialize(ciphertext['C1']),
-            'C2': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            'C': self.serialize_element(ciphertext['C']),
+            'C1': self.serialize_element(ciphertext['C1']),
+            'C2': {replacements.replace(k): self.serialize_element(v) for k, v in
                    ciphertext['C2'].items()},
-            'Ci': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            'Ci': {replacements.replace(k): self.serialize_element(v) for k, v in
                    ciphertext['Ci'].items()},
-            'D1': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            'D1': {replacements.replace(k): self.serialize_element(v) for k, v in
                    ciphertext['D1'].items()},
-            'D2': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            'D2': {replacements.replace(k): self.serialize_element(v) for k, v in
                    ciphertext['D2'].items()},
-            'd': dictionary
+            'd': replacements.as_dict()
         }
 
     def deserialize_abe_ciphertext(self, dictionary: Any) -> AbeEncryption:
         return {
             'policy': dictionary['p'],
-            'C': self.group.deserialize(dictionary['C']),
-            'C1': self.group.deserialize(dictionary['C1']),
-            'C2': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'C': self.deserialize_element(dictionary['C']),
+            'C1': self.deserialize_element(dictionary['C1']),
+            'C2': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['C2'].items()},
-            'Ci': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'Ci': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['Ci'].items()},
-            'D1': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'D1': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['D1'].items()},
-            'D2': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'D2': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['D2'].items()}
         }
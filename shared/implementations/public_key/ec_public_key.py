@@ -0,0 +1,199 @@
+import hashlib
+import hmac
+from struct import pack, unpack_from
+from typing import Any, List
+
+from charm.core.math.elliptic_curve import getGenerator
+from charm.toolbox.eccurve import prime256v1
+from charm.toolbox.ecgroup import ECGroup, ZR
+from shared.implementations.public_key.base_public_key import BasePublicKey
+from shared.implementations.symmetric_key.aes_symmetric_key import AESSymmetricKey
+
+
+def pack_parts(*parts: bytes) -> bytes:
+    """
+    Pack multiple byte strings into one, by prefixing each part with its length.
+    >>> unpack_parts(pack_parts(b'Hello', b'', b'world')) == [b'Hello', b'', b'world']
+    True
+    """
+    return b''.join(pack('>I', len(part)) + part for part in parts)
+
+
+def unpack_parts(data: bytes) -> List[bytes]:
+    """
+    Unpack byte strings packed with pack_parts.
+    """
+    parts = list()
+    position = 0
+    while position < len(data):
+        length, = unpack_from('>I', data, position)
+        position += 4
+        if position + length > len(data):
+            raise ValueError('Invalid packed data')
+        parts.append(data[position:position + length])
+        position += length
+    return parts
+
+
+class ECKeyPair(object):
+    """
+    A key pair of the ECPublicKey scheme. The public key consists of the generator g of the curve and y = g^x,
+    the secret key is x. For public keys, x is None.
+    """
+
+    def __init__(self, g: Any, y: Any, x: Any = None) -> None:
+        self.g = g
+        self.y = y
+        self.x = x
+
+    def publickey(self) -> 'ECKeyPair':
+        """
+        Get the public part of this key pair.
+        """
+        return ECKeyPair(self.g, self.y)
+
+    def has_private(self) -> bool:
+        return self.x is not None
+
+    def __eq__(self, other):
+        return isinstance(other, ECKeyPair) and self.g == other.g and self.y == other.y and self.x == other.x
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class ECPublicKey(BasePublicKey):
+    """
+    Public key scheme based on elliptic curves. Encryption is ECIES-style: an ephemeral Diffie-Hellman key is
+    used to derive an AES key and a MAC key. Signatures are ECDSA signatures.
+    """
+
+    def __init__(self, curve: int = prime256v1) -> None:
+        self.group = ECGroup(curve)
+        self.generator = getGenerator(self.group.ec_group)
+        self._symmetric_key_scheme = AESSymmetricKey()
+
+    def _hash_to_zr(self, data: bytes) -> Any:
+        return self.group.init(ZR, int.from_bytes(hashlib.sha256(data).digest(), 'big'))
+
+    def _derive_keys(self, shared_element: Any):
+        shared_secret = self.group.serialize(shared_element)
+        return hashlib.sha256(b'encryption' + shared_secret).digest(), \
+               hashlib.sha256(b'authentication' + shared_secret).digest()
+
+    def export_key(self, key: ECKeyPair) -> bytes:
+        """
+        Export a key pair or public key.
+        :param key: The key to export
+        :return: The exported key
+        """
+        parts = [self.group.serialize(key.g), self.group.serialize(key.y)]
+        if key.has_private():
+            parts.append(self.group.serialize(key.x))
+        return pack_parts(*parts)
+
+    def import_key(self, data: bytes) -> ECKeyPair:
+        """
+        Import a key exported with export_key.
+        :param data: The exported key
+        :return: The key pair or public key
+
+        >>> i = ECPublicKey()
+        >>> key = i.generate_key_pair(256)
+        >>> i.import_key(i.export_key(key)) == key
+        True
+        >>> i.import_key(i.export_key(key.publickey())) == key.publickey()
+        True
+        """
+        return ECKeyPair(*[self.group.deserialize(part) for part in unpack_parts(data)])
+
+    def generate_key_pair(self, size: int) -> ECKeyPair:
+        """
+        Create a new public and private key pair
+        :param size: Ignored, the size of the keys follows from the curve of this scheme
+        :return: A new key pair
+
+        >>> i = ECPublicKey()
+        >>> i.generate_key_pair(256).g == i.generate_key_pair(256).g
+        True
+        """
+        x = self.group.random(ZR)
+        return ECKeyPair(self.generator, self.generator ** x, x)
+
+    def encrypt(self, message: bytes, key: ECKeyPair) -> bytes:
+        """
+        Encrypt a message using public key encryption.
+        :param message: The message to encrypt
+        :param key: The public key to encrypt with
+        :return: The ciphertext
+
+        >>> i = ECPublicKey()
+        >>> key = i.generate_key_pair(256)
+        >>> c = i.encrypt(b'Hello world', key.publickey())
+        >>> i.decrypt(c, key) == b'Hello world'
+        True
+        """
+        r = self.group.random(ZR)
+        ephemeral = self.group.serialize(key.g ** r)
+        encryption_key, authentication_key = self._derive_keys(key.y ** r)
+        ciphertext = self._symmetric_key_scheme.ske_encrypt(message, encryption_key)
+        tag = hmac.new(authentication_key, ephemeral + ciphertext, hashlib.sha256).digest()
+        return pack_parts(ephemeral, ciphertext, tag)
+
+    def decrypt(self, ciphertext: bytes, key: ECKeyPair) -> bytes:
+        """
+        Decrypt a ciphertext using public key encryption.
+        :param ciphertext: The ciphertext to decrypt.
+        :param key: The private key to decrypt with.
+        :raise ValueError: When the ciphertext is not valid for this key
+        :return: The original message.
+        """
+        ephemeral, encrypted, tag = unpack_parts(ciphertext)
+        encryption_key, authentication_key = self._derive_keys(self.group.deserialize(ephemeral) ** key.x)
+        if not hmac.compare_digest(tag, hmac.new(authentication_key, ephemeral + encrypted, hashlib.sha256).digest()):
+            raise ValueError('Incorrect decryption.')
+        return self._symmetric_key_scheme.ske_decrypt(encrypted, encryption_key)
+
+    def sign(self, secret_key: ECKeyPair, data: bytes) -> bytes:
+        """
+        Sign the data using the secret key
+        :param secret_key: The key pair to sign with
+        :param data: The data to sign
+        :return: The signature
+        """
+        e = self._hash_to_zr(data)
+        while True:
+            k = self.group.random(ZR)
+            r = self.group.zr(secret_key.g ** k)
+            s = (k ** -1) * (e + secret_key.x * r)
+            if r != 0 and s != 0:
+                return pack_parts(self.group.serialize(r), self.group.serialize(s))
+
+    def verify(self, public_key: ECKeyPair, signature: bytes, data: bytes) -> bool:
+        """
+        Verify a signature over data with the given key.
+        :param public_key: The public key to use in the verification
+        :param signature: The signature
+        :param data: The data on which the signature is created
+        :return: True if correct, False otherwise
+
+        >>> i = ECPublicKey()
+        >>> key = i.generate_key_pair(256)
+        >>> s = i.sign(key, b'Hello world')
+        >>> i.verify(key.publickey(), s, b'Hello world')
+        True
+        >>> i.verify(key.publickey(), s, b'Goodbye world')
+        False
+        """
+        try:
+            r, s = [int(self.group.deserialize(part)) for part in unpack_parts(signature)]
+        except Exception:
+            # Malformed parts or points instead of integers, charm raises its own (unexported) error type
+            return False
+        order = int(self.group.order())
+        if not (0 < r < order and 0 < s < order):
+            return False
+        r, s = self.group.init(ZR, r), self.group.init(ZR, s)
+        w = s ** -1
+        v = (public_key.g ** (self._hash_to_zr(data) * w)) * (public_key.y ** (r * w))
+        return self.group.zr(v) == r
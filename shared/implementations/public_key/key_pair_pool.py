@@ -0,0 +1,138 @@
+import os
+import pickle
+import threading
+from collections import deque
+from typing import Any
+
+from shared.implementations.public_key.base_public_key import BasePublicKey
+
+
+class KeyPairPool(object):
+    """
+    Pool of key pairs which are generated ahead of time in a background thread, so taking a key pair does not
+    have to wait for the (slow) key generation.
+
+    The pool is refilled up to the high watermark as soon as it drops below the low watermark. When the pool is
+    stopped, the remaining key pairs are spilled to disk, so a restarted pool starts warm. Spilled key pairs are
+    removed from disk when they are loaded, so a key pair is never handed out twice, even after a crash.
+    """
+
+    def __init__(self, public_key_scheme: BasePublicKey, key_size: int, low_watermark: int = 2,
+                 high_watermark: int = 8, spill_path: str = None) -> None:
+        """
+        :param public_key_scheme: The public key scheme to generate the key pairs with
+        :param key_size: The size of the keys to generate
+        :param low_watermark: The pool is refilled when it contains less than this amount of key pairs
+        :param high_watermark: The amount of key pairs the pool is filled up to
+        :param spill_path: Path of the file to spill the key pairs to when stopped, or None to not spill
+        """
+        assert 0 <= low_watermark <= high_watermark, 'The low watermark should not exceed the high watermark'
+        self.public_key_scheme = public_key_scheme
+        self.key_size = key_size
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.spill_path = spill_path
+        self._key_pairs = deque()  # type: deque
+        self._condition = threading.Condition()
+        self._thread = None  # type: threading.Thread
+        self._stopped = False
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._key_pairs)
+
+    def start(self) -> None:
+        """
+        Load the spilled key pairs, if any, and start filling the pool in the background.
+        """
+        self.load()
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._fill, name='KeyPairPool', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop filling the pool and spill the remaining key pairs to disk.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join()
+        self.save()
+
+    def take(self) -> Any:
+        """
+        Take a key pair from the pool. When the pool is empty, a key pair is generated right away.
+        :return: A key pair which is not handed out before.
+        """
+        with self._condition:
+            key_pair = self._key_pairs.popleft() if self._key_pairs else None
+            if len(self._key_pairs) < self.low_watermark:
+                self._condition.notify_all()
+        if key_pair is None:
+            key_pair = self.public_key_scheme.generate_key_pair(self.key_size)
+        return key_pair
+
+    def _fill(self) -> None:
+        """
+        Keep the pool filled. Runs in the background thread.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and len(self._key_pairs) >= self.low_watermark:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                missing = self.high_watermark - len(self._key_pairs)
+            # Generate outside the lock, so key pairs can be taken meanwhile
+            for _ in range(missing):
+                key_pair = self.public_key_scheme.generate_key_pair(self.key_size)
+                with self._condition:
+                    self._key_pairs.append(key_pair)
+                    self._condition.notify_all()
+                    if self._stopped:
+                        return
+
+    def wait_until_filled(self, amount: int = None, timeout: float = None) -> bool:
+        """
+        Wait until the pool contains at least the given amount of key pairs.
+        :param amount: The amount of key pairs to wait for, defaults to the low watermark
+        :param timeout: The maximum time to wait in seconds, or None to wait indefinitely
+        :return: Whether the pool contains the amount of key pairs
+        """
+        amount = self.low_watermark if amount is None else amount
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._key_pairs) >= amount, timeout)
+
+    def save(self) -> None:
+        """
+        Spill the key pairs in the pool to disk. The spilled key pairs are removed from the pool, so they are only
+        handed out after loading them again.
+        """
+        if self.spill_path is None:
+            return
+        with self._condition:
+            exported = [self.public_key_scheme.export_key(key_pair) for key_pair in self._key_pairs]
+            self._key_pairs.clear()
+        with open(self.spill_path, 'wb') as f:
+            pickle.dump(exported, f)
+
+    def load(self) -> None:
+        """
+        Load the key pairs spilled to disk into the pool. The spill file is removed, so the loaded key pairs can
+        not be loaded again.
+        """
+        if self.spill_path is None or not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, 'rb') as f:
+            exported = pickle.load(f)
+        os.remove(self.spill_path)
+        with self._condition:
+            self._key_pairs.extend(self.public_key_scheme.import_key(data) for data in exported)
+            self._condition.notify_all()
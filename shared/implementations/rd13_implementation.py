@@ -1,8 +1,8 @@
 import inspect
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from authority.attribute_authority import AttributeAuthority
+from authority.attribute_authority import AttributeAuthority, KeygenRequest
 from charm.schemes.abenc.dabe_rd13 import DabeRD13
 from charm.toolbox.pairinggroup import G1, PairingGroup
 from charm.toolbox.secretutil import SecretUtil
@@ -14,6 +14,7 @@ from shared.model.global_parameters import GlobalParameters
 from shared.model.types import SecretKeyStore, AbeEncryption, AuthorityPublicKeysStore
 from shared.utils.attribute_util import add_time_period_to_attribute, translate_policy_to_access_structure
 from shared.utils.dict_utils import merge_dicts
+from shared.utils.precomputation_util import precompute_fixed_bases
 
 
 class RD13Implementation(BaseImplementation):
@@ -28,7 +29,6 @@ class RD13Implementation(BaseImplementation):
 
     def __init__(self, group: PairingGroup = None) -> None:
         super().__init__(group)
-        self._serializer = None  # type: BaseSerializer
 
     def get_name(self):
         return "RD-DABE"
@@ -48,9 +48,12 @@ class RD13Implementation(BaseImplementation):
     def merge_public_keys(self, public_keys: Dict[str, AuthorityPublicKeysStore]) -> Dict[str, Any]:
         return merge_dicts(*public_keys.values())
 
+    def create_scheme(self) -> DabeRD13:
+        return DabeRD13(self.group)
+
     def abe_encrypt(self, global_parameters: GlobalParameters, public_keys: Dict[str, Any], message: bytes,
                     policy: str, time_period: int) -> AbeEncryption:
-        dabe = DabeRD13(self.group)
+        dabe = self.scheme
         access_structure = translate_policy_to_access_structure(policy)
         # Now we add times to the attributes
         access_structure = list(map(
@@ -64,7 +67,7 @@ class RD13Implementation(BaseImplementation):
 
     def abe_decrypt(self, global_parameters: GlobalParameters, secret_keys: SecretKeyStore, gid: str,
                     ciphertext: AbeEncryption, registration_data) -> bytes:
-        dabe = DabeRD13(self.group)
+        dabe = self.scheme
         try:
             return dabe.decrypt(global_parameters.scheme_parameters, secret_keys, ciphertext, gid)
         except Exception:
@@ -75,6 +78,7 @@ class RD13CentralAuthority(CentralAuthority):
     def central_setup(self):
         maabe = DabeRD13(self.global_parameters.group)
         self.global_parameters.scheme_parameters = maabe.setup()
+        precompute_fixed_bases(self.global_parameters.scheme_parameters)
         return self.global_parameters
 
     def register_user(self, gid: str) -> dict:
@@ -88,40 +92,40 @@ class RD13AttributeAuthority(AttributeAuthority):
         # Setting up keys here is useless, as a time period is required
         self._public_keys = {}
         self._secret_keys = {}
+        self.clear_keys_for_time_periods()
         self.generate_keys_for_time_period(time_period)
 
     def public_keys(self, time_period: int) -> Any:
-        if time_period not in self._public_keys:
+        with self._keys_lock:
+            public_keys = self._public_keys.get(time_period)
+        if public_keys is None:
             logging.error("UGH, this should not happen in an experiment as it messes the timings up.")
             logging.error("RD13 generating authority (%s) public keys for time period %d" % (self.name, time_period))
             curframe = inspect.currentframe()
             calframe = inspect.getouterframes(curframe, 2)
             logging.error('caller name: %s', calframe[1][3])
-            self.generate_keys_for_time_period(time_period)
-        return self._public_keys[time_period]
+            public_keys, _ = self.generate_keys_for_time_period(time_period)
+        return public_keys
 
     def secret_keys(self, time_period: int) -> Any:
-        if time_period not in self._secret_keys:
+        with self._keys_lock:
+            secret_keys = self._secret_keys.get(time_period)
+        if secret_keys is None:
             logging.error("UGH, this should not happen in an experiment as it messes the timings up.")
             logging.error("RD13 generating authority (%s) secret keys for time period %d" % (self.name, time_period))
             curframe = inspect.currentframe()
             calframe = inspect.getouterframes(curframe, 2)
             logging.error('caller name: %s', calframe[1][3])
-            self.generate_keys_for_time_period(time_period)
-        return self._secret_keys[time_period]
-
-    def generate_keys_for_time_period(self, time_period):
-        """
-        Generate the public and secret keys for the given time period.
-        :param time_period: The time period
-        """
+            _, secret_keys = self.generate_keys_for_time_period(time_period)
+        return secret_keys
+
+    def create_keys_for_time_period(self, time_period):
         attributes = list(map(lambda x: add_time_period_to_attribute(x, time_period), self.attributes))
 
         dabe = DabeRD13(self.global_parameters.group)
         pk, sk = dabe.authsetup(self.global_parameters.scheme_parameters, attributes)
-
-        self._public_keys[time_period] = pk
-        self._secret_keys[time_period] = sk
+        precompute_fixed_bases(pk)
+        return pk, sk
 
     def _keygen(self, gid, registration_info, attributes, time_period):
         attributes = list(map(lambda x: add_time_period_to_attribute(x, time_period), attributes))
@@ -129,6 +133,19 @@ class RD13AttributeAuthority(AttributeAuthority):
         return dabe.keygen(self.global_parameters.scheme_parameters, self.secret_keys(time_period),
                            gid, attributes)
 
+    def _keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        dabe = DabeRD13(self.global_parameters.group)
+        secret_keys = dict()  # type: Dict[int, Any]
+        result = list()
+        for request in requests:
+            time_period = request['time_period']
+            if time_period not in secret_keys:
+                secret_keys[time_period] = self.secret_keys(time_period)
+            attributes = [add_time_period_to_attribute(x, time_period) for x in request['attributes']]
+            result.append(dabe.keygen(self.global_parameters.scheme_parameters, secret_keys[time_period],
+                                      request['gid'], attributes))
+        return result
+
 
 class RD13Serializer(BaseSerializer):
     def serialize_global_scheme_parameters(self, scheme_parameters):
@@ -150,9 +167,9 @@ class RD13Serializer(BaseSerializer):
         }
         for i in range(0, len(ciphertext['A'])):
             result[str(i)] = {
-                '1': self.group.serialize(ciphertext[i]['c_1']),
-                '2': self.group.serialize(ciphertext[i]['c_2']),
-                '3': self.group.serialize(ciphertext[i]['c_3'])
+                '1': self.serialize_element(ciphertext[i]['c_1']),
+                '2': self.serialize_element(ciphertext[i]['c_2']),
+                '3': self.serialize_element(ciphertext[i]['c_3'])
             }
         return result
 
@@ -162,8 +179,8 @@ class RD13Serializer(BaseSerializer):
         }
         for i in range(0, len(dictionary['A'])):
             result[i] = {  # type: ignore
-                'c_1': self.group.deserialize(dictionary[str(i)]['1']),
-                'c_2': self.group.deserialize(dictionary[str(i)]['2']),
-                'c_3': self.group.deserialize(dictionary[str(i)]['3'])
+                'c_1': self.deserialize_element(dictionary[str(i)]['1']),
+                'c_2': self.deserialize_element(dictionary[str(i)]['2']),
+                'c_3': self.deserialize_element(dictionary[str(i)]['3'])
             }
         return result
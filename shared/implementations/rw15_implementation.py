@@ -1,15 +1,16 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from authority.attribute_authority import AttributeAuthority
+from authority.attribute_authority import AttributeAuthority, KeygenRequest
 from charm.schemes.abenc.abenc_maabe_rw15 import MaabeRW15
 from charm.toolbox.pairinggroup import G2, PairingGroup
 from charm.toolbox.secretutil import SecretUtil
 from service.central_authority import CentralAuthority
 from shared.exception.policy_not_satisfied_exception import PolicyNotSatisfiedException
 from shared.implementations.base_implementation import BaseImplementation, SecretKeyStore, AbeEncryption
-from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.implementations.serializer.base_serializer import BaseSerializer, AttributeReplacementTable
 from shared.model.global_parameters import GlobalParameters
 from shared.utils.attribute_util import add_time_period_to_attribute, add_time_periods_to_policy
+from shared.utils.precomputation_util import precompute_fixed_bases
 
 
 class RW15Implementation(BaseImplementation):
@@ -24,7 +25,6 @@ class RW15Implementation(BaseImplementation):
 
     def __init__(self, group: PairingGroup = None) -> None:
         super().__init__(group)
-        self._serializer = None  # type: BaseSerializer
 
     def get_name(self):
         return "RW-ABE"
@@ -41,15 +41,18 @@ class RW15Implementation(BaseImplementation):
             self._serializer = RW15Serializer(self.group, self.public_key_scheme)
         return self._serializer
 
+    def create_scheme(self) -> MaabeRW15:
+        return MaabeRW15(self.group)
+
     def abe_encrypt(self, global_parameters: GlobalParameters, public_keys: Dict[str, Any], message: bytes,
                     policy: str, time_period: int) -> AbeEncryption:
-        maabe = MaabeRW15(self.group)
+        maabe = self.scheme
         policy = add_time_periods_to_policy(policy, time_period, self.group)
         return maabe.encrypt(global_parameters.scheme_parameters, public_keys, message, policy)
 
     def abe_decrypt(self, global_parameters: GlobalParameters, secret_keys: SecretKeyStore, gid: str,
                     ciphertext: AbeEncryption, registration_data) -> bytes:
-        maabe = MaabeRW15(self.group)
+        maabe = self.scheme
         try:
             return maabe.decrypt(global_parameters.scheme_parameters, {'GID': gid, 'keys': secret_keys}, ciphertext)
         except Exception:
@@ -63,6 +66,7 @@ class RW15CentralAuthority(CentralAuthority):
     def central_setup(self):
         maabe = MaabeRW15(self.global_parameters.group)
         self.global_parameters.scheme_parameters = maabe.setup()
+        precompute_fixed_bases(self.global_parameters.scheme_parameters)
         return self.global_parameters
 
 
@@ -73,6 +77,7 @@ class RW15AttributeAuthority(AttributeAuthority):
         maabe = MaabeRW15(self.global_parameters.group)
         self._public_keys, self._secret_keys = maabe.authsetup(central_authority.global_parameters.scheme_parameters,
                                                                self.name)
+        precompute_fixed_bases(self._public_keys)
 
     def _keygen(self, gid, registration_data, attributes, time_period):
         maabe = MaabeRW15(self.global_parameters.group)
@@ -81,6 +86,16 @@ class RW15AttributeAuthority(AttributeAuthority):
                                                 self.secret_keys(time_period), gid,
                                                 attributes)
 
+    def _keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        # The secret keys of the authority do not depend on the time period
+        maabe = MaabeRW15(self.global_parameters.group)
+        secret_keys = self._secret_keys
+        return [maabe.multiple_attributes_keygen(self.global_parameters.scheme_parameters, secret_keys,
+                                                 request['gid'],
+                                                 [add_time_period_to_attribute(x, request['time_period'])
+                                                  for x in request['attributes']])
+                for request in requests]
+
 
 class RW15Serializer(BaseSerializer):
     def serialize_global_scheme_parameters(self, scheme_parameters):
@@ -108,31 +123,31 @@ class RW15Serializer(BaseSerializer):
         # C2[i] = gp['g1'] ** (-tx)
         # C3[i] = pks[auth]['gy'] ** tx * gp['g1'] ** zero_shares[i]
         # C4[i] = gp['F'](attr) ** tx
-        dictionary = dict()  # type: dict
+        replacements = AttributeReplacementTable()
         return {
             'p': ciphertext['policy'],
-            '0': self.group.serialize(ciphertext['C0']),
-            '1': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            '0': self.serialize_element(ciphertext['C0']),
+            '1': {replacements.replace(k): self.serialize_element(v) for k, v in
                   ciphertext['C1'].items()},
-            '2': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            '2': {replacements.replace(k): self.serialize_element(v) for k, v in
                   ciphertext['C2'].items()},
-            '3': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            '3': {replacements.replace(k): self.serialize_element(v) for k, v in
                   ciphertext['C3'].items()},
-            '4': {self.replace_attributes(dictionary, k): self.group.serialize(v) for k, v in
+            '4': {replacements.replace(k): self.serialize_element(v) for k, v in
                   ciphertext['C4'].items()},
-            'd': dictionary
+            'd': replacements.as_dict()
         }
 
     def deserialize_abe_ciphertext(self, dictionary: Any) -> AbeEncryption:
         return {
             'policy': dictionary['p'],
-            'C0': self.group.deserialize(dictionary['0']),
-            'C1': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'C0': self.deserialize_element(dictionary['0']),
+            'C1': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['1'].items()},
-            'C2': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'C2': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['2'].items()},
-            'C3': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'C3': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['3'].items()},
-            'C4': {self.undo_attribute_replacement(dictionary['d'], k): self.group.deserialize(v) for k, v in
+            'C4': {self.undo_attribute_replacement(dictionary['d'], k): self.deserialize_element(v) for k, v in
                    dictionary['4'].items()},
         }
@@ -4,7 +4,9 @@ from pickle import Unpickler
 from typing import Any
 
 from charm.toolbox.pairinggroup import PairingGroup
+from shared.implementations.serializer import binary_encoding
 from shared.model.types import AbeEncryption, SecretKeyStore, AuthorityPublicKeysStore, AuthoritySecretKeysStore
+from shared.utils.data_util import join_chunks
 
 PY3 = (sys.hexversion >= 0x30000f0)
 if PY3:
@@ -18,6 +20,7 @@ import charm
 from shared.model.global_parameters import GlobalParameters
 from shared.model.records.create_record import CreateRecord
 from shared.model.records.data_record import DataRecord
+from shared.model.records.lazy_data_record import LazyDataRecord
 from shared.model.records.policy_update_record import PolicyUpdateRecord
 from shared.model.records.update_record import UpdateRecord
 
@@ -31,19 +34,134 @@ DATA_RECORD_WRITE_SECRET_KEY = 'wsk'
 DATA_RECORD_INFO = 'i'
 DATA_RECORD_TIME_PERIOD = 't'
 DATA_RECORD_SIGNATURE = 's'
+DATA_RECORD_WRAPPED_DATA_KEY = 'wdk'
+
+
+class AttributeReplacementTable(object):
+    """
+    Bidirectional table of replacements of attributes by short integer identifiers. Looking up a replacement
+    takes constant time in both directions.
+    """
+
+    def __init__(self, replacements: Dict[int, str] = None) -> None:
+        """
+        :param replacements: Existing replacements, as returned by as_dict
+        """
+        self._attributes = dict() if replacements is None else replacements  # type: Dict[int, str]
+        self._identifiers = {attribute: identifier for identifier, attribute in
+                             self._attributes.items()}  # type: Dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self._attributes)
+
+    def replace(self, attribute: str) -> int:
+        """
+        Get the replacement identifier of the given attribute, adding it if it is not yet in the table.
+        :param attribute: The attribute to replace
+        :return: The replacement identifier
+
+        >>> table = AttributeReplacementTable()
+        >>> table.replace('TEST123') == table.replace('TEST123')
+        True
+        >>> table.replace('TEST123') == table.replace('TEST')
+        False
+        >>> table.undo(table.replace('TEST'))
+        'TEST'
+        """
+        identifier = self._identifiers.get(attribute)
+        if identifier is None:
+            identifier = len(self._attributes)
+            self._identifiers[attribute] = identifier
+            self._attributes[identifier] = attribute
+        return identifier
+
+    def undo(self, identifier: int) -> str:
+        """
+        Get the attribute which is replaced by the given identifier.
+        :param identifier: The replacement identifier
+        :raise KeyError: When the identifier is not in the table
+        :return: The original attribute
+        """
+        return self._attributes[identifier]
+
+    def as_dict(self) -> Dict[int, str]:
+        """
+        Get the table as dictionary from identifier to attribute, which can be serialized and
+        passed to the constructor again.
+        :return: The dictionary, which is not copied
+
+        >>> table = AttributeReplacementTable()
+        >>> identifier = table.replace('TEST')
+        >>> AttributeReplacementTable(table.as_dict()).undo(identifier)
+        'TEST'
+        """
+        return self._attributes
 
 
 class BaseSerializer(object):
-    def __init__(self, group: PairingGroup, public_key_scheme) -> None:
+    def __init__(self, group: PairingGroup, public_key_scheme, binary_format: bool = False) -> None:
+        """
+        :param group: The pairing group
+        :param public_key_scheme: The public key scheme of the public keys in the records
+        :param binary_format: Whether to serialize records and their ABE ciphertexts in the compact binary format
+        of shared.implementations.serializer.binary_encoding, instead of pickling them. Records in both formats
+        can always be deserialized.
+        """
         self.group = group
         self.public_key_scheme = public_key_scheme
+        self.binary_format = binary_format
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Encode a structure of dicts, lists and primitive values, which may contain elements returned by
+        serialize_element, in the format of this serializer.
+        :param value: The value to encode
+        :return: The encoded value
+        """
+        if self.binary_format:
+            return binary_encoding.encode(value, self.group)
+        return pickle.dumps(value)
+
+    def decode(self, data: bytes, lazy_elements: bool = False) -> Any:
+        """
+        Decode a value encoded with encode, in either format.
+        :param data: The encoded value
+        :param lazy_elements: Whether to leave the elements encoded until they are passed to deserialize_element
+        :return: The decoded value
+        """
+        if binary_encoding.is_binary(data):
+            return binary_encoding.decode(data, self.group, lazy_elements)
+        return pickle.loads(data)
+
+    def serialize_element(self, element: Any) -> Any:
+        """
+        Serialize a pairing group element as part of a value passed to encode. In the binary format,
+        the element is kept, so it is stored in its raw compressed encoding.
+        :param element: The element to serialize
+        :return: The serialized element
+        """
+        return element if self.binary_format else self.group.serialize(element)
+
+    def deserialize_element(self, data: Any) -> Any:
+        """
+        Deserialize an element serialized with serialize_element, in either format.
+        :param data: The serialized element
+        :return: The element
+        """
+        if isinstance(data, charm.core.math.pairing.pc_element):
+            return data
+        if isinstance(data, binary_encoding.EncodedElement):
+            return binary_encoding.decode_element(data, self.group)
+        return self.group.deserialize(data)
 
     def serialize_abe_ciphertext(self, ciphertext: AbeEncryption) -> Any:
         """
-        Serialize the ciphertext resulting form an attribute based encryption to an object which can be pickled.
+        Serialize the ciphertext resulting form an attribute based encryption to an object which can be encoded
+        using encode.
 
         This is required because by default, instances of pairing.Element can not be pickled but have to be serialized.
-        :return: An object, probably a dict, which can be pickled
+        Elements should be serialized using serialize_element.
+        :return: An object, probably a dict, which can be encoded
         """
         raise NotImplementedError()
 
@@ -80,6 +198,7 @@ class BaseSerializer(object):
         """
         Determine a shorter identifier for the given keyword, and store it in the dict. If a keyword is already
         in the dictionary, the existing replacement identifier is used.
+        This scans the whole dictionary, use an AttributeReplacementTable when replacing many keywords.
         :param dict: The dictionary with existing replacements.
         :param keyword: The keyword to replace.
         :return: int The replacement keyword. The dict is also updated.
@@ -131,11 +250,23 @@ class BaseSerializer(object):
         return dict[replacement]
 
     def serialize_data_record(self, data_record: DataRecord) -> bytes:
-        return pickle.dumps({
+        return self.encode({
             'meta': self.serialize_data_record_meta(data_record),
-            'data': data_record.data
+            'data': join_chunks(data_record.data)
         })
 
+    def deserialize_data_record(self, data: bytes) -> DataRecord:
+        """
+        Deserialize a data record serialized with serialize_data_record (or serialize_create_record),
+        including its data.
+        :param data: The data to deserialize.
+        :return: An instance of the DataRecord class.
+        """
+        d = self.decode(data)
+        record = self.deserialize_data_record_meta(d['meta'])
+        record.data = d['data']
+        return record
+
     # noinspection PyMethodMayBeStatic
     def serialize_authorities(self, response: Dict[str, Any]) -> bytes:
         return pickle.dumps({
@@ -143,18 +274,21 @@ class BaseSerializer(object):
                                 })
 
     def serialize_create_record(self, create_record: CreateRecord) -> bytes:
-        return pickle.dumps({
+        return self.encode({
             'meta': self.serialize_data_record_meta(create_record),
-            'data': create_record.data
+            'data': join_chunks(create_record.data)
         })
 
     def serialize_update_record(self, update_record: UpdateRecord) -> bytes:
         return self.dumps(update_record)
 
+    def deserialize_update_record(self, data: bytes) -> UpdateRecord:
+        return self.loads(data)
+
     def serialize_policy_update_record(self, policy_update_record: PolicyUpdateRecord) -> bytes:
-        return pickle.dumps({
+        return self.encode({
             'meta': self.serialize_policy_update_record_meta(policy_update_record),
-            'data': policy_update_record.data
+            'data': None if policy_update_record.data is None else join_chunks(policy_update_record.data)
         })
 
     def serialize_policy_update_record_meta(self, policy_update_record: PolicyUpdateRecord) -> bytes:
@@ -163,7 +297,7 @@ class BaseSerializer(object):
         :param policy_update_record:
         :return:
         """
-        return pickle.dumps({
+        return self.encode({
             DATA_RECORD_READ_POLICY: policy_update_record.read_policy,
             DATA_RECORD_WRITE_POLICY: policy_update_record.write_policy,
             DATA_RECORD_WRITE_PUBLIC_KEY: self.serialize_public_key(
@@ -178,8 +312,33 @@ class BaseSerializer(object):
                     policy_update_record.write_private_key[0]),
                 policy_update_record.write_private_key[1]),
             DATA_RECORD_SIGNATURE: policy_update_record.signature,
+            DATA_RECORD_WRAPPED_DATA_KEY: policy_update_record.wrapped_data_key
         })
 
+    def deserialize_policy_update_record(self, data: bytes) -> PolicyUpdateRecord:
+        """
+        Deserialize a policy update record serialized with serialize_policy_update_record, including its data.
+        :param data: The data to deserialize.
+        :return: An instance of the PolicyUpdateRecord class.
+        """
+        d = self.decode(data)
+        meta = self.decode(d['meta'])
+        return PolicyUpdateRecord(
+            read_policy=meta[DATA_RECORD_READ_POLICY],
+            write_policy=meta[DATA_RECORD_WRITE_POLICY],
+            write_public_key=self.deserialize_public_key(meta[DATA_RECORD_WRITE_PUBLIC_KEY]),
+            encryption_key_read=self.deserialize_abe_ciphertext(meta[DATA_RECORD_ENCRYPTION_KEY_READ]),
+            encryption_key_owner=meta[DATA_RECORD_ENCRYPTION_KEY_OWNER],
+            write_private_key=(
+                self.deserialize_abe_ciphertext(meta[DATA_RECORD_WRITE_SECRET_KEY][0]),
+                meta[DATA_RECORD_WRITE_SECRET_KEY][1]),
+            time_period=meta[DATA_RECORD_TIME_PERIOD],
+            signature=meta[DATA_RECORD_SIGNATURE],
+            info=meta[DATA_RECORD_INFO],
+            data=d['data'],
+            wrapped_data_key=meta[DATA_RECORD_WRAPPED_DATA_KEY]
+        )
+
     def serialize_public_key(self, public_key) -> bytes:
         return self.public_key_scheme.export_key(public_key)
 
@@ -189,13 +348,16 @@ class BaseSerializer(object):
     def deserialize_public_key(self, data: bytes):
         return self.public_key_scheme.import_key(data)
 
+    def deserialize_private_key(self, data: bytes):
+        return self.public_key_scheme.import_key(data)
+
     def serialize_data_record_meta(self, data_record: DataRecord) -> bytes:
         """
         Serialize a data record
         :param data_record:
         :return:
         """
-        return pickle.dumps({
+        return self.encode({
             DATA_RECORD_READ_POLICY: data_record.read_policy,
             DATA_RECORD_WRITE_POLICY: data_record.write_policy,
             DATA_RECORD_OWNER_PUBLIC_KEY: self.serialize_public_key(data_record.owner_public_key),
@@ -207,17 +369,38 @@ class BaseSerializer(object):
             DATA_RECORD_INFO: data_record.info,
             DATA_RECORD_WRITE_SECRET_KEY: (
                 self.serialize_abe_ciphertext(data_record.write_private_key[0]),
-                data_record.write_private_key[1])
+                data_record.write_private_key[1]),
+            DATA_RECORD_WRAPPED_DATA_KEY: data_record.wrapped_data_key
         })
 
-    def deserialize_data_record_meta(self, byte_object: bytes) -> DataRecord:
+    def deserialize_data_record_meta(self, byte_object: bytes, lazy: bool = False) -> DataRecord:
         """
         Deserialize de meta of a data record in a DataRecord instance.
         The data property of the DataRecord is None.
         :param byte_object: The data to deserialize.
+        :param lazy: Whether to return a LazyDataRecord, which only deserializes the public keys and
+        ABE ciphertexts when they are accessed.
         :return: An instance of the DataRecord class.
         """
-        d = pickle.loads(byte_object)
+        d = self.decode(byte_object, lazy_elements=lazy)
+        if lazy:
+            return LazyDataRecord(
+                {
+                    'owner_public_key': lambda: self.deserialize_public_key(d[DATA_RECORD_OWNER_PUBLIC_KEY]),
+                    'write_public_key': lambda: self.deserialize_public_key(d[DATA_RECORD_WRITE_PUBLIC_KEY]),
+                    'encryption_key_read': lambda: self.deserialize_abe_ciphertext(
+                        d[DATA_RECORD_ENCRYPTION_KEY_READ]),
+                    'write_private_key': lambda: (
+                        self.deserialize_abe_ciphertext(d[DATA_RECORD_WRITE_SECRET_KEY][0]),
+                        d[DATA_RECORD_WRITE_SECRET_KEY][1])
+                },
+                read_policy=d[DATA_RECORD_READ_POLICY],
+                write_policy=d[DATA_RECORD_WRITE_POLICY],
+                encryption_key_owner=d[DATA_RECORD_ENCRYPTION_KEY_OWNER],
+                time_period=d[DATA_RECORD_TIME_PERIOD],
+                info=d[DATA_RECORD_INFO],
+                wrapped_data_key=d.get(DATA_RECORD_WRAPPED_DATA_KEY)
+            )
         return DataRecord(
             read_policy=d[DATA_RECORD_READ_POLICY],
             write_policy=d[DATA_RECORD_WRITE_POLICY],
@@ -231,7 +414,8 @@ class BaseSerializer(object):
                 d[DATA_RECORD_WRITE_SECRET_KEY][1]),
             time_period=d[DATA_RECORD_TIME_PERIOD],
             info=d[DATA_RECORD_INFO],
-            data=None
+            data=None,
+            wrapped_data_key=d.get(DATA_RECORD_WRAPPED_DATA_KEY)
         )
 
     def serialize_authority_public_keys(self, public_keys: AuthorityPublicKeysStore) -> bytes:
@@ -0,0 +1,165 @@
+import base64
+from collections import namedtuple
+from struct import pack, unpack_from
+from typing import Any, Tuple
+
+from charm.core.math.pairing import pc_element
+from charm.toolbox.pairinggroup import PairingGroup
+
+BINARY_MAGIC = b'ABEB'
+"""Prefix of all data encoded in the binary format, used to distinguish it from pickled data."""
+BINARY_VERSION = 1
+"""Version of the binary format. Data encoded with a newer version can not be decoded."""
+
+TAG_NONE = b'N'
+TAG_TRUE = b'T'
+TAG_FALSE = b'F'
+TAG_INT = b'i'
+TAG_BYTES = b'b'
+TAG_STR = b's'
+TAG_LIST = b'l'
+TAG_TUPLE = b't'
+TAG_DICT = b'd'
+TAG_ELEMENT = b'e'
+
+EncodedElement = namedtuple('EncodedElement', ['element_type', 'data'])
+"""A group element which is not yet deserialized, see decode_element."""
+
+
+def is_binary(data: bytes) -> bool:
+    """
+    Check whether the data is encoded in the binary format.
+    :param data: The data to check
+    :return: True if the data starts with the binary format prefix
+
+    >>> is_binary(encode({'a': 1}, None))
+    True
+    >>> import pickle
+    >>> is_binary(pickle.dumps({'a': 1}))
+    False
+    """
+    return data[:len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+def encode(value: Any, group: PairingGroup) -> bytes:
+    """
+    Encode a value in the versioned binary format. Supported are None, booleans, integers, bytes, strings,
+    lists, tuples, dicts and pairing group elements. Each variable sized value is prefixed with its length.
+    Group elements are stored as their raw compressed encoding, instead of the base64 encoding of group.serialize.
+    :param value: The value to encode
+    :param group: The pairing group of the elements in the value
+    :return: The encoded value
+
+    >>> value = {'p': 'A AND B', 1: [b'data', -300, None], 'x': (True, False)}
+    >>> decode(encode(value, None), None) == value
+    True
+    """
+    parts = [BINARY_MAGIC, pack('>B', BINARY_VERSION)]
+    _encode_value(value, group, parts)
+    return b''.join(parts)
+
+
+def decode(data: bytes, group: PairingGroup, lazy_elements: bool = False) -> Any:
+    """
+    Decode a value encoded with encode.
+    :param data: The encoded value
+    :param group: The pairing group of the elements in the value
+    :param lazy_elements: Whether to leave the group elements encoded, as EncodedElement, so they can be
+    deserialized later using decode_element
+    :raise ValueError: When the data is not encoded in a supported version of the binary format
+    :return: The decoded value
+    """
+    if not is_binary(data):
+        raise ValueError('Data is not encoded in the binary format')
+    version, = unpack_from('>B', data, len(BINARY_MAGIC))
+    if version > BINARY_VERSION:
+        raise ValueError('Unsupported binary format version %d' % version)
+    value, position = _decode_value(memoryview(data), len(BINARY_MAGIC) + 1, group, lazy_elements)
+    if position != len(data):
+        raise ValueError('Unexpected data after the encoded value')
+    return value
+
+
+def _encode_value(value: Any, group: PairingGroup, parts: list) -> None:
+    if value is None:
+        parts.append(TAG_NONE)
+    elif value is True:
+        parts.append(TAG_TRUE)
+    elif value is False:
+        parts.append(TAG_FALSE)
+    elif isinstance(value, int):
+        data = value.to_bytes((value.bit_length() + 8) // 8, 'big', signed=True)
+        parts.extend((TAG_INT, pack('>I', len(data)), data))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        parts.extend((TAG_BYTES, pack('>I', len(value)), bytes(value)))
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        parts.extend((TAG_STR, pack('>I', len(data)), data))
+    elif isinstance(value, (list, tuple)):
+        parts.extend((TAG_LIST if isinstance(value, list) else TAG_TUPLE, pack('>I', len(value))))
+        for item in value:
+            _encode_value(item, group, parts)
+    elif isinstance(value, dict):
+        parts.extend((TAG_DICT, pack('>I', len(value))))
+        for key, item in value.items():
+            _encode_value(key, group, parts)
+            _encode_value(item, group, parts)
+    elif isinstance(value, pc_element):
+        element_type, encoded = group.serialize(value).split(b':', 1)
+        data = base64.b64decode(encoded)
+        parts.extend((TAG_ELEMENT, pack('>BI', int(element_type), len(data)), data))
+    else:
+        raise TypeError('Can not encode value of type %s' % type(value).__name__)
+
+
+def decode_element(element: EncodedElement, group: PairingGroup) -> Any:
+    """
+    Deserialize a group element which is left encoded by decode.
+    :param element: The encoded element
+    :param group: The pairing group of the element
+    :return: The element
+    """
+    return group.deserialize(b'%d:%s' % (element.element_type, base64.b64encode(element.data)))
+
+
+def _decode_value(data: memoryview, position: int, group: PairingGroup, lazy_elements: bool) -> Tuple[Any, int]:
+    tag = bytes(data[position:position + 1])
+    position += 1
+    if tag == TAG_NONE:
+        return None, position
+    if tag == TAG_TRUE:
+        return True, position
+    if tag == TAG_FALSE:
+        return False, position
+    if tag == TAG_ELEMENT:
+        element_type, length = unpack_from('>BI', data, position)
+        position += 5
+        element = EncodedElement(element_type, _read(data, position, length))
+        return (element if lazy_elements else decode_element(element, group)), position + length
+    length, = unpack_from('>I', data, position)
+    position += 4
+    if tag == TAG_INT:
+        return int.from_bytes(_read(data, position, length), 'big', signed=True), position + length
+    if tag == TAG_BYTES:
+        return _read(data, position, length), position + length
+    if tag == TAG_STR:
+        return _read(data, position, length).decode('utf-8'), position + length
+    if tag == TAG_LIST or tag == TAG_TUPLE:
+        items = list()
+        for _ in range(length):
+            item, position = _decode_value(data, position, group, lazy_elements)
+            items.append(item)
+        return (items if tag == TAG_LIST else tuple(items)), position
+    if tag == TAG_DICT:
+        result = dict()
+        for _ in range(length):
+            key, position = _decode_value(data, position, group, lazy_elements)
+            result[key], position = _decode_value(data, position, group, lazy_elements)
+        return result, position
+    raise ValueError('Unknown tag %r' % tag)
+
+
+def _read(data: memoryview, position: int, length: int) -> bytes:
+    if position + length > len(data):
+        raise ValueError('Unexpected end of data')
+    return bytes(data[position:position + length])
@@ -1,11 +1,16 @@
+from typing import Any, Iterator
+
 from Crypto import Random
 from Crypto.Cipher import AES
 
 from shared.implementations.symmetric_key.base_symmetric_key import BaseSymmetricKey
-from shared.utils.data_util import pad_data_pksc5, unpad_data_pksc5
+from shared.utils.data_util import pad_data_pksc5, unpad_data_pksc5, iterate_chunks, CHUNK_SIZE
 
 
 class AESSymmetricKey(BaseSymmetricKey):
+    def __init__(self, chunk_size: int = CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+
     def ske_key_size(self):
         """
         Get the size of the key to use in the symmetric key encryption scheme of this implementation.
@@ -45,3 +50,89 @@ class AESSymmetricKey(BaseSymmetricKey):
         iv = ciphertext[:AES.block_size]
         decryption = AES.new(key, AES.MODE_CBC, iv)
         return unpad_data_pksc5(decryption.decrypt(ciphertext[AES.block_size:]))
+
+    def ske_decrypt_buffer(self, ciphertext: memoryview, key: bytes) -> bytearray:
+        """
+        Decrypt a ciphertext in a buffer into a single, preallocated output buffer. The ciphertext is decrypted
+        in chunks directly from the buffer, and the padding is removed by truncating the output, so the ciphertext
+        is never copied as a whole.
+        :param ciphertext: The ciphertext to decrypt, a bytes-like object like a memory-mapped file.
+        :param key: The key to use.
+        :return: The plaintext.
+
+        >>> i = AESSymmetricKey(chunk_size=20)
+        >>> m = b'Hello world, how are you?'
+        >>> c = i.ske_encrypt(m, b'a'*i.ske_key_size())
+        >>> i.ske_decrypt_buffer(memoryview(c), b'a'*i.ske_key_size()) == m
+        True
+        """
+        ciphertext = memoryview(ciphertext)
+        if len(ciphertext) < 2 * AES.block_size or len(ciphertext) % AES.block_size != 0:
+            raise ValueError('Ciphertext length is not a multiple of the block size')
+        decryption = AES.new(key, AES.MODE_CBC, bytes(ciphertext[:AES.block_size]))
+        body = ciphertext[AES.block_size:]
+        output = bytearray(len(body))
+        step = max(self.chunk_size - self.chunk_size % AES.block_size, AES.block_size)
+        for offset in range(0, len(body), step):
+            chunk = body[offset:offset + step]
+            # PyCrypto only accepts read-only buffers
+            output[offset:offset + len(chunk)] = decryption.decrypt(chunk if chunk.readonly else bytes(chunk))
+        del output[len(output) - output[-1]:]
+        return output
+
+    def ske_encrypt_stream(self, message: Any, key: bytes) -> Iterator[bytes]:
+        """
+        Encrypt the message using symmetric key encryption, in chunks. The concatenation of the resulting chunks
+        equals the output of ske_encrypt, so at most a single chunk of the message is in memory at any time.
+        :param message: The message to encrypt. Either bytes, a file-like object or an iterable of bytes.
+        :param key: The key to use in the encryption.
+        :return: A generator yielding the chunks of the encrypted message.
+
+        >>> i = AESSymmetricKey(chunk_size=4)
+        >>> c = b''.join(i.ske_encrypt_stream(b'Hello world', b'a'*i.ske_key_size()))
+        >>> i.ske_decrypt(c, b'a'*i.ske_key_size()) == b'Hello world'
+        True
+        """
+        iv = Random.new().read(AES.block_size)
+        encryption = AES.new(key, AES.MODE_CBC, iv)
+        yield iv
+        remainder = b''
+        for chunk in iterate_chunks(message, self.chunk_size):
+            data = remainder + chunk
+            # Only encrypt whole blocks, the remainder is prepended to the next chunk
+            end = len(data) - len(data) % AES.block_size
+            if end > 0:
+                yield encryption.encrypt(data[:end])
+            remainder = data[end:]
+        yield encryption.encrypt(pad_data_pksc5(remainder, AES.block_size))
+
+    def ske_decrypt_stream(self, ciphertext: Any, key: bytes) -> Iterator[bytes]:
+        """
+        Decrypt a ciphertext encrypted using symmetric key encryption of this implementation, in chunks.
+        :param ciphertext: The ciphertext to decrypt. Either bytes, a file-like object or an iterable of bytes.
+        :param key: The key to use.
+        :return: A generator yielding the chunks of the plaintext.
+
+        >>> i = AESSymmetricKey(chunk_size=4)
+        >>> m = b'Hello world'
+        >>> c = i.ske_encrypt(m, b'a'*i.ske_key_size())
+        >>> b''.join(i.ske_decrypt_stream(c, b'a'*i.ske_key_size())) == m
+        True
+        """
+        decryption = None
+        buffer = b''
+        for chunk in iterate_chunks(ciphertext, self.chunk_size):
+            buffer += chunk
+            if decryption is None:
+                if len(buffer) < AES.block_size:
+                    continue
+                decryption = AES.new(key, AES.MODE_CBC, buffer[:AES.block_size])
+                buffer = buffer[AES.block_size:]
+            # Always keep the last block, as it contains the padding which has to be removed
+            end = ((len(buffer) - 1) // AES.block_size) * AES.block_size
+            if end > 0:
+                yield decryption.decrypt(buffer[:end])
+                buffer = buffer[end:]
+        if decryption is None:
+            raise ValueError('Ciphertext does not contain an initialization vector')
+        yield unpad_data_pksc5(decryption.decrypt(buffer))
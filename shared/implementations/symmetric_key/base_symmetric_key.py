@@ -1,3 +1,6 @@
+from typing import Any, Iterator
+
+
 class BaseSymmetricKey(object):
     def ske_key_size(self):
         """
@@ -23,3 +26,47 @@ class BaseSymmetricKey(object):
         :return: The plaintext, or some random bytes.
         """
         raise NotImplementedError()
+
+    def ske_encrypt_stream(self, message: Any, key: bytes) -> Iterator[bytes]:
+        """
+        Encrypt the message using symmetric key encryption, in chunks. The concatenation of the resulting chunks
+        equals the output of ske_encrypt.
+        :param message: The message to encrypt. Either bytes, a file-like object or an iterable of bytes.
+        :param key: The key to use in the encryption.
+        :return: A generator yielding the chunks of the encrypted message.
+        """
+        raise NotImplementedError()
+
+    def ske_decrypt_stream(self, ciphertext: Any, key: bytes) -> Iterator[bytes]:
+        """
+        Decrypt a ciphertext encrypted using symmetric key encryption of this implementation, in chunks.
+        :param ciphertext: The ciphertext to decrypt. Either bytes, a file-like object or an iterable of bytes.
+        :param key: The key to use.
+        :return: A generator yielding the chunks of the plaintext.
+        """
+        raise NotImplementedError()
+
+    def ske_decrypt_buffer(self, ciphertext: memoryview, key: bytes) -> bytearray:
+        """
+        Decrypt a ciphertext in a buffer (like a memory-mapped file) into a single output buffer. Implementations
+        should avoid copying the ciphertext, so the output buffer is the only large allocation.
+        :param ciphertext: The ciphertext to decrypt, a bytes-like object.
+        :param key: The key to use.
+        :return: The plaintext.
+        """
+        output = bytearray()
+        for chunk in self.ske_decrypt_stream(ciphertext, key):
+            output += chunk
+        return output
+
+    def ske_decrypt_range(self, ciphertext: Any, key: bytes, offset: int, length: int) -> bytes:
+        """
+        Decrypt a range of the plaintext, without decrypting the whole ciphertext. Only supported by schemes with
+        a seekable ciphertext format.
+        :param ciphertext: The ciphertext. Either bytes or an object supporting len and read_range.
+        :param key: The key to use.
+        :param offset: The offset in the plaintext of the range to decrypt.
+        :param length: The length of the range to decrypt.
+        :return: The plaintext of the range.
+        """
+        raise NotImplementedError()
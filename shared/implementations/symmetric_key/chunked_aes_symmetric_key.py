@@ -0,0 +1,353 @@
+import hashlib
+import hmac
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from struct import pack, unpack, calcsize
+from typing import Any, Callable, Iterator, Iterable, Tuple
+
+from Crypto import Random
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+
+from shared.exception.ciphertext_integrity_exception import CiphertextIntegrityException
+from shared.implementations.symmetric_key.base_symmetric_key import BaseSymmetricKey
+from shared.utils.data_util import iterate_chunks, read_range, CHUNK_SIZE
+
+CHUNKED_MAGIC = b'CAE1'
+HEADER_FORMAT = '>4sI8s'
+HEADER_SIZE = calcsize(HEADER_FORMAT)
+NONCE_SIZE = 8
+TAG_SIZE = 16
+
+
+def derive_keys(key: bytes) -> Tuple[bytes, bytes]:
+    """
+    Derive the encryption key and the authentication key from the given key.
+    :param key: The symmetric key
+    :return: encryption key, authentication key
+    """
+    return hmac.new(key, b'encryption', hashlib.sha256).digest(), \
+           hmac.new(key, b'authentication', hashlib.sha256).digest()
+
+
+def block_tag(authentication_key: bytes, header: bytes, index: int, is_last: bool, ciphertext: bytes) -> bytes:
+    """
+    Calculate the authentication tag of a single block. The tag covers the header, the position of the block and
+    whether it is the last block, so blocks can not be reordered, removed or truncated unnoticed.
+    """
+    mac = hmac.new(authentication_key, header, hashlib.sha256)
+    mac.update(pack('>QB', index, is_last))
+    mac.update(ciphertext)
+    return mac.digest()[:TAG_SIZE]
+
+
+def block_cipher(encryption_key: bytes, nonce: bytes, index: int, block_size: int) -> Any:
+    """
+    Create the AES-CTR cipher for the block with the given index. The counter of each block starts where the
+    counter of the previous block ended, so the whole ciphertext is a single CTR keystream.
+    """
+    counter = Counter.new(64, prefix=nonce, initial_value=index * (block_size // AES.block_size))
+    return AES.new(encryption_key, AES.MODE_CTR, counter=counter)
+
+
+def encrypt_block(encryption_key: bytes, authentication_key: bytes, header: bytes, index: int, is_last: bool,
+                  plaintext: bytes) -> bytes:
+    """
+    Encrypt and authenticate a single block.
+    :return: The ciphertext of the block followed by its tag
+    """
+    nonce = header[-NONCE_SIZE:]
+    block_size = unpack(HEADER_FORMAT, header)[1]
+    ciphertext = block_cipher(encryption_key, nonce, index, block_size).encrypt(plaintext)
+    return ciphertext + block_tag(authentication_key, header, index, is_last, ciphertext)
+
+
+def decrypt_block(encryption_key: bytes, authentication_key: bytes, header: bytes, index: int, is_last: bool,
+                  block: bytes) -> bytes:
+    """
+    Verify and decrypt a single block.
+    :raise shared.exception.ciphertext_integrity_exception.CiphertextIntegrityException
+    :return: The plaintext of the block
+    """
+    ciphertext, tag = block[:-TAG_SIZE], block[-TAG_SIZE:]
+    if len(tag) != TAG_SIZE or not hmac.compare_digest(
+            tag, block_tag(authentication_key, header, index, is_last, ciphertext)):
+        raise CiphertextIntegrityException('Block %d failed authentication' % index)
+    nonce = header[-NONCE_SIZE:]
+    block_size = unpack(HEADER_FORMAT, header)[1]
+    return block_cipher(encryption_key, nonce, index, block_size).decrypt(ciphertext)
+
+
+def split_blocks(data: Any, block_size: int) -> Iterator[Tuple[int, bytes, bool]]:
+    """
+    Split (chunked) data in blocks of the given size.
+    :param data: The data to split, see shared.utils.data_util.iterate_chunks
+    :param block_size: The size of the blocks
+    :return: A generator yielding index, block, is_last. At least one (possibly empty) block is yielded.
+
+    >>> list(split_blocks([b'Hello', b' world'], 4))
+    [(0, b'Hell', False), (1, b'o wo', False), (2, b'rld', True)]
+    >>> list(split_blocks(b'', 4))
+    [(0, b'', True)]
+    """
+    index = 0
+    buffer = b''
+    for chunk in iterate_chunks(data, block_size):
+        buffer += chunk
+        # A full block is only yielded when more data follows, as the last block is authenticated differently
+        while len(buffer) > block_size:
+            yield index, buffer[:block_size], False
+            buffer = buffer[block_size:]
+            index += 1
+    yield index, buffer, True
+
+
+class ChunkedAESSymmetricKey(BaseSymmetricKey):
+    """
+    Symmetric key encryption which splits the data in independently encrypted and authenticated blocks, so
+    ranges of the plaintext can be decrypted without decrypting the whole ciphertext.
+
+    The ciphertext consists of a header (magic, block size and nonce) followed by the blocks. Each block is
+    encrypted using AES-CTR and followed by a truncated HMAC-SHA256 tag. As all blocks except the last one have the
+    same size, the position of each block follows from the header, which acts as the index of the ciphertext.
+
+    As the blocks are independent, they can be encrypted and decrypted in parallel. When more than one worker is
+    configured, the blocks are spread over a process pool (or the given executor). The output does not depend on
+    the amount of workers.
+    """
+
+    def __init__(self, block_size: int = CHUNK_SIZE, workers: int = 1, executor: Executor = None,
+                 max_in_flight: int = None) -> None:
+        """
+        :param block_size: The size of the plaintext blocks, a multiple of the AES block size.
+        :param workers: The amount of worker processes to use. When an executor is given, this should be the amount of
+        workers of that executor, as it determines the default max_in_flight.
+        :param executor: The executor to encrypt and decrypt the blocks with. When None and workers is larger than 1,
+        a process pool with the given amount of workers is created when it is first needed. A given executor is not
+        shut down by close.
+        :param max_in_flight: The maximum amount of blocks submitted to the executor at any time. Defaults to twice
+        the amount of workers.
+        """
+        assert block_size % AES.block_size == 0, 'The block size should be a multiple of the AES block size'
+        assert max_in_flight is None or max_in_flight > 0, 'At least one block should be in flight'
+        self.block_size = block_size
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self._executor = executor  # type: Executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self) -> Executor:
+        """
+        Gets the executor to process the blocks with, or None when the blocks are processed sequentially.
+        """
+        if self._executor is None and self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    @property
+    def window(self) -> int:
+        """
+        Gets the maximum amount of blocks submitted to the executor at any time.
+        """
+        if self.max_in_flight is not None:
+            return self.max_in_flight
+        return 2 * max(self.workers, 1)
+
+    def close(self) -> None:
+        """
+        Shut down the executor, if it was created by this scheme.
+        """
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _map_blocks(self, function: Callable[..., bytes], encryption_key: bytes, authentication_key: bytes,
+                    header: bytes, blocks: Iterable[Tuple[int, bytes, bool]]) -> Iterator[bytes]:
+        """
+        Apply the block function to all blocks, possibly in parallel. The results are yielded in the order of the
+        blocks. At most a few blocks per worker are in progress at any time (see window), so streams are not read as a
+        whole.
+        :param function: The function to apply, either encrypt_block or decrypt_block
+        :param blocks: The blocks, as tuples of index, block, is_last
+        :return: A generator yielding the results
+        """
+        executor = self.executor
+        if executor is None:
+            for index, block, is_last in blocks:
+                yield function(encryption_key, authentication_key, header, index, is_last, block)
+            return
+        pending = deque()  # type: deque
+        window = self.window
+        for index, block, is_last in blocks:
+            pending.append(executor.submit(function, encryption_key, authentication_key, header, index, is_last,
+                                           block))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def ske_key_size(self):
+        """
+        Get the size of the key to use in the symmetric key encryption scheme of this implementation.
+        :return:
+        """
+        return 32
+
+    def ske_encrypt(self, message: bytes, key: bytes) -> bytes:
+        """
+        Encrypt the message using symmetric key encryption.
+        :param message: The message to encrypt.
+        :param key: The key to use in the encryption.
+        :return: The encrypted message
+
+        >>> i = ChunkedAESSymmetricKey(block_size=16)
+        >>> c = i.ske_encrypt(b'Hello world, how are you?', b'a'*i.ske_key_size())
+        >>> i.ske_decrypt(c, b'a'*i.ske_key_size()) == b'Hello world, how are you?'
+        True
+        """
+        return b''.join(self.ske_encrypt_stream(message, key))
+
+    def ske_decrypt(self, ciphertext: bytes, key: bytes) -> bytes:
+        """
+        Decrypt a ciphertext encrypted using symmetric key encryption of this implementation.
+        :param ciphertext: The ciphertext to decrypt.
+        :param key: The key to use.
+        :raise shared.exception.ciphertext_integrity_exception.CiphertextIntegrityException
+        :return: The plaintext.
+        """
+        return b''.join(self.ske_decrypt_stream(ciphertext, key))
+
+    def ske_encrypt_stream(self, message: Any, key: bytes) -> Iterator[bytes]:
+        """
+        Encrypt the message using symmetric key encryption, in chunks.
+        :param message: The message to encrypt. Either bytes, a file-like object or an iterable of bytes.
+        :param key: The key to use in the encryption.
+        :return: A generator yielding the header followed by the encrypted blocks.
+        """
+        encryption_key, authentication_key = derive_keys(key)
+        header = pack(HEADER_FORMAT, CHUNKED_MAGIC, self.block_size, Random.new().read(NONCE_SIZE))
+        yield header
+        for block in self._map_blocks(encrypt_block, encryption_key, authentication_key, header,
+                                      split_blocks(message, self.block_size)):
+            yield block
+
+    def ske_decrypt_stream(self, ciphertext: Any, key: bytes) -> Iterator[bytes]:
+        """
+        Decrypt a ciphertext encrypted using symmetric key encryption of this implementation, in chunks.
+        :param ciphertext: The ciphertext to decrypt. Either bytes, a file-like object or an iterable of bytes.
+        :param key: The key to use.
+        :raise shared.exception.ciphertext_integrity_exception.CiphertextIntegrityException
+        :return: A generator yielding the decrypted blocks.
+        """
+        encryption_key, authentication_key = derive_keys(key)
+        chunks = iterate_chunks(ciphertext, self.block_size)
+        header = b''
+        for chunk in chunks:
+            header += chunk
+            if len(header) >= HEADER_SIZE:
+                break
+        header, remainder = header[:HEADER_SIZE], header[HEADER_SIZE:]
+        block_size = self._parse_header(header)
+
+        def blocks():
+            yield remainder
+            for c in chunks:
+                yield c
+
+        for block in self._map_blocks(decrypt_block, encryption_key, authentication_key, header,
+                                      split_blocks(blocks(), block_size + TAG_SIZE)):
+            yield block
+
+    def ske_decrypt_buffer(self, ciphertext: memoryview, key: bytes) -> bytearray:
+        """
+        Decrypt a ciphertext in a buffer into a single output buffer. As the size of the plaintext follows from the
+        header, the output is allocated once and the blocks are decrypted directly from slices of the buffer.
+        :param ciphertext: The ciphertext to decrypt, a bytes-like object like a memory-mapped file.
+        :param key: The key to use.
+        :raise shared.exception.ciphertext_integrity_exception.CiphertextIntegrityException
+        :return: The plaintext.
+
+        >>> i = ChunkedAESSymmetricKey(block_size=16)
+        >>> c = i.ske_encrypt(b'Hello world, how are you?', b'a'*i.ske_key_size())
+        >>> i.ske_decrypt_buffer(memoryview(c), b'a'*i.ske_key_size()) == b'Hello world, how are you?'
+        True
+        """
+        ciphertext = memoryview(ciphertext)
+        block_size = self._parse_header(bytes(ciphertext[:HEADER_SIZE]))
+        _, plaintext_size = self._block_layout(len(ciphertext), block_size)
+        output = bytearray(plaintext_size)
+        offset = 0
+        for block in self.ske_decrypt_stream(ciphertext, key):
+            output[offset:offset + len(block)] = block
+            offset += len(block)
+        return output
+
+    def ske_decrypt_range(self, ciphertext: Any, key: bytes, offset: int, length: int) -> bytes:
+        """
+        Decrypt a range of the plaintext. Only the blocks containing the range are read, verified and decrypted.
+        :param ciphertext: The ciphertext. Either bytes or an object supporting len and read_range,
+        see shared.utils.data_util.read_range.
+        :param key: The key to use.
+        :param offset: The offset in the plaintext of the range to decrypt.
+        :param length: The length of the range to decrypt.
+        :raise shared.exception.ciphertext_integrity_exception.CiphertextIntegrityException
+        :return: The plaintext of the range. This is shorter than length when the range exceeds the plaintext.
+
+        >>> i = ChunkedAESSymmetricKey(block_size=16)
+        >>> c = i.ske_encrypt(b'Hello world, how are you?', b'a'*i.ske_key_size())
+        >>> i.ske_decrypt_range(c, b'a'*i.ske_key_size(), 6, 12) == b'world, how a'
+        True
+        >>> i.ske_decrypt_range(c, b'a'*i.ske_key_size(), 20, 100) == b' you?'
+        True
+        """
+        encryption_key, authentication_key = derive_keys(key)
+        header = read_range(ciphertext, 0, HEADER_SIZE)
+        block_size = self._parse_header(header)
+        encrypted_block_size = block_size + TAG_SIZE
+        amount_of_blocks, plaintext_size = self._block_layout(len(ciphertext), block_size)
+
+        end = min(offset + length, plaintext_size)
+        if offset >= end:
+            return b''
+        first_block = offset // block_size
+        last_block = (end - 1) // block_size
+        data = read_range(ciphertext, HEADER_SIZE + first_block * encrypted_block_size,
+                          (last_block - first_block + 1) * encrypted_block_size)
+        blocks = (
+            (index,
+             data[(index - first_block) * encrypted_block_size:(index - first_block + 1) * encrypted_block_size],
+             index == amount_of_blocks - 1)
+            for index in range(first_block, last_block + 1))
+        result = b''.join(self._map_blocks(decrypt_block, encryption_key, authentication_key, header, blocks))
+        start = offset - first_block * block_size
+        return result[start:start + end - offset]
+
+    @staticmethod
+    def _block_layout(ciphertext_size: int, block_size: int) -> Tuple[int, int]:
+        """
+        Calculate the amount of blocks and the size of the plaintext of a ciphertext.
+        :param ciphertext_size: The size of the ciphertext, including the header
+        :param block_size: The block size of the ciphertext
+        :return: amount of blocks, plaintext size
+        """
+        # All blocks have the same size, except the last block which contains at least the tag
+        blocks_size = ciphertext_size - HEADER_SIZE
+        if blocks_size < TAG_SIZE:
+            raise CiphertextIntegrityException('Ciphertext is truncated')
+        amount_of_blocks = (blocks_size - TAG_SIZE) // (block_size + TAG_SIZE) + 1
+        return amount_of_blocks, blocks_size - amount_of_blocks * TAG_SIZE
+
+    @staticmethod
+    def _parse_header(header: bytes) -> int:
+        """
+        Parse the header of a ciphertext.
+        :param header: The header
+        :return: The block size of the ciphertext
+        """
+        if len(header) != HEADER_SIZE:
+            raise CiphertextIntegrityException('Ciphertext is truncated')
+        magic, block_size, _ = unpack(HEADER_FORMAT, header)
+        if magic != CHUNKED_MAGIC or block_size == 0 or block_size % AES.block_size != 0:
+            raise CiphertextIntegrityException('Ciphertext is not in the chunked format')
+        return block_size
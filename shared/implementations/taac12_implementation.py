@@ -1,19 +1,27 @@
-from typing import Dict, Any
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
 
-from authority.attribute_authority import AttributeAuthority
+from authority.attribute_authority import AttributeAuthority, KeygenRequest
 from charm.schemes.abenc.abenc_taac_ylcwr12 import Taac
 from charm.toolbox.pairinggroup import G1, PairingGroup
-from charm.toolbox.secretutil import SecretUtil
 from service.central_authority import CentralAuthority
 from shared.connection.user_attribute_authority_connection import UserAttributeAuthorityConnection
 from shared.exception.policy_not_satisfied_exception import PolicyNotSatisfiedException
 from shared.implementations.base_implementation import BaseImplementation, SecretKeyStore, AbeEncryption
+from shared.implementations.public_key.base_public_key import BasePublicKey
 from shared.implementations.serializer.base_serializer import BaseSerializer
 from shared.model.global_parameters import GlobalParameters
 from shared.model.types import AuthorityPublicKeysStore
 from shared.utils.dict_utils import merge_dicts
+from shared.utils.policy_cache import CachingSecretUtil
+from shared.utils.precomputation_util import precompute_fixed_bases
 
 BINARY_TREE_HEIGHT = 5
+UPDATE_KEYS_CACHE_SIZE = 4
+"""The amount of time periods of which the update keys are kept in memory. Older update keys are loaded from disk."""
+UPDATE_KEYS_FILENAME = '%s_update_keys_%d.dat'
 
 
 class TAAC12Implementation(BaseImplementation):
@@ -26,10 +34,10 @@ class TAAC12Implementation(BaseImplementation):
     """
 
     decryption_keys_required = True
+    uses_update_keys = True
 
     def __init__(self, group: PairingGroup = None) -> None:
         super().__init__(group)
-        self._serializer = None  # type: BaseSerializer
 
     def get_name(self):
         return "TAAC"
@@ -46,9 +54,12 @@ class TAAC12Implementation(BaseImplementation):
             self._serializer = TAAC12Serializer(self.group, self.public_key_scheme)
         return self._serializer
 
+    def create_scheme(self) -> Taac:
+        return Taac(self.group)
+
     def abe_encrypt(self, global_parameters: GlobalParameters, public_keys: Dict[str, Any], message: bytes,
                     policy: str, time_period: int) -> AbeEncryption:
-        taac = Taac(self.group)
+        taac = self.scheme
         return taac.encrypt(global_parameters.scheme_parameters, public_keys, message, policy, time_period)
 
     def decryption_keys(self, global_parameters: GlobalParameters,
@@ -56,15 +67,19 @@ class TAAC12Implementation(BaseImplementation):
                         secret_keys: SecretKeyStore,
                         registration_data: Any, ciphertext: AbeEncryption, time_period: int):
         update_keys = []
-        taac = Taac(self.group)
+        taac = self.scheme
         for authority_name in authorities:
             update_keys.append(authorities[authority_name].request_update_keys(time_period))
         merged_update_keys = Taac.merge_timed_keys(*update_keys)
         return taac.decryption_keys_computation(secret_keys, merged_update_keys)
 
+    def decryption_keys_cache_key(self, ciphertext: AbeEncryption, time_period: int) -> Any:
+        # The decryption keys only depend on the update keys of the time period
+        return time_period
+
     def abe_decrypt(self, global_parameters: GlobalParameters, secret_keys: SecretKeyStore, gid: str,
                     ciphertext: AbeEncryption, registration_data) -> bytes:
-        taac = Taac(self.group)
+        taac = self.scheme
         try:
             return taac.decrypt(global_parameters.scheme_parameters, secret_keys, ciphertext, gid)
         except Exception:
@@ -97,13 +112,14 @@ class TAAC12CentralAuthority(CentralAuthority):
     def central_setup(self):
         taac = Taac(self.global_parameters.group)
         self.global_parameters.scheme_parameters = taac.setup()
+        precompute_fixed_bases(self.global_parameters.scheme_parameters)
         return self.global_parameters
 
 
 class TAAC12AttributeAuthority(AttributeAuthority):
     def __init__(self, name: str, serializer: BaseSerializer, storage_path: str = None) -> None:
         super().__init__(name, serializer, storage_path=storage_path)
-        self._update_keys = {}  # type: dict
+        self._update_keys = OrderedDict()  # type: OrderedDict
 
     def setup(self, central_authority, attributes, time_period):
         self.global_parameters = central_authority.global_parameters
@@ -112,6 +128,8 @@ class TAAC12AttributeAuthority(AttributeAuthority):
         self._secret_keys = dict()
         self._public_keys, self._secret_keys['secret'], self._secret_keys['states'] = taac.authsetup(
             central_authority.global_parameters.scheme_parameters, attributes, BINARY_TREE_HEIGHT)
+        precompute_fixed_bases(self._public_keys)
+        self.clear_update_keys()
 
     @property
     def states(self):
@@ -126,22 +144,122 @@ class TAAC12AttributeAuthority(AttributeAuthority):
                            self.states, gid,
                            attributes)
 
+    def _keygen_batch(self, requests: List[KeygenRequest]) -> List[Any]:
+        # The secret keys and states do not depend on the time period
+        taac = Taac(self.global_parameters.group)
+        secret_keys = self._secret_keys['secret']
+        states = self.states
+        return [taac.keygen(self.global_parameters.scheme_parameters, secret_keys, states, request['gid'],
+                            request['attributes'])
+                for request in requests]
+
     def update_keys(self, time_period: int) -> Any:
-        if time_period not in self._update_keys:
-            self.generate_update_keys(time_period)
-        return self._update_keys[time_period]
+        """
+        Gets the update keys of a time period. The update keys are only generated for the attributes of which the
+        revoked users changed since the update keys were last generated (see RevocationIndex.version), the update
+        keys of the other attributes are reused. The update keys of the most recent time periods are cached in
+        memory, and all update keys are persisted in the storage path.
+        :param time_period: The time period
+        :return: The update keys
+        """
+        while True:
+            with self._keys_lock:
+                versions = self._update_keys_versions(time_period)
+                entry = self._update_keys.get(time_period)
+                if entry is not None and entry['versions'] == versions:
+                    self._update_keys.move_to_end(time_period)
+                    return entry['keys']
+            # The pairings and the storage access happen outside of the lock, so that the other keys of this
+            # authority remain available in the meantime
+            if entry is None:
+                entry = self.load_update_keys(time_period)
+            if entry is None:
+                entry = {'keys': dict(), 'versions': dict()}
+            changed = [attribute for attribute in self.attributes
+                       if entry['versions'].get(attribute) != versions[attribute]]
+            if len(changed) > 0:
+                # Replace instead of update the keys, as they might be in use by a previous caller
+                keys = dict(entry['keys'])
+                keys.update(self.generate_update_keys(time_period, changed))
+                entry = {
+                    'keys': keys,
+                    'versions': dict(entry['versions'], **{attribute: versions[attribute] for attribute in changed})
+                }
+                self.save_update_keys(time_period, entry)
+            with self._keys_lock:
+                # Retry if attributes were revoked while generating, as the keys might not reflect that yet
+                if self._update_keys_versions(time_period) != versions:
+                    continue
+                current = self._update_keys.get(time_period)
+                if current is not None and current['versions'] == versions:
+                    # Another caller installed equivalent keys in the meantime, keep returning the same keys
+                    entry = current
+                self._update_keys[time_period] = entry
+                self._update_keys.move_to_end(time_period)
+                while len(self._update_keys) > UPDATE_KEYS_CACHE_SIZE:
+                    self._update_keys.popitem(last=False)
+                return entry['keys']
+
+    def _update_keys_versions(self, time_period: int) -> Dict[str, Tuple[str, int]]:
+        """
+        Gets the revocation versions of all attributes of this authority in a time period.
+        :param time_period: The time period
+        :return: The versions of the attributes
+        """
+        return {attribute: self.revocation_index.version(attribute, time_period) for attribute in self.attributes}
 
-    def generate_update_keys(self, time_period: int) -> dict:
+    def generate_update_keys(self, time_period: int, attributes: List[str] = None) -> dict:
+        """
+        Generate the update keys of a time period.
+        :param time_period: The time period
+        :param attributes: The attributes to generate the update keys for, defaults to all attributes
+        :return: The update keys of the attributes
+        """
         taac = Taac(self.global_parameters.group)
         revocation_list = self.revocation_list_for_time_period(time_period)
-        self._update_keys[time_period] = taac.generate_update_keys(self.global_parameters.scheme_parameters,
-                                                                   self.public_keys(time_period),
-                                                                   self.secret_keys(time_period),
-                                                                   self.states, revocation_list,
-                                                                   time_period, self.attributes)
+        return taac.generate_update_keys(self.global_parameters.scheme_parameters,
+                                         self.public_keys(time_period),
+                                         self.secret_keys(time_period),
+                                         self.states, revocation_list,
+                                         time_period, self.attributes if attributes is None else attributes)
+
+    def clear_update_keys(self) -> None:
+        """
+        Remove the update keys from memory and disk, for example as they are no longer valid after a new setup.
+        """
+        with self._keys_lock:
+            self._update_keys.clear()
+            prefix = UPDATE_KEYS_FILENAME.split('%d')[0] % self.name
+            for filename in os.listdir(self.storage_path):
+                if filename.startswith(prefix):
+                    os.remove(os.path.join(self.storage_path, filename))
+
+    def save_update_keys(self, time_period: int, entry: Dict[str, Any]) -> None:
+        save_file_path = os.path.join(self.storage_path, UPDATE_KEYS_FILENAME % (self.name, time_period))
+        # Update keys are saved outside of the keys lock, so each thread writes its own temporary file
+        temp_file_path = '%s.%d.tmp' % (save_file_path, threading.get_ident())
+        with open(temp_file_path, 'wb') as f:
+            f.write(self.serializer.dumps({
+                'keys': self.serializer.serialize_authority_update_keys(entry['keys']),
+                'versions': entry['versions']
+            }))
+        os.replace(temp_file_path, save_file_path)
+
+    def load_update_keys(self, time_period: int) -> Dict[str, Any]:
+        save_file_path = os.path.join(self.storage_path, UPDATE_KEYS_FILENAME % (self.name, time_period))
+        if not os.path.exists(save_file_path):
+            return None
+        with open(save_file_path, 'rb') as f:
+            entry = self.serializer.loads(f.read())
+        entry['keys'] = self.serializer.deserialize_authority_update_keys(entry['keys'])
+        return entry
 
 
 class TAAC12Serializer(BaseSerializer):
+    def __init__(self, group: PairingGroup, public_key_scheme: BasePublicKey, binary_format: bool = False) -> None:
+        super().__init__(group, public_key_scheme, binary_format)
+        self.util = CachingSecretUtil(self.group)
+
     # Overwrite because public keys contains a lambda function
     def serialize_authority_public_keys(self, public_keys: AuthorityPublicKeysStore) -> bytes:
         return self.dumps({key: value for key, value in public_keys.items() if key != 'H'})
@@ -173,40 +291,34 @@ class TAAC12Serializer(BaseSerializer):
         #     c_3 = gp['g'] ** r
         #     c_4 = pk['H'](attribute, t) ** r
         #     ct[attribute] = {'c_1': c_1, 'c_2': c_2, 'c_3': c_3, 'c_4': c_4}
-        util = SecretUtil(self.group, verbose=False)
-        # Parse the policy
-        policy = util.createPolicy(ciphertext['A'])
-        attributes = util.getAttributeList(policy)
+        attributes = self.util.attribute_list(ciphertext['A'])
 
         result = {
             'A': ciphertext['A'],
             't': ciphertext['t'],
-            'c': self.group.serialize(ciphertext['c'])
+            'c': self.serialize_element(ciphertext['c'])
         }
         for attribute in attributes:
             result[attribute] = {
-                '1': self.group.serialize(ciphertext[attribute]['c_1']),
-                '2': self.group.serialize(ciphertext[attribute]['c_2']),
-                '3': self.group.serialize(ciphertext[attribute]['c_3']),
-                '4': self.group.serialize(ciphertext[attribute]['c_4'])
+                '1': self.serialize_element(ciphertext[attribute]['c_1']),
+                '2': self.serialize_element(ciphertext[attribute]['c_2']),
+                '3': self.serialize_element(ciphertext[attribute]['c_3']),
+                '4': self.serialize_element(ciphertext[attribute]['c_4'])
             }
         return result
 
     def deserialize_abe_ciphertext(self, dictionary: Any) -> AbeEncryption:
-        util = SecretUtil(self.group, verbose=False)
-        # Parse the policy
-        policy = util.createPolicy(dictionary['A'])
-        attributes = util.getAttributeList(policy)
+        attributes = self.util.attribute_list(dictionary['A'])
         result = {
             'A': dictionary['A'],
             't': dictionary['t'],
-            'c': self.group.deserialize(dictionary['c'])
+            'c': self.deserialize_element(dictionary['c'])
         }
         for attribute in attributes:
             result[attribute] = {
-                'c_1': self.group.deserialize(dictionary[attribute]['1']),
-                'c_2': self.group.deserialize(dictionary[attribute]['2']),
-                'c_3': self.group.deserialize(dictionary[attribute]['3']),
-                'c_4': self.group.deserialize(dictionary[attribute]['4'])
+                'c_1': self.deserialize_element(dictionary[attribute]['1']),
+                'c_2': self.deserialize_element(dictionary[attribute]['2']),
+                'c_3': self.deserialize_element(dictionary[attribute]['3']),
+                'c_4': self.deserialize_element(dictionary[attribute]['4'])
             }
         return result
@@ -15,7 +15,8 @@ class DataRecord(object):
                  write_private_key: Tuple[dict, bytes] = None,
                  time_period: int = None,
                  info: bytes = None,
-                 data: bytes = None) -> None:
+                 data: bytes = None,
+                 wrapped_data_key: bytes = None) -> None:
         self.time_period = time_period
         self.info = info
         self.read_policy = read_policy
@@ -26,6 +27,9 @@ class DataRecord(object):
         self.encryption_key_owner = encryption_key_owner
         self.write_private_key = write_private_key
         self.data = data
+        # The key the info and data are encrypted with, encrypted with the key in encryption_key_read and
+        # encryption_key_owner. When None, the info and data are encrypted with that key directly.
+        self.wrapped_data_key = wrapped_data_key
 
     def update(self, update_record: UpdateRecord) -> None:
         """
@@ -38,10 +42,15 @@ class DataRecord(object):
 
     def update_policy(self, policy_update_record: PolicyUpdateRecord) -> None:
         """
-        Update this record with new policies
+        Update this record with new policies. The info and data are only replaced when
+        the PolicyUpdateRecord contains them.
         :param policy_update_record:
         """
-        self.info = policy_update_record.info
+        if policy_update_record.info is not None:
+            self.info = policy_update_record.info
+        if policy_update_record.data is not None:
+            self.data = policy_update_record.data
+        self.wrapped_data_key = policy_update_record.wrapped_data_key
         self.time_period = policy_update_record.time_period
         self.read_policy = policy_update_record.read_policy
         self.write_policy = policy_update_record.write_policy
@@ -49,4 +58,3 @@ class DataRecord(object):
         self.encryption_key_read = policy_update_record.encryption_key_read
         self.encryption_key_owner = policy_update_record.encryption_key_owner
         self.write_private_key = policy_update_record.write_private_key
-        self.data = policy_update_record.data
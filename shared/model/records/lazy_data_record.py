@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Callable, Dict
+
+from shared.model.records.data_record import DataRecord
+
+
+class LazyDataRecord(DataRecord):
+    """
+    DataRecord of which the fields are decoded on first access. This avoids deserializing pairing elements
+    and importing public keys for fields which are never read.
+
+    >>> calls = []
+    >>> record = LazyDataRecord({'read_policy': lambda: calls.append('rp') or 'A AND B'}, time_period=1)
+    >>> record.time_period
+    1
+    >>> calls
+    []
+    >>> record.read_policy
+    'A AND B'
+    >>> record.read_policy
+    'A AND B'
+    >>> calls
+    ['rp']
+
+    Copies share the fields which are not decoded yet with the original, so each field is decoded at most once.
+    The original and its copies share a lock, which ensures this when they are used from multiple threads. Other
+    records are decoded concurrently.
+
+    >>> record = LazyDataRecord({'read_policy': lambda: calls.append('rp') or 'A AND B'}, time_period=1)
+    >>> import copy
+    >>> copy.copy(record).read_policy == record.read_policy == 'A AND B'
+    True
+    >>> calls
+    ['rp', 'rp']
+    """
+
+    def __init__(self, decoders: Dict[str, Callable[[], Any]], **fields: Any) -> None:
+        """
+        :param decoders: A dict from field name to a function decoding the value of the field
+        :param fields: The values of the fields which are already decoded
+        """
+        # The fields are not initialized by DataRecord, so they are looked up through __getattr__
+        self._decoders = decoders
+        self._lock = threading.RLock()
+        self.data = None
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        lock = self.__dict__.get('_lock')
+        if lock is None:
+            raise AttributeError(name)
+        with lock:
+            if name in self.__dict__:
+                # Decoded by another thread in the meantime
+                return self.__dict__[name]
+            decoders = self.__dict__.get('_decoders')
+            if decoders is None or name not in decoders:
+                raise AttributeError(name)
+            value = decoders[name]()
+            setattr(self, name, value)
+            del decoders[name]
+        return value
+
+    def __copy__(self) -> 'LazyDataRecord':
+        with self._lock:
+            fields = {name: value for name, value in self.__dict__.items() if name not in ('_decoders', '_lock')}
+            decoders = {name: (lambda name=name: getattr(self, name)) for name in self._decoders}
+        record = LazyDataRecord(decoders, **fields)
+        # The copy decodes its fields through this record, so it uses the same lock
+        record._lock = self._lock
+        return record
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The decoders can not be pickled, so the fields which are not decoded yet are decoded first
+        with self._lock:
+            for name in list(self._decoders):
+                getattr(self, name)
+            return {name: value for name, value in self.__dict__.items() if name not in ('_decoders', '_lock')}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._decoders = dict()
+        self._lock = threading.RLock()
@@ -10,9 +10,10 @@ class PolicyUpdateRecord(object):
                  encryption_key_owner: bytes,
                  write_private_key: Tuple[dict, bytes],
                  time_period: int,
-                 info: bytes,
-                 data: bytes,
-                 signature: bytes
+                 signature: bytes,
+                 info: bytes = None,
+                 data: bytes = None,
+                 wrapped_data_key: bytes = None
                  ) -> None:
         self.time_period = time_period
         self.info = info
@@ -23,4 +24,6 @@ class PolicyUpdateRecord(object):
         self.encryption_key_owner = encryption_key_owner
         self.write_private_key = write_private_key
         self.data = data
+        # When info and data are None, only the keys are updated and the data key is wrapped again
+        self.wrapped_data_key = wrapped_data_key
         self.signature = signature
@@ -12,11 +12,22 @@ class User(object):
         """
         self.gid = gid
         self.implementation = implementation
-        self.secret_keys = implementation.setup_secret_keys(self.gid)
+        self.secret_keys_version = 0
+        """Incremented each time the secret keys change, so values derived from them can be invalidated."""
+        self._secret_keys = implementation.setup_secret_keys(self.gid)
         self.owner_key_pair = None  # type: Any
         self._registration_data = None  # type: dict
         self._global_parameters = None  # type: GlobalParameters
 
+    @property
+    def secret_keys(self):
+        return self._secret_keys
+
+    @secret_keys.setter
+    def secret_keys(self, secret_keys):
+        self._secret_keys = secret_keys
+        self.secret_keys_version += 1
+
     @property
     def registration_data(self):
         return self._registration_data
@@ -42,5 +53,8 @@ class User(object):
         >>> user.issue_secret_keys({'b': {'bla': 'bla'}})
         >>> user.secret_keys == {'a': {'foo': 'bar'}, 'b': {'bla': 'bla'}}
         True
+        >>> user.secret_keys_version
+        2
         """
         self.implementation.update_secret_keys(self.secret_keys, secret_keys)
+        self.secret_keys_version += 1
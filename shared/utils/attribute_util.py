@@ -9,13 +9,16 @@ from boolean import Symbol
 from charm.toolbox.node import BinNode, OpType
 from charm.toolbox.pairinggroup import PairingGroup
 from charm.toolbox.secretutil import SecretUtil
+from shared.utils.policy_cache import cached_by_policy
 
 ATTRIBUTE_TIME_FORMAT = '%d%%%s'
 
 
+@cached_by_policy
 def add_time_periods_to_policy(policy: str, time_period: int, group: PairingGroup) -> str:
     """
     Update the policy to a policy where the attribute have the time period embedded.
+    The results are cached by policy and time period.
     :param policy: The policy to update.
     :param time_period: The time period to embed.
     :param group:
@@ -77,7 +80,7 @@ def add_time_period_to_attribute(attribute: str, time_period: int) -> str:
 
 def translate_policy_to_access_structure(policy: str) -> list:
     """
-    Translate an access policy to an access structure.
+    Translate an access policy to an access structure. The translations are cached by policy.
     Example: (ONE AND THREE) OR (TWO AND FOUR) is translated to
                 [['ONE', 'THREE'], ['TWO', 'FOUR']]
     :param policy: The policy to translate
@@ -103,10 +106,19 @@ def translate_policy_to_access_structure(policy: str) -> list:
     >>> equal_access_structures(translated, [['ONE', 'TWO'], ['ONE', 'FOUR'], ['THREE', 'TWO'], ['THREE', 'FOUR']])
     True
     """
+    return [list(authorized_set) for authorized_set in _translate_policy_to_access_structure(policy)]
+
+
+@cached_by_policy
+def _translate_policy_to_access_structure(policy: str) -> tuple:
+    """
+    Cached translation of an access policy to an access structure. The access structure is returned as a tuple of
+    tuples, so the cached value can not be modified.
+    """
     algebra = boolean.BooleanAlgebra()
-    policy = algebra.parse(policy.replace('@', '::'))
-    dnf = policy if isinstance(policy, Symbol) else algebra.dnf(policy)
-    return dnf_algebra_to_access_structure(dnf)
+    parsed_policy = algebra.parse(policy.replace('@', '::'))
+    dnf = parsed_policy if isinstance(parsed_policy, Symbol) else algebra.dnf(parsed_policy)
+    return tuple(tuple(authorized_set) for authorized_set in dnf_algebra_to_access_structure(dnf))
 
 
 def dnf_algebra_to_access_structure(policy: Union[OR, AND, Symbol]) -> list:
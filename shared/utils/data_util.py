@@ -1,3 +1,8 @@
+import mmap
+from os import path
+from typing import Any, Iterator
+
+
 def pad_data_pksc5(data, block_size):
     """
     Pads data with additonal bytes containing the length of the padding.
@@ -23,3 +28,155 @@ def unpad_data_pksc5(data):
     True
     """
     return data[:-data[-1]]
+
+
+CHUNK_SIZE = 64 * 1024
+"""Default size of the chunks in which data is streamed."""
+
+
+def iterate_chunks(data: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Iterate over the given data in chunks. The data can either be a bytes-like object, a file-like object
+    (an object with a read method) or an iterable of bytes.
+    :param data: The data to iterate over
+    :param chunk_size: The maximum size of the chunks when reading from bytes or files
+    :return: A generator yielding the chunks of the data
+    >>> list(iterate_chunks(b'Hello world', 4)) == [b'Hell', b'o wo', b'rld']
+    True
+    >>> from io import BytesIO
+    >>> list(iterate_chunks(BytesIO(b'Hello world'), 6)) == [b'Hello ', b'world']
+    True
+    >>> list(iterate_chunks([b'Hello', b' world'])) == [b'Hello', b' world']
+    True
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+    elif hasattr(data, 'read'):
+        chunk = data.read(chunk_size)
+        while chunk:
+            yield chunk
+            chunk = data.read(chunk_size)
+    else:
+        for chunk in data:
+            yield chunk
+
+
+def join_chunks(data: Any) -> bytes:
+    """
+    Join data which is possibly chunked to a single bytes object.
+    :param data: The data, see iterate_chunks.
+    :return: The data as a single bytes object
+    >>> join_chunks([b'Hello', b' world']) == b'Hello world'
+    True
+    >>> join_chunks(b'Hello world') == b'Hello world'
+    True
+    """
+    if isinstance(data, bytes):
+        return data
+    return b''.join(iterate_chunks(data))
+
+
+def as_buffer(data: Any) -> memoryview:
+    """
+    Get the given data as a single buffer. Bytes-like objects and objects with a buffer method (like FileChunks)
+    are not copied, other data (see iterate_chunks) is joined.
+    :param data: The data
+    :return: A memoryview on the data
+    >>> as_buffer(b'Hello world')[6:] == b'world'
+    True
+    >>> bytes(as_buffer([b'Hello', b' world']))
+    b'Hello world'
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return memoryview(data)
+    if hasattr(data, 'buffer'):
+        return data.buffer()
+    return memoryview(join_chunks(data))
+
+
+def read_range(data: Any, offset: int, length: int) -> bytes:
+    """
+    Read a range of the given data. The data can either be a bytes-like object, an object with a read_range method
+    (like FileChunks) or a seekable file-like object.
+    :param data: The data to read from
+    :param offset: The offset of the range
+    :param length: The length of the range
+    :return: The bytes in the range
+    >>> read_range(b'Hello world', 6, 3) == b'wor'
+    True
+    >>> from io import BytesIO
+    >>> read_range(BytesIO(b'Hello world'), 6, 10) == b'world'
+    True
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data[offset:offset + length])
+    if hasattr(data, 'read_range'):
+        return data.read_range(offset, length)
+    data.seek(offset)
+    return data.read(length)
+
+
+class FileChunks(object):
+    """
+    Chunked view on a file, which can be iterated multiple times. The file is only opened while it is iterated,
+    so the content of the file is never in memory as a whole. The view can be limited to a range of the file.
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE, offset: int = 0, length: int = None) -> None:
+        """
+        :param file_path: The path of the file
+        :param chunk_size: The size of the chunks to read
+        :param offset: The offset in the file where the view starts
+        :param length: The length of the view, or None to view the file up to its end
+        """
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.offset = offset
+        self.length = length
+
+    def __iter__(self):
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            remaining = len(self)
+            while remaining > 0:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def __len__(self):
+        if self.length is not None:
+            return self.length
+        return path.getsize(self.file_path) - self.offset
+
+    def read_range(self, offset: int, length: int) -> bytes:
+        """
+        Read a range of the file, without reading the rest of the file.
+        :param offset: The offset of the range, relative to the start of the view
+        :param length: The length of the range
+        :return: The bytes in the range
+        """
+        length = max(min(length, len(self) - offset), 0)
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset + offset)
+            return f.read(length)
+
+    def buffer(self) -> memoryview:
+        """
+        Map the file in memory. Pages of the file are only read when they are accessed, and slices of the
+        buffer do not copy the data. As stored files are replaced instead of overwritten, the buffer keeps
+        showing the content of the file at the time it was mapped. The mapping is closed when the buffer
+        (and all slices of it) are released.
+        :return: A read-only memoryview on the content of the view
+        """
+        length = len(self)
+        if length == 0:
+            # Empty files can not be mapped
+            return memoryview(b'')
+        # The offset of a mapping should be a multiple of the allocation granularity
+        start = self.offset - self.offset % mmap.ALLOCATIONGRANULARITY
+        with open(self.file_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), self.offset - start + length, access=mmap.ACCESS_READ, offset=start)
+        return memoryview(mapped)[self.offset - start:]
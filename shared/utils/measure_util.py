@@ -1,5 +1,6 @@
 import csv
 import marshal
+import math
 import os
 from typing import Dict, List, Tuple
 
@@ -42,7 +43,15 @@ function_step_mapping = {
     '_run_decrypt': 'decrypt',
     '_run_data_update': 'data_update',
     '_run_policy_update': 'policy_update',
-    '_run_update_keys': 'update_keys'
+    '_run_update_keys': 'update_keys',
+    '_run_pke_keygen': 'pke_keygen',
+    '_run_pke_sign': 'pke_sign',
+    '_run_pke_verify': 'pke_verify',
+    '_run_abe_encrypt': 'abe_encrypt',
+    '_run_abe_decrypt': 'abe_decrypt',
+    '_run_serialize': 'serialize',
+    '_run_deserialize': 'deserialize',
+    '_run_storage_update': 'storage_update'
 }
 timing_functions = list(function_step_mapping.keys())
 algorithm_steps = set(list(function_step_mapping.values()))
@@ -79,3 +88,21 @@ def connections_to_csv(connections: List[BaseConnection], output_file_path: str)
             for (name, sizes) in connection.benchmarks.items():
                 for size in sizes:
                     writer.writerow((connection.__class__.__name__, name, size))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Calculate a percentile of the values, using the nearest rank.
+    :param values: The values
+    :param fraction: The percentile as a fraction, for example 0.99 for the 99th percentile
+    :return: The percentile
+
+    >>> percentile([5, 1, 4, 2, 3], 0.5)
+    3
+    >>> percentile(list(range(1, 101)), 0.99)
+    99
+    """
+    ordered = sorted(values)
+    # The nearest rank is the smallest rank covering the fraction of the values
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
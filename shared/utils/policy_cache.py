@@ -0,0 +1,74 @@
+from functools import lru_cache, wraps
+from typing import Any, Callable, Tuple
+
+from charm.toolbox.pairinggroup import PairingGroup
+from charm.toolbox.secretutil import SecretUtil
+
+POLICY_CACHE_ENABLED = True
+"""Indicates whether scheme objects and parsed policies are cached. Can be disabled to measure the difference."""
+
+POLICY_CACHE_SIZE = 512
+"""The maximum amount of policies to keep in each cache."""
+
+
+def cached_by_policy(function: Callable) -> Callable:
+    """
+    Decorate a function, whose arguments are hashable (like policy strings), with a LRU cache.
+    The cache is bypassed when POLICY_CACHE_ENABLED is False.
+    :param function: The function to cache
+    :return: The decorated function
+
+    >>> calls = []
+    >>> cached = cached_by_policy(lambda policy: calls.append(policy) or policy.upper())
+    >>> cached('a and b') == cached('a and b') == 'A AND B'
+    True
+    >>> calls
+    ['a and b']
+    """
+    cached = lru_cache(maxsize=POLICY_CACHE_SIZE)(function)
+
+    @wraps(function)
+    def wrapper(*args):
+        if POLICY_CACHE_ENABLED:
+            return cached(*args)
+        return function(*args)
+
+    wrapper.cache_info = cached.cache_info  # type: ignore
+    wrapper.cache_clear = cached.cache_clear  # type: ignore
+    return wrapper
+
+
+class CachingSecretUtil(SecretUtil):
+    """
+    SecretUtil which caches the parsed policy trees by policy string. The schemes only read the policy trees,
+    so a parsed tree can safely be shared between calls.
+    """
+
+    def __init__(self, group: PairingGroup, verbose: bool = False) -> None:
+        super().__init__(group, verbose=verbose)
+        self._create_policy = cached_by_policy(super().createPolicy)
+        self._attribute_list = cached_by_policy(
+            lambda policy_string: tuple(self.getAttributeList(self.createPolicy(policy_string))))
+
+    def createPolicy(self, policy_string: str) -> Any:
+        return self._create_policy(policy_string)
+
+    def attribute_list(self, policy_string: str) -> Tuple[str, ...]:
+        """
+        Get the attributes (with index) occurring in the policy, from left to right.
+        :param policy_string: The policy
+        :return: A tuple of attributes
+        """
+        return self._attribute_list(policy_string)
+
+
+def cache_scheme_policies(scheme: Any, group: PairingGroup) -> Any:
+    """
+    Let the scheme use a CachingSecretUtil, if it uses a SecretUtil to parse policies.
+    :param scheme: The scheme object
+    :param group: The pairing group of the scheme
+    :return: The scheme
+    """
+    if isinstance(getattr(scheme, 'util', None), SecretUtil):
+        scheme.util = CachingSecretUtil(group)
+    return scheme
@@ -0,0 +1,44 @@
+from typing import Any
+
+from charm.core.math.pairing import pc_element, G1, G2, GT
+
+FIXED_BASE_PRECOMPUTATION_ENABLED = True
+"""
+Indicates whether fixed-base exponentiation tables are built for the global parameters and authority public keys.
+The tables speed up the exponentiations during encryption, at the cost of memory. Can be disabled to measure
+the difference. Elements which already have a table keep using it.
+"""
+
+
+def precompute_fixed_bases(value: Any) -> int:
+    """
+    Build fixed-base exponentiation tables for all group elements (of G1, G2 and GT) in the given value.
+    Dictionaries, lists and tuples are searched recursively. After this, each exponentiation of these elements
+    uses the table.
+    :param value: The global parameters or public keys to build the tables for
+    :return: The amount of tables built
+
+    >>> from charm.toolbox.pairinggroup import PairingGroup, ZR
+    >>> group = PairingGroup('SS512')
+    >>> g, r = group.random(G1), group.random(ZR)
+    >>> expected = g ** r
+    >>> precompute_fixed_bases({'g': g, 'H': lambda x: x, 'list': [group.random(GT), r]})
+    2
+    >>> precompute_fixed_bases({'g': g})
+    0
+    >>> g ** r == expected
+    True
+    """
+    if not FIXED_BASE_PRECOMPUTATION_ENABLED:
+        return 0
+    if isinstance(value, dict):
+        return sum(precompute_fixed_bases(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(precompute_fixed_bases(item) for item in value)
+    if isinstance(value, pc_element) and value.type in (G1, G2, GT) and not value.preproc:
+        try:
+            return 1 if value.initPP() else 0
+        except ValueError:
+            # The element is not initialized or already has a table
+            return 0
+    return 0
@@ -0,0 +1,48 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from authority.attribute_authority import AttributeAuthority
+
+
+class PickleSerializer(object):
+    def dumps(self, obj) -> bytes:
+        return pickle.dumps(obj)
+
+    def loads(self, data: bytes):
+        return pickle.loads(data)
+
+
+class RecordingAttributeAuthority(AttributeAuthority):
+    """
+    Authority issuing the requested attributes as keys, as the batching does not depend on the scheme.
+    """
+
+    def _keygen(self, gid, registration_data, attributes, time_period):
+        return {attribute: (gid, time_period) for attribute in attributes}
+
+
+class AttributeAuthorityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.subject = RecordingAttributeAuthority('A', PickleSerializer(), storage_path=self.storage_path)
+        self.subject.revoke_attribute_indirect('bob', 'X@A', 1)
+        self.subject.revoke_attribute_indirect('carol', 'Y@A', 2)
+        self.requests = [{'gid': gid, 'registration_data': None, 'attributes': ['X@A', 'Y@A'],
+                          'time_period': time_period}
+                         for gid in ['alice', 'bob', 'carol'] for time_period in [1, 2]]
+
+    def tearDown(self):
+        shutil.rmtree(self.storage_path)
+
+    def test_keygen_batch(self):
+        expected = [self.subject.keygen(request['gid'], None, request['attributes'], request['time_period'])
+                    for request in self.requests]
+        self.assertEqual(expected, self.subject.keygen_batch(self.requests))
+        self.assertEqual({'Y@A': ('bob', 1)}, expected[2])
+        self.assertEqual({'X@A': ('carol', 2)}, expected[5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from authority.revocation_index import RevocationIndex
+
+
+class RevocationIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.subject = RevocationIndex()
+
+    def test_revoke_bulk(self):
+        gids = ['user%d' % i for i in range(100)]
+        self.subject.revoke_bulk(gids[::3], ['A@X', 'B@X'], 1)
+        for i, gid in enumerate(gids):
+            self.assertEqual(i % 3 == 0, self.subject.is_revoked(gid, 'A@X', 1))
+            self.assertEqual(i % 3 == 0, self.subject.is_revoked(gid, 'B@X', 1))
+            self.assertFalse(self.subject.is_revoked(gid, 'C@X', 1))
+            self.assertFalse(self.subject.is_revoked(gid, 'A@X', 2))
+        self.assertEqual(gids[::3], self.subject.revoked_users('A@X', 1))
+
+    def test_unrevoke(self):
+        self.subject.revoke_bulk(['alice', 'bob', 'carol'], ['A@X', 'B@X'], 1)
+        self.subject.unrevoke('bob', 'A@X', 1)
+        self.subject.unrevoke_bulk(['alice', 'unknown'], ['B@X', 'C@X'], 1)
+        self.assertEqual({'A@X': ['alice', 'carol'], 'B@X': ['bob', 'carol']}, self.subject.revocation_list(1))
+
+        self.subject.unrevoke_bulk(['alice', 'carol'], ['A@X'], 1)
+        self.subject.unrevoke_bulk(['bob', 'carol'], ['B@X'], 1)
+        self.assertEqual({}, self.subject.revocation_list(1))
+        self.assertEqual([], self.subject.time_periods())
+
+    def test_carry_forward(self):
+        self.subject.revoke('alice', 'A@X', 1)
+        self.subject.revoke_bulk(['user%d' % i for i in range(20)], ['A@X'], 2)
+        self.subject.carry_forward(1, 2)
+        self.assertTrue(self.subject.is_revoked('alice', 'A@X', 2))
+        self.assertTrue(self.subject.is_revoked('user19', 'A@X', 2))
+        self.assertEqual(21, len(self.subject.revoked_users('A@X', 2)))
+        self.assertEqual(['alice'], self.subject.revoked_users('A@X', 1))
+
+    def test_dumps_loads(self):
+        self.subject.revoke_bulk(['user%d' % i for i in range(1000)], ['A@X'], 1)
+        self.subject.revoke('alice', 'B@X', 2)
+        loaded = RevocationIndex.loads(self.subject.dumps())
+        self.assertEqual(self.subject.revocation_list(1), loaded.revocation_list(1))
+        self.assertEqual(self.subject.revocation_list(2), loaded.revocation_list(2))
+        self.assertEqual(self.subject.version('B@X', 2), loaded.version('B@X', 2))
+        loaded.revoke('bob', 'B@X', 2)
+        self.assertEqual(['alice', 'bob'], loaded.revoked_users('B@X', 2))
+
+    def test_version(self):
+        initial = self.subject.version('A@X', 1)
+        self.subject.revoke('alice', 'A@X', 1)
+        revoked = self.subject.version('A@X', 1)
+        self.assertNotEqual(initial, revoked)
+        self.assertEqual(initial, self.subject.version('B@X', 1))
+        self.assertEqual(initial, self.subject.version('A@X', 2))
+
+        self.subject.unrevoke('alice', 'A@X', 1)
+        self.assertNotIn(self.subject.version('A@X', 1), (initial, revoked))
+
+        self.subject.revoke('bob', 'A@X', 1)
+        carried = self.subject.version('A@X', 2)
+        self.subject.carry_forward(1, 2)
+        self.assertNotEqual(carried, self.subject.version('A@X', 2))
+
+        # A different index never has the same version, even with the same revocations
+        self.assertNotEqual(initial, RevocationIndex().version('A@X', 1))
+
+    def test_version_unchanged(self):
+        self.subject.revoke_bulk(['alice', 'bob'], ['A@X'], 1)
+        self.subject.carry_forward(1, 2)
+        revoked = self.subject.version('A@X', 1)
+        carried = self.subject.version('A@X', 2)
+        # Revoking again, reinstating unrevoked users or carrying forward again does not change the revoked users
+        self.subject.revoke_bulk(['alice', 'bob'], ['A@X'], 1)
+        self.subject.unrevoke_bulk(['carol', 'dave'], ['A@X'], 1)
+        self.subject.carry_forward(1, 2)
+        self.assertEqual(revoked, self.subject.version('A@X', 1))
+        self.assertEqual(carried, self.subject.version('A@X', 2))
+        self.subject.revoke_bulk(['alice', 'carol'], ['A@X'], 1)
+        self.assertNotEqual(revoked, self.subject.version('A@X', 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
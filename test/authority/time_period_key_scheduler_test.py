@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from authority.attribute_authority import AttributeAuthority, ATTRIBUTE_TIME_PERIOD_KEYS_FILENAME
+from authority.time_period_key_scheduler import TimePeriodKeyScheduler
+from test.authority.attribute_authority_test import PickleSerializer
+
+
+class KeysPickleSerializer(PickleSerializer):
+    def serialize_authority_public_keys(self, public_keys) -> bytes:
+        return self.dumps(public_keys)
+
+    def deserialize_authority_public_keys(self, data: bytes):
+        return self.loads(data)
+
+    def serialize_authority_secret_keys(self, secret_keys) -> bytes:
+        return self.dumps(secret_keys)
+
+    def deserialize_authority_secret_keys(self, data: bytes):
+        return self.loads(data)
+
+
+class CountingAttributeAuthority(AttributeAuthority):
+    """
+    Authority with different keys in each time period, counting the time periods it created keys for.
+    """
+
+    def __init__(self, name, serializer, storage_path=None):
+        super().__init__(name, serializer, storage_path=storage_path)
+        self._public_keys = dict()
+        self._secret_keys = dict()
+        self.created = list()
+        self.delay = 0
+
+    def create_keys_for_time_period(self, time_period):
+        self.created.append(time_period)
+        time.sleep(self.delay)
+        return {'pk': time_period}, {'sk': time_period}
+
+
+class TimePeriodKeySchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.authority = CountingAttributeAuthority('A', KeysPickleSerializer(), storage_path=self.storage_path)
+        self.subject = TimePeriodKeyScheduler(self.authority, lookahead=2, retention=1)
+
+    def tearDown(self):
+        self.subject.stop()
+        shutil.rmtree(self.storage_path)
+
+    def keys_file_exists(self, time_period):
+        return os.path.exists(
+            os.path.join(self.storage_path, ATTRIBUTE_TIME_PERIOD_KEYS_FILENAME % ('A', time_period)))
+
+    def test_lookahead(self):
+        self.subject.start(1)
+        self.assertTrue(self.subject.wait_until_ready(timeout=5))
+        self.assertEqual([1, 2, 3], self.authority.time_periods_with_keys())
+        self.assertEqual({'pk': 3}, self.authority._public_keys[3])
+        self.assertEqual({'sk': 3}, self.authority._secret_keys[3])
+        self.assertTrue(self.keys_file_exists(3))
+
+    def test_advance_evicts(self):
+        self.subject.start(1)
+        self.assertTrue(self.subject.wait_until_ready(timeout=5))
+        self.subject.advance(4)
+        self.assertTrue(self.subject.wait_until_ready(timeout=5))
+        self.subject.stop()
+        self.assertEqual([3, 4, 5, 6], self.authority.time_periods_with_keys())
+        self.assertFalse(self.keys_file_exists(1))
+        self.assertFalse(self.keys_file_exists(2))
+        self.assertEqual([1, 2, 3, 4, 5, 6], self.authority.created)
+
+    def test_load_persisted(self):
+        self.subject.start(1)
+        self.assertTrue(self.subject.wait_until_ready(timeout=5))
+        self.subject.stop()
+
+        self.authority = CountingAttributeAuthority('A', KeysPickleSerializer(), storage_path=self.storage_path)
+        self.subject = TimePeriodKeyScheduler(self.authority, lookahead=3)
+        self.subject.start(1)
+        self.assertTrue(self.subject.wait_until_ready(timeout=5))
+        self.assertEqual([1, 2, 3, 4], self.authority.time_periods_with_keys())
+        self.assertEqual([4], self.authority.created)
+        self.assertEqual({'sk': 2}, self.authority._secret_keys[2])
+
+    def test_request_waits_for_scheduler(self):
+        self.authority.delay = 0.2
+        self.subject = TimePeriodKeyScheduler(self.authority, lookahead=0)
+        self.subject.start(1)
+        time.sleep(0.05)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.authority.generate_keys_for_time_period(1)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([1], self.authority.created)
+        self.assertEqual(3, len(results))
+        for public_keys, secret_keys in results:
+            self.assertIs(self.authority._public_keys[1], public_keys)
+            self.assertIs(self.authority._secret_keys[1], secret_keys)
+
+    def test_install_keeps_keys_in_use(self):
+        public_keys, secret_keys = self.authority.generate_keys_for_time_period(1)
+        self.assertEqual((public_keys, secret_keys),
+                         self.authority.install_keys_for_time_period(1, {'pk': 'other'}, {'sk': 'other'}))
+        self.assertIs(public_keys, self.authority._public_keys[1])
+
+    def test_request_keys_persisted(self):
+        # Keys prepared for a request before the scheduler started, and outside the lookahead
+        public_keys, _ = self.authority.generate_keys_for_time_period(1)
+        self.assertFalse(self.keys_file_exists(1))
+        self.subject.start(1)
+        self.assertTrue(self.keys_file_exists(1))
+        self.authority.generate_keys_for_time_period(10)
+        self.assertTrue(self.keys_file_exists(10))
+        self.assertEqual(public_keys, self.authority.load_keys_for_time_period(1)[0])
+
+    def test_without_persist(self):
+        self.subject = TimePeriodKeyScheduler(self.authority, lookahead=1, persist=False)
+        self.subject.start(1)
+        self.assertTrue(self.subject.wait_until_ready(timeout=5))
+        self.assertEqual([1, 2], self.authority.time_periods_with_keys())
+        self.assertFalse(self.keys_file_exists(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+
+from client.async_user_client import AsyncUserClient
+from service.insurance_service import InsuranceService
+from shared.implementations.base_implementation import BaseImplementation, MockImplementation
+from shared.implementations.rw15_implementation import RW15Implementation
+from shared.implementations.taac12_implementation import TAAC12Implementation
+from shared.model.user import User
+from test.data import lorem
+
+REQUEST_DELAY = 0.1
+
+
+class PickleSecretKeysSerializer(object):
+    def serialize_user_secret_keys(self, secret_keys) -> bytes:
+        return pickle.dumps(secret_keys)
+
+
+class PickleImplementation(MockImplementation):
+    @property
+    def serializer(self):
+        return PickleSecretKeysSerializer()
+
+
+class SlowAuthorityConnection(object):
+    """
+    Authority connection taking some time for each request, to detect whether requests are sent concurrently.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def request_public_keys(self, time_period: int):
+        time.sleep(REQUEST_DELAY)
+        return {'public': (self.name, time_period)}
+
+    def request_keygen(self, gid, registration_data, attributes, time_period):
+        time.sleep(REQUEST_DELAY)
+        return {attribute: (gid, time_period) for attribute in attributes}
+
+    def request_update_keys(self, time_period: int):
+        time.sleep(REQUEST_DELAY)
+        return {'update': (self.name, time_period)}
+
+
+class AsyncUserClientTestCase(unittest.TestCase):
+    authorities = ['A%d' % i for i in range(8)]
+
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        implementation = PickleImplementation()
+        self.subject = AsyncUserClient(User('bob', implementation), implementation, storage_path=self.storage_path)
+        self.subject._authority_connections = {name: SlowAuthorityConnection(name) for name in self.authorities}
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.subject.request_executor.shutdown()
+        shutil.rmtree(self.storage_path)
+
+    def run_timed(self, coroutine):
+        start = time.perf_counter()
+        result = self.loop.run_until_complete(coroutine)
+        # Sequential requests would take at least REQUEST_DELAY per authority
+        self.assertLess(time.perf_counter() - start, REQUEST_DELAY * len(self.authorities) / 2)
+        return result
+
+    def test_authorities_public_keys(self):
+        public_keys = self.run_timed(self.subject.authorities_public_keys_async(1))
+        self.assertEqual({name: {'public': (name, 1)} for name in self.authorities}, public_keys)
+        self.assertEqual(public_keys, self.subject.authorities_public_keys(1))
+
+    def test_request_update_keys(self):
+        update_keys = self.run_timed(self.subject.request_update_keys_async(2))
+        self.assertEqual({name: {'update': (name, 2)} for name in self.authorities}, update_keys)
+
+    def test_request_secret_keys(self):
+        self.run_timed(self.subject.request_secret_keys_multiple_authorities_async(
+            {name: ['%s@%s' % (attribute, name) for attribute in ['X', 'Y']] for name in self.authorities}, 1))
+        self.assertEqual(2 * len(self.authorities), len(self.subject.user.secret_keys))
+        self.assertEqual(('bob', 1), self.subject.user.secret_keys['X@A0'])
+
+
+class AsyncUserClientImplementationTestCase(unittest.TestCase):
+    access_policy = '(TEST@TEST OR TEST2@TEST) AND (TEST3@TEST OR TEST4@TEST)'
+
+    def setUpWithImplementation(self, implementation: BaseImplementation):
+        central_authority = implementation.create_central_authority()
+        central_authority.central_setup()
+        attribute_authority = implementation.create_attribute_authority('TEST')
+        attribute_authority.setup(central_authority, ['TEST@TEST', 'TEST2@TEST', 'TEST3@TEST', 'TEST4@TEST'], 1)
+        insurance_service = InsuranceService(implementation.serializer, central_authority,
+                                             implementation.public_key_scheme)
+        insurance_service.add_authority(attribute_authority)
+
+        self.subject = AsyncUserClient(User('bob', implementation), implementation, storage_path=self.storage_path)
+        self.subject.register(insurance_service)
+        self.subject.request_secret_keys(attribute_authority.name, ['TEST@TEST', 'TEST3@TEST', 'TEST4@TEST'], 1)
+
+        connection = self.subject.authority_connections['TEST']
+        request_update_keys = connection.request_update_keys
+        connection.request_update_keys = lambda time_period: self.requested.append(time_period) or \
+            request_update_keys(time_period)
+
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.loop = asyncio.new_event_loop()
+        self.subject = None  # type: AsyncUserClient
+        self.requested = []
+
+    def tearDown(self):
+        self.loop.close()
+        if self.subject is not None:
+            self.subject.close()
+        shutil.rmtree(self.storage_path)
+
+    def test_encrypt_decrypt_update_file_rw15(self):
+        self._test_encrypt_decrypt_update_file(RW15Implementation())
+        self.assertEqual([], self.requested)
+
+    def test_encrypt_decrypt_update_file_taac12(self):
+        self._test_encrypt_decrypt_update_file(TAAC12Implementation())
+        # The update keys are requested up front once, after which the decryption keys are cached
+        self.assertEqual([1], self.requested)
+
+    def _test_encrypt_decrypt_update_file(self, implementation):
+        self.setUpWithImplementation(implementation)
+        filename = os.path.join(self.storage_path, 'input')
+        with open(filename, 'wb') as f:
+            f.write(lorem)
+
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        location = self.loop.run_until_complete(
+            self.subject.encrypt_file_async(filename, self.access_policy, self.access_policy, 1))
+        self.assertEqual(self.access_policy, self.subject.request_record(location).read_policy)
+        os.remove(filename)
+
+        # Update the owner key, so the subject has to use attribute keys to decrypt
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        self.assertEqual(filename, self.loop.run_until_complete(self.subject.decrypt_file_async(location)))
+        with open(filename, 'rb') as f:
+            self.assertEqual(lorem, f.read())
+
+        self.loop.run_until_complete(self.subject.update_file_async(location, b'updated content'))
+        self.loop.run_until_complete(self.subject.decrypt_file_async(location))
+        with open(filename, 'rb') as f:
+            self.assertEqual(b'updated content', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
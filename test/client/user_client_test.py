@@ -1,4 +1,6 @@
+import os
 import pickle
+import tempfile
 import unittest
 
 from client.user_client import UserClient
@@ -8,8 +10,10 @@ from shared.implementations.base_implementation import BaseImplementation
 from shared.implementations.dacmacs13_implementation import DACMACS13Implementation
 from shared.implementations.rd13_implementation import RD13Implementation
 from shared.implementations.rw15_implementation import RW15Implementation
+from shared.implementations.symmetric_key.chunked_aes_symmetric_key import ChunkedAESSymmetricKey
 from shared.implementations.taac12_implementation import TAAC12Implementation
 from shared.model.user import User
+from test.data import lorem
 
 
 class UserClientTestCase(unittest.TestCase):
@@ -120,7 +124,10 @@ class UserClientTestCase(unittest.TestCase):
                                                    {'test': 'info'}, 1)
         update_record = self.subject.update_policy(create_record, 'TEST3@TEST', 'TEST4@TEST', 1)
 
-        self.assertIsNotNone(update_record.info)
+        # Only the keys are updated
+        self.assertIsNone(update_record.info)
+        self.assertIsNone(update_record.data)
+        self.assertIsNotNone(update_record.wrapped_data_key)
         self.assertIsNotNone(update_record.write_policy)
         self.assertIsNotNone(update_record.read_policy)
         self.assertIsNotNone(update_record.write_public_key)
@@ -128,13 +135,13 @@ class UserClientTestCase(unittest.TestCase):
         self.assertIsNotNone(update_record.encryption_key_owner)
         self.assertIsNotNone(update_record.write_private_key)
         self.assertIsNotNone(update_record.time_period)
-        self.assertIsNotNone(update_record.data)
         self.assertIsNotNone(update_record.signature)
         pke = self.subject.implementation.public_key_scheme
         self.assertTrue(pke.verify(create_record.owner_public_key, update_record.signature,
                                    pickle.dumps((update_record.read_policy,
                                                  update_record.write_policy,
-                                                 update_record.time_period))))
+                                                 update_record.time_period,
+                                                 update_record.wrapped_data_key))))
 
         # Update the original record
         create_record.update_policy(update_record)
@@ -337,6 +344,111 @@ class UserClientTestCase(unittest.TestCase):
         except PolicyNotSatisfiedException:
             pass
 
+    def test_decrypt_range_rw15(self):
+        implementation = RW15Implementation()
+        implementation.symmetric_key_scheme = ChunkedAESSymmetricKey(block_size=64)
+        self.setUpWithImplementation(implementation)
+
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        create_record = self.subject.create_record(self.access_policy, self.access_policy, lorem,
+                                                   {'test': 'info'}, 1)
+        location = self.subject.send_create_record(create_record)
+
+        self.assertEqual(lorem[100:300], self.subject.decrypt_range(location, 100, 200))
+
+        # Update the owner key, so the subject has to use attribute keys to decrypt
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        self.assertEqual(lorem[:10], self.subject.decrypt_range(location, 0, 10))
+
+    def test_authorities_public_keys_cached_dacmacs13(self):
+        self._test_authorities_public_keys_cached(DACMACS13Implementation())
+
+    def test_authorities_public_keys_cached_rd13(self):
+        self._test_authorities_public_keys_cached(RD13Implementation())
+
+    def test_authorities_public_keys_cached_rw15(self):
+        self._test_authorities_public_keys_cached(RW15Implementation())
+
+    def test_authorities_public_keys_cached_taac12(self):
+        self._test_authorities_public_keys_cached(TAAC12Implementation())
+
+    def _test_authorities_public_keys_cached(self, implementation):
+        self.setUpWithImplementation(implementation)
+        connection = self.subject.authority_connections['TEST']
+        requested = []
+        request_public_keys = connection.request_public_keys
+        connection.request_public_keys = lambda time_period: requested.append(time_period) or request_public_keys(
+            time_period)
+
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        self.subject.create_record(self.access_policy, self.access_policy, b'Hello world', {'test': 'info'}, 1)
+        self.subject.create_record(self.access_policy, self.access_policy, b'Hello world', {'test': 'info'}, 1)
+        self.assertEqual(requested, [1])
+        self.assertIs(self.subject.authorities_public_keys(1), self.subject.authorities_public_keys(1))
+
+        self.subject.invalidate_public_keys('TEST', 1)
+        self.subject.authorities_public_keys(1)
+        self.assertEqual(requested, [1, 1])
+
+    def test_decryption_keys_cached_dacmacs13(self):
+        # The tokens of DAC-MACS are only valid for a single ciphertext
+        self._test_decryption_keys_cached(DACMACS13Implementation(), [1, 1])
+
+    def test_decryption_keys_cached_taac12(self):
+        # The decryption keys of TAAC are valid for all ciphertexts of the time period
+        self._test_decryption_keys_cached(TAAC12Implementation(), [1])
+
+    def _test_decryption_keys_cached(self, implementation, expected_calculated):
+        self.setUpWithImplementation(implementation)
+        calculated = []
+        decryption_keys = implementation.decryption_keys
+        implementation.decryption_keys = lambda *args: calculated.append(args[-1]) or decryption_keys(*args)
+
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        first = self.subject.create_record(self.access_policy, self.access_policy, b'Hello world', {'test': 'info'}, 1)
+        second = self.subject.create_record(self.access_policy, self.access_policy, lorem, {'test': 'info'}, 1)
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+
+        self.assertEqual(self.subject.decrypt_record(first)[1], b'Hello world')
+        self.assertEqual(self.subject.decrypt_record(first)[1], b'Hello world')
+        self.assertEqual(calculated, [1])
+        self.assertEqual(self.subject.decrypt_record(second)[1], lorem)
+        self.assertEqual(calculated, expected_calculated)
+
+        # Reissuing secret keys invalidates the cached decryption keys
+        self.subject.request_secret_keys('TEST', ['TEST2@TEST'], 1)
+        self.assertEqual(self.subject.decrypt_record(first)[1], b'Hello world')
+        self.assertEqual(calculated, expected_calculated + [1])
+
+    def test_encrypt_files_rw15(self):
+        self.setUpWithImplementation(RW15Implementation())
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = [os.path.join(directory, name) for name in ('first', 'second')]
+            for filename, message in zip(filenames, (b'Hello world', lorem)):
+                with open(filename, 'wb') as f:
+                    f.write(message)
+            locations = self.subject.encrypt_files(filenames, self.access_policy, self.access_policy)
+
+        first, second = map(self.subject.request_record, locations)
+        # The attribute based encryption is shared, the data keys are not
+        self.assertEqual(first.encryption_key_read, second.encryption_key_read)
+        self.assertNotEqual(first.wrapped_data_key, second.wrapped_data_key)
+
+        # Update the owner key, so the subject has to use attribute keys to decrypt
+        self.subject.user.owner_key_pair = self.subject.create_owner_key()
+        self.assertEqual(self.subject.decrypt_record(first), ({'name': filenames[0]}, b'Hello world'))
+        self.assertEqual(self.subject.decrypt_record(second), ({'name': filenames[1]}, lorem))
+
+    def test_connect_remote_requires_authority_addresses(self):
+        implementation = RD13Implementation()
+        self.subject = UserClient(User('bob', implementation), implementation)
+        with self.assertRaises(AssertionError):
+            self.subject.connect_remote(('127.0.0.1', 1), None, b'secret')
+        with self.assertRaises(AssertionError):
+            self.subject.connect_remote(('127.0.0.1', 1), {'TEST': ('127.0.0.1', 2)})
+
 
 if __name__ == '__main__':
     unittest.main()
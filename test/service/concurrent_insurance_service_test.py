@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from service.concurrent_insurance_service import ConcurrentInsuranceService
+from shared.model.records.create_record import CreateRecord
+from shared.model.records.policy_update_record import PolicyUpdateRecord
+from shared.model.records.update_record import UpdateRecord
+from shared.utils.data_util import join_chunks
+from test.service.fakes import PickleMetaSerializer
+
+
+class SlowPublicKey(object):
+    """
+    Public key scheme accepting all signatures slowly, while tracking the amount of concurrent verifications.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def verify(self, public_key, signature, data) -> bool:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return True
+
+
+class ConcurrentInsuranceServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.public_key_scheme = SlowPublicKey()
+        self.subject = ConcurrentInsuranceService(PickleMetaSerializer(), None, self.public_key_scheme,
+                                                  storage_path=self.storage_path, workers=4)
+
+    def tearDown(self):
+        self.subject.close()
+        shutil.rmtree(self.storage_path)
+
+    def create(self, info: bytes) -> str:
+        return self.subject.submit_create(CreateRecord(read_policy='A@A', write_policy='B@A', time_period=1,
+                                                       info=info, data=b'data')).result()
+
+    def test_updates_same_location_serialized(self):
+        location = self.create(b'info')
+        futures = [self.subject.submit_update(location, UpdateRecord(b'update%d' % i, b'signature'))
+                   for i in range(4)]
+        for future in futures:
+            future.result()
+
+        self.assertEqual(1, self.public_key_scheme.max_active)
+        self.assertIn(join_chunks(self.subject.submit_load(location).result().data),
+                      [b'update%d' % i for i in range(4)])
+        self.assertEqual(0, len(self.subject._location_locks))
+
+    def test_updates_different_locations_parallel(self):
+        locations = [self.create(b'info%d' % i) for i in range(4)]
+        futures = [self.subject.submit_update(location, UpdateRecord(b'updated', b'signature'))
+                   for location in locations]
+        for future in futures:
+            future.result()
+
+        self.assertGreater(self.public_key_scheme.max_active, 1)
+        for location in locations:
+            self.assertEqual(b'updated', join_chunks(self.subject.load(location).data))
+
+    def test_load_during_policy_update(self):
+        location = self.create(b'info')
+        self.subject.invalidate_record_cache()
+        load_meta = self.subject.storage.load_meta
+        slow_loads = [True]
+
+        def slow_load_meta(location):
+            # Only the first load reads slowly, so the policy update happens while it is reading
+            meta = load_meta(location)
+            if slow_loads.pop() if slow_loads else False:
+                time.sleep(0.2)
+            return meta
+
+        self.subject.storage.load_meta = slow_load_meta
+        load = self.subject.submit_load(location)
+        time.sleep(0.05)
+        policy_update = self.subject.submit_policy_update(location, PolicyUpdateRecord(
+            read_policy='C@A', write_policy='D@A', write_public_key=None, encryption_key_read=None,
+            encryption_key_owner=None, write_private_key=None, time_period=2, signature=b'signature'))
+        load.result()
+        policy_update.result()
+        self.subject.submit_update(location, UpdateRecord(b'updated', b'signature')).result()
+
+        self.subject.invalidate_record_cache()
+        record = self.subject.submit_load(location).result()
+        self.assertEqual('C@A', record.read_policy)
+        self.assertEqual(2, record.time_period)
+        self.assertEqual(b'updated', join_chunks(record.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
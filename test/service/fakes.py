@@ -0,0 +1,16 @@
+import pickle
+
+from shared.model.records.data_record import DataRecord
+
+
+class PickleMetaSerializer(object):
+    """
+    Serializer storing the policies and time period of the meta, as the storage does not depend on the keys.
+    """
+
+    def serialize_data_record_meta(self, record: DataRecord) -> bytes:
+        return pickle.dumps((record.read_policy, record.write_policy, record.time_period, record.info))
+
+    def deserialize_data_record_meta(self, data: bytes, lazy: bool = False) -> DataRecord:
+        read_policy, write_policy, time_period, info = pickle.loads(data)
+        return DataRecord(read_policy=read_policy, write_policy=write_policy, time_period=time_period, info=info)
@@ -0,0 +1,102 @@
+import shutil
+import tempfile
+import unittest
+
+from client.user_client import UserClient
+from service.insurance_service import InsuranceService
+from shared.implementations.rd13_implementation import RD13Implementation
+from shared.model.records.create_record import CreateRecord
+from shared.model.records.policy_update_record import PolicyUpdateRecord
+from shared.model.records.update_record import UpdateRecord
+from shared.model.user import User
+from shared.utils.data_util import join_chunks
+from test.service.fakes import PickleMetaSerializer
+
+
+class AcceptingPublicKey(object):
+    """
+    Public key scheme accepting all signatures, as the cache does not depend on the verification.
+    """
+
+    def verify(self, public_key, signature, data) -> bool:
+        return True
+
+
+class InsuranceServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.subject = InsuranceService(PickleMetaSerializer(), None, AcceptingPublicKey(),
+                                        storage_path=self.storage_path, record_cache_size=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.storage_path)
+
+    def create(self, info: bytes) -> str:
+        return self.subject.create(CreateRecord(read_policy='A@A', write_policy='B@A', time_period=1, info=info,
+                                                data=b'data'))
+
+    def test_load_cached(self):
+        location = self.create(b'info')
+        record = self.subject.load(location)
+        self.assertEqual((0, 1), (self.subject.record_cache_hits, self.subject.record_cache_misses))
+
+        record.read_policy = 'modified'
+        record = self.subject.load(location)
+        self.assertEqual((1, 1), (self.subject.record_cache_hits, self.subject.record_cache_misses))
+        self.assertEqual('A@A', record.read_policy)
+        self.assertEqual(b'data', join_chunks(record.data))
+
+    def test_load_lazy_modified(self):
+        implementation = RD13Implementation()
+        central_authority = implementation.create_central_authority()
+        central_authority.central_setup()
+        attribute_authority = implementation.create_attribute_authority('TEST')
+        attribute_authority.setup(central_authority, ['TEST@TEST'], 1)
+        self.subject = InsuranceService(implementation.serializer, central_authority,
+                                        implementation.public_key_scheme, storage_path=self.storage_path)
+        self.subject.add_authority(attribute_authority)
+        client = UserClient(User('bob', implementation), implementation, storage_path=self.storage_path)
+        client.register(self.subject)
+        client.user.owner_key_pair = client.create_owner_key()
+        location = self.subject.create(client.create_record('TEST@TEST', 'TEST@TEST', b'Hello world', {}, 1))
+
+        # Modify a field which is not decoded yet of the record loaded on a miss
+        record = self.subject.load(location)
+        self.assertNotIn('encryption_key_read', record.__dict__)
+        record.encryption_key_read = None
+        record = self.subject.load(location)
+        self.assertEqual((1, 1), (self.subject.record_cache_hits, self.subject.record_cache_misses))
+        self.assertIsNotNone(record.encryption_key_read)
+
+    def test_write_through(self):
+        location = self.create(b'info')
+        self.subject.update(location, UpdateRecord(b'updated', b'signature'))
+        self.subject.policy_update(location, PolicyUpdateRecord('C@A', 'D@A', None, None, None, None, 2,
+                                                                b'signature'))
+
+        record = self.subject.load(location)
+        self.assertEqual(2, self.subject.record_cache_hits)
+        self.assertEqual('C@A', record.read_policy)
+        self.assertEqual(2, record.time_period)
+        self.assertEqual(b'updated', join_chunks(record.data))
+
+    def test_cache_bounded(self):
+        locations = [self.create(b'info%d' % i) for i in range(3)]
+        for location in locations:
+            self.subject.load(location)
+        self.assertEqual(3, self.subject.record_cache_misses)
+
+        self.subject.load(locations[2])
+        self.subject.load(locations[0])
+        self.assertEqual((1, 4), (self.subject.record_cache_hits, self.subject.record_cache_misses))
+
+    def test_create_invalidates(self):
+        location = self.create(b'info')
+        self.subject.load(location)
+        self.create(b'info')
+        self.subject.load(location)
+        self.assertEqual((0, 2), (self.subject.record_cache_hits, self.subject.record_cache_misses))
+
+
+if __name__ == '__main__':
+    unittest.main()
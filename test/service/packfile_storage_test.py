@@ -0,0 +1,114 @@
+import gc
+import os
+import shutil
+import tempfile
+import unittest
+
+from service.packfile_storage import PackfileStorage
+from shared.model.records.data_record import DataRecord
+from shared.utils.data_util import join_chunks
+from test.service.fakes import PickleMetaSerializer
+
+
+class PackfileStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.subject = PackfileStorage(PickleMetaSerializer(), self.storage_path, max_packfile_size=256)
+
+    def tearDown(self):
+        self.subject.close()
+        shutil.rmtree(self.storage_path)
+
+    def reopen(self):
+        self.subject.close()
+        self.subject = PackfileStorage(PickleMetaSerializer(), self.storage_path, max_packfile_size=256)
+
+    def test_store_load(self):
+        self.assertFalse(self.subject.exists('abcdef'))
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=1, info=b'info', data=b'data'))
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=2, info=b'info', data=b'updated'))
+        self.subject.store_meta('abcdef', DataRecord(read_policy='B@A', time_period=3, info=b'info'))
+
+        for _ in range(2):
+            self.assertTrue(self.subject.exists('abcdef'))
+            self.assertEqual(['abcdef'], list(self.subject.locations()))
+            loaded = self.subject.load('abcdef')
+            self.assertEqual('B@A', loaded.read_policy)
+            self.assertEqual(3, loaded.time_period)
+            self.assertEqual(b'updated', join_chunks(loaded.data))
+            self.reopen()
+
+    def test_store_streamed_from_current_version(self):
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=1, data=b'data'))
+        record = self.subject.load('abcdef')
+        record.time_period = 2
+        self.subject.store('abcdef', record)
+        self.assertEqual(b'data', join_chunks(self.subject.load('abcdef').data))
+
+    def test_uncommitted_entry_discarded(self):
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=1, data=b'data'))
+        pack_path = self.subject.pack_path(self.subject._active_id)
+        size = os.path.getsize(pack_path)
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=2, data=b'updated'))
+        self.subject.close()
+        # Simulate a crash before committing the second entry
+        with open(pack_path, 'r+b') as f:
+            f.truncate(size + 10)
+
+        self.reopen()
+        self.assertEqual(1, self.subject.load('abcdef').time_period)
+        self.assertEqual(size, os.path.getsize(pack_path))
+
+    def test_compact(self):
+        for i in range(20):
+            self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=i, data=b'a' * 50))
+            self.subject.store('123456', DataRecord(read_policy='B@A', time_period=i, data=b'b' * 50))
+        packfiles = len(os.listdir(self.storage_path))
+        overhead = dict(self.subject.storage_space())['packfiles.overhead']
+
+        self.assertGreater(self.subject.compact(), 0)
+        # Compacted packfiles are only removed in the next compaction
+        self.subject.compact()
+        self.assertLess(len(os.listdir(self.storage_path)), packfiles)
+        self.assertLess(dict(self.subject.storage_space())['packfiles.overhead'], overhead)
+
+        self.reopen()
+        self.assertEqual(19, self.subject.load('abcdef').time_period)
+        self.assertEqual(b'b' * 50, join_chunks(self.subject.load('123456').data))
+
+    def test_data_without_meta(self):
+        self.subject.store_data('abcdef', b'd' * 50)
+        for i in range(20):
+            self.subject.store('123456', DataRecord(read_policy='B@A', time_period=i, data=b'b' * 50))
+        with self.assertRaises(KeyError):
+            self.subject.load_meta('abcdef')
+
+        self.assertGreater(self.subject.compact(), 0)
+        self.reopen()
+        self.assertEqual(b'd' * 50, join_chunks(self.subject.load_data('abcdef')))
+        with self.assertRaises(KeyError):
+            self.subject.load_meta('abcdef')
+
+    def test_compact_keeps_loaded_data(self):
+        for i in range(20):
+            self.subject.store('abcdef', DataRecord(read_policy='A@A', time_period=i, data=b'a' * 50))
+        self.subject.store('123456', DataRecord(read_policy='B@A', time_period=1, data=b'b' * 50))
+        data = self.subject.load_data('123456')
+        pack_path = data.file_path
+        for i in range(20):
+            self.subject.store('123456', DataRecord(read_policy='B@A', time_period=i, data=b'c' * 50))
+
+        self.assertGreater(self.subject.compact(), 0)
+        self.subject.compact()
+        self.assertTrue(os.path.exists(pack_path))
+        self.assertEqual(b'b' * 50, join_chunks(data))
+
+        # The packfile is removed once the loaded data is no longer referenced
+        del data
+        gc.collect()
+        self.subject.compact()
+        self.assertFalse(os.path.exists(pack_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
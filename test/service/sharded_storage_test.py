@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from service.sharded_storage import ShardedStorage
+from shared.model.records.data_record import DataRecord
+from shared.utils.data_util import join_chunks
+from test.service.fakes import PickleMetaSerializer
+
+
+class ShardedStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.subject = ShardedStorage(PickleMetaSerializer(), self.storage_path)
+
+    def tearDown(self):
+        self.subject.close()
+        shutil.rmtree(self.storage_path)
+
+    def test_store_load(self):
+        record = DataRecord(read_policy='A@A', write_policy='B@A', time_period=1, info=b'info', data=b'data')
+        self.subject.store('abcdef', record)
+
+        self.assertTrue(os.path.exists(os.path.join(self.storage_path, 'ab', 'cd', 'abcdef.dat')))
+        loaded = self.subject.load('abcdef')
+        self.assertEqual('A@A', loaded.read_policy)
+        self.assertEqual(b'info', loaded.info)
+        self.assertEqual(b'data', join_chunks(loaded.data))
+
+    def test_index(self):
+        self.assertFalse(self.subject.exists('abcdef'))
+        self.assertIsNone(self.subject.index_entry('abcdef'))
+
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', write_policy='B@A', time_period=1, data=b'data'))
+        self.subject.store('123456', DataRecord(read_policy='A@A', write_policy='B@A', time_period=1, data=b''))
+        self.subject.store_meta('abcdef', DataRecord(read_policy='C@A', write_policy='B@A', time_period=2))
+
+        self.assertTrue(self.subject.exists('abcdef'))
+        self.assertEqual(['123456', 'abcdef'], list(self.subject.locations()))
+        entry = self.subject.index_entry('abcdef')
+        self.assertEqual('C@A', entry['read_policy'])
+        self.assertEqual(2, entry['time_period'])
+        self.assertEqual(4, entry['data_size'])
+        self.assertEqual(os.path.getsize(self.subject.file_path('abcdef', 'meta')), entry['meta_size'])
+
+        sizes = dict(self.subject.storage_space())
+        self.assertEqual(4, sizes['abcdef.dat'])
+        self.assertEqual(0, sizes['123456.dat'])
+
+    def test_index_persistent(self):
+        self.subject.store('abcdef', DataRecord(read_policy='A@A', write_policy='B@A', time_period=1, data=b'data'))
+        self.subject.close()
+
+        self.subject = ShardedStorage(PickleMetaSerializer(), self.storage_path)
+        self.assertTrue(self.subject.exists('abcdef'))
+        self.assertEqual(4, self.subject.index_entry('abcdef')['data_size'])
+
+
+if __name__ == '__main__':
+    unittest.main()
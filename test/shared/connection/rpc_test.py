@@ -0,0 +1,124 @@
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from shared.connection.rpc import RpcClient, RpcServer, receive_frame, send_frame
+from shared.exception.remote_call_exception import RemoteCallException
+
+
+class PickleSerializer(object):
+    """
+    Serializer pickling the messages, as the transport does not depend on the group elements.
+    """
+
+    def dumps(self, obj) -> bytes:
+        return pickle.dumps(obj)
+
+    def loads(self, data: bytes):
+        return pickle.loads(data)
+
+
+class CountingPickleSerializer(PickleSerializer):
+    def __init__(self):
+        self.loaded = 0
+
+    def loads(self, data: bytes):
+        self.loaded += 1
+        return super().loads(data)
+
+
+class EchoHandler(object):
+    rpc_methods = ['echo', 'fail']
+
+    def echo(self, value):
+        return value
+
+    def fail(self):
+        raise ValueError('failed')
+
+    def hidden(self):
+        return 'hidden'
+
+
+class RpcTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = RpcServer(EchoHandler(), PickleSerializer())
+        self.server.start()
+        self.subject = RpcClient(self.server.address, PickleSerializer(), self.server.authkey, pool_size=2)
+
+    def tearDown(self):
+        self.subject.close()
+        self.server.close()
+
+    def test_call(self):
+        data = b'x' * 100000
+        result, sent, received = self.subject.call('echo', data)
+        self.assertEqual(data, result)
+        self.assertEqual(len(pickle.dumps(('echo', (data,)))) + 4, sent)
+        self.assertEqual(len(pickle.dumps((True, data))) + 4, received)
+
+    def test_errors(self):
+        with self.assertRaises(RemoteCallException):
+            self.subject.call('fail')
+        with self.assertRaises(RemoteCallException):
+            self.subject.call('hidden')
+        # The socket is still usable after an error
+        self.assertEqual(1, self.subject.call('echo', 1)[0])
+
+    def test_concurrent_calls(self):
+        results = dict()
+
+        def run(i):
+            for j in range(20):
+                results[(i, j)] = self.subject.call('echo', (i, j))[0]
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(key == value for key, value in results.items()))
+        self.assertEqual(160, len(results))
+        self.assertLessEqual(self.subject._idle.qsize(), 2)
+
+    def test_wrong_authkey(self):
+        client = RpcClient(self.server.address, PickleSerializer(), b'wrong')
+        with self.assertRaises(ConnectionError):
+            client.call('echo', 1)
+        self.assertEqual(0, client._idle.qsize())
+
+    def test_unauthenticated_request_not_unpickled(self):
+        serializer = CountingPickleSerializer()
+        server = RpcServer(EchoHandler(), serializer)
+        server.start()
+        connection = socket.create_connection(server.address)
+        try:
+            # The challenge of the server is answered with a pickled request instead
+            receive_frame(connection)
+            send_frame(connection, pickle.dumps(('echo', (1,))))
+            self.assertIsNone(receive_frame(connection))
+            self.assertEqual(0, serializer.loaded)
+        finally:
+            connection.close()
+            server.close()
+
+    def test_unix_socket(self):
+        directory = tempfile.mkdtemp()
+        server = RpcServer(EchoHandler(), PickleSerializer(), os.path.join(directory, 'echo.sock'))
+        server.start()
+        client = RpcClient(server.address, PickleSerializer(), server.authkey)
+        try:
+            self.assertEqual(0o600, os.stat(server.address).st_mode & 0o777)
+            self.assertEqual('unix', client.call('echo', 'unix')[0])
+        finally:
+            client.close()
+            server.close()
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
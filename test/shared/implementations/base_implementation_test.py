@@ -4,6 +4,8 @@ from charm.core.math.pairing import GT
 from shared.connection.user_attribute_authority_connection import UserAttributeAuthorityConnection
 from shared.exception.policy_not_satisfied_exception import PolicyNotSatisfiedException
 from shared.implementations.base_implementation import BaseImplementation
+from shared.implementations.public_key.ec_public_key import ECPublicKey
+from shared.utils import policy_cache
 from test.data import lorem
 
 
@@ -118,6 +120,15 @@ class BaseImplementationTestCase(unittest.TestCase):
         except PolicyNotSatisfiedException:
             pass
 
+    def encrypt_decrypt_abe_uncached(self):
+        self.assertIs(self.subject.scheme, self.subject.scheme)
+        policy_cache.POLICY_CACHE_ENABLED = False
+        try:
+            self.assertIsNot(self.subject.scheme, self.subject.scheme)
+            self.encrypt_decrypt_abe()
+        finally:
+            policy_cache.POLICY_CACHE_ENABLED = True
+
     def encrypt_decrypt_abe_wrapped(self):
         self.setup_abe()
 
@@ -175,6 +186,38 @@ class BaseImplementationTestCase(unittest.TestCase):
             except PolicyNotSatisfiedException:
                 pass
 
+    def encrypt_decrypt_abe_batch_keygen(self):
+        self.setup_abe()
+        bob_registration_data = self.ca.register_user('bob')
+        self.ma1.revoke_attribute_indirect('bob', 'ONE@A1', 1)
+
+        m = self.global_parameters.group.random(GT)
+        ciphertext = self.subject.abe_encrypt(self.global_parameters, self.public_keys, m, self.policy, 1)
+        authorities = {self.ma1.name: UserAttributeAuthorityConnection(self.ma1),
+                       self.ma2.name: UserAttributeAuthorityConnection(self.ma2)}
+
+        secret_keys = {'alice': self.subject.setup_secret_keys('alice'),
+                       'bob': self.subject.setup_secret_keys('bob')}
+        registration_data = {'alice': self.registration_data, 'bob': bob_registration_data}
+        for authority, attributes in [(self.ma1, ['ONE@A1', 'TWO@A1']), (self.ma2, ['THREE@A2', 'FOUR@A2'])]:
+            requests = [{'gid': gid, 'registration_data': registration_data[gid], 'attributes': attributes,
+                         'time_period': 1} for gid in ['alice', 'bob']]
+            for gid, keys in zip(['alice', 'bob'], authority.keygen_batch(requests)):
+                self.subject.update_secret_keys(secret_keys[gid], keys)
+
+        decryption_keys = self.subject.decryption_keys(self.global_parameters, authorities, secret_keys['alice'],
+                                                       self.registration_data, ciphertext, 1)
+        self.assertEqual(m, self.subject.abe_decrypt(self.global_parameters, decryption_keys, 'alice',
+                                                     ciphertext, self.registration_data))
+
+        # ONE@A1 is revoked for bob, which is required by each clause of the policy
+        with self.assertRaises(PolicyNotSatisfiedException):
+            decryption_keys = self.subject.decryption_keys(self.global_parameters, authorities,
+                                                           secret_keys['bob'], bob_registration_data,
+                                                           ciphertext, 1)
+            self.subject.abe_decrypt(self.global_parameters, decryption_keys, 'bob', ciphertext,
+                                     bob_registration_data)
+
     def abe_serialize_deserialize(self):
         self.setup_abe()
 
@@ -192,6 +235,13 @@ class BaseImplementationTestCase(unittest.TestCase):
         self.assertIsNotNone(deserialized)
         self.assertEqual(deserialized, ciphertext)
 
+    def public_key_scheme_serializer_options(self):
+        self.subject.serializer.binary_format = True
+        public_key_scheme = ECPublicKey()
+        self.subject.public_key_scheme = public_key_scheme
+        self.assertIs(public_key_scheme, self.subject.serializer.public_key_scheme)
+        self.assertTrue(self.subject.serializer.binary_format)
+
 
 if __name__ == '__main__':
     unittest.main()
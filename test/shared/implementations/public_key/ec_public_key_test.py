@@ -0,0 +1,57 @@
+import unittest
+
+from charm.toolbox.ecgroup import ZR
+from shared.implementations.public_key.base_public_key import BasePublicKey
+from shared.implementations.public_key.ec_public_key import ECPublicKey, pack_parts, unpack_parts
+from test.data import lorem
+
+
+class ECPublicKeyTestCase(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.subject = None  # type: BasePublicKey
+
+    def setUp(self):
+        self.subject = ECPublicKey()
+
+    def test_encrypt_decrypt(self):
+        key = self.subject.generate_key_pair(256)
+        for m in [b'Hello world', b'a' * 32]:
+            c = self.subject.encrypt(m, key.publickey())
+            self.assertNotEqual(c, m)
+            self.assertEqual(m, self.subject.decrypt(c, key))
+        other_key = self.subject.generate_key_pair(256)
+        with self.assertRaises(ValueError):
+            self.subject.decrypt(self.subject.encrypt(b'Hello world', key.publickey()), other_key)
+
+    def test_sign_verify(self):
+        key = self.subject.generate_key_pair(256)
+        for m in [b'Hello world', lorem]:
+            s = self.subject.sign(key, m)
+            self.assertNotEqual(s, m)
+            self.assertTrue(self.subject.verify(key.publickey(), s, m))
+            self.assertFalse(self.subject.verify(self.subject.generate_key_pair(256).publickey(), s, m))
+
+    def test_verify_invalid_signature(self):
+        key = self.subject.generate_key_pair(256)
+        r, s = unpack_parts(self.subject.sign(key, b'Hello world'))
+        group = self.subject.group
+        zero = group.serialize(group.init(ZR, 0))
+        order = group.serialize(group.order())
+        point = group.serialize(key.y)
+        for signature in [pack_parts(r, zero), pack_parts(zero, s), pack_parts(r, order), pack_parts(r, point),
+                          pack_parts(r), pack_parts(r, b'invalid'), b'invalid']:
+            self.assertFalse(self.subject.verify(key.publickey(), signature, b'Hello world'))
+
+    def test_fixed_generator(self):
+        self.assertEqual(self.subject.generate_key_pair(256).g, self.subject.generate_key_pair(256).g)
+
+    def test_export_import(self):
+        key = self.subject.generate_key_pair(256)
+        self.assertEqual(key, self.subject.import_key(self.subject.export_key(key)))
+        self.assertEqual(key.publickey(), self.subject.import_key(self.subject.export_key(key.publickey())))
+        self.assertNotEqual(key, key.publickey())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from shared.implementations.public_key.key_pair_pool import KeyPairPool
+from shared.implementations.public_key.rsa_public_key import RSAPublicKey
+
+
+class KeyPairPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.spill_path = os.path.join(tempfile.mkdtemp(), 'pool.dat')
+        self.subject = KeyPairPool(RSAPublicKey(), 1024, low_watermark=2, high_watermark=3,
+                                   spill_path=self.spill_path)
+
+    def tearDown(self):
+        self.subject.stop()
+
+    def test_take_without_start(self):
+        self.assertIsNotNone(self.subject.take())
+        self.assertEqual(0, len(self.subject))
+
+    def test_fill(self):
+        self.subject.start()
+        self.assertTrue(self.subject.wait_until_filled(3, timeout=60))
+        key_pairs = [self.subject.take() for _ in range(5)]
+        self.assertEqual(5, len(set(key_pair.publickey().exportKey('DER') for key_pair in key_pairs)))
+        self.assertTrue(self.subject.wait_until_filled(2, timeout=60))
+
+    def test_spill(self):
+        self.subject.start()
+        self.assertTrue(self.subject.wait_until_filled(3, timeout=60))
+        self.subject.stop()
+        self.assertTrue(os.path.exists(self.spill_path))
+        self.assertEqual(0, len(self.subject))
+
+        restarted = KeyPairPool(RSAPublicKey(), 1024, low_watermark=0, high_watermark=0, spill_path=self.spill_path)
+        restarted.load()
+        self.assertEqual(3, len(restarted))
+        # Loaded key pairs are removed from disk, so they can not be handed out twice
+        self.assertFalse(os.path.exists(self.spill_path))
+
+    def test_stop_start_no_duplicates(self):
+        self.subject.start()
+        self.assertTrue(self.subject.wait_until_filled(3, timeout=60))
+        key_pairs = [self.subject.take()]
+        self.subject.stop()
+        key_pairs.append(self.subject.take())
+        # The spilled key pairs are loaded again
+        self.subject.start()
+        self.assertTrue(self.subject.wait_until_filled(2, timeout=60))
+        key_pairs.extend(self.subject.take() for _ in range(5))
+        self.assertEqual(len(key_pairs), len(set(key_pair.publickey().exportKey('DER') for key_pair in key_pairs)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,12 +13,21 @@ class RD13ImplementationTestCase(BaseImplementationTestCase):
     def test_encrypt_decrypt_abe(self):
         self.encrypt_decrypt_abe()
 
+    def test_encrypt_decrypt_abe_uncached(self):
+        self.encrypt_decrypt_abe_uncached()
+
     def test_encrypt_decrypt_abe_wrapped(self):
         self.encrypt_decrypt_abe_wrapped()
 
+    def test_encrypt_decrypt_abe_batch_keygen(self):
+        self.encrypt_decrypt_abe_batch_keygen()
+
     def test_abe_serialize_deserialize(self):
         self.abe_serialize_deserialize()
 
+    def test_public_key_scheme_serializer_options(self):
+        self.public_key_scheme_serializer_options()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,7 +7,7 @@ from shared.implementations.dacmacs13_implementation import DACMACS13Implementat
 from shared.implementations.public_key.rsa_public_key import RSAPublicKey
 from shared.implementations.rd13_implementation import RD13Implementation
 from shared.implementations.rw15_implementation import RW15Implementation
-from shared.implementations.serializer.base_serializer import BaseSerializer
+from shared.implementations.serializer.base_serializer import BaseSerializer, AttributeReplacementTable
 from shared.implementations.taac12_implementation import TAAC12Implementation
 from shared.model.global_parameters import GlobalParameters
 from shared.model.records.data_record import DataRecord
@@ -37,6 +37,21 @@ class BaseSerializerTestCase(unittest.TestCase):
         self.assertEqual('ATTRIBUTE2', self.subject.undo_attribute_replacement(d, a2))
         self.assertEqual('ATTRIBUTE1', self.subject.undo_attribute_replacement(d, a3))
 
+    def test_attribute_replacement_table(self):
+        table = AttributeReplacementTable()
+        a1 = table.replace('ATTRIBUTE1')
+        a2 = table.replace('ATTRIBUTE2')
+        a3 = table.replace('ATTRIBUTE1')
+
+        self.assertEqual(a1, a3)
+        self.assertEqual(2, len(table))
+        self.assertEqual('ATTRIBUTE1', self.subject.undo_attribute_replacement(table.as_dict(), a1))
+        self.assertEqual('ATTRIBUTE2', self.subject.undo_attribute_replacement(table.as_dict(), a2))
+
+        restored = AttributeReplacementTable(dict(table.as_dict()))
+        self.assertEqual(a2, restored.replace('ATTRIBUTE2'))
+        self.assertEqual(2, restored.replace('ATTRIBUTE3'))
+
     def test_serialize_deserialize_abe_ciphertext(self):
         for implementation in self.implementations:
             ciphertext = self._create_ciphertext(implementation)
@@ -47,6 +62,20 @@ class BaseSerializerTestCase(unittest.TestCase):
 
             self.assertEqual(ciphertext, deserialized)
 
+    def test_encode_decode_abe_ciphertext_binary(self):
+        for implementation in self.implementations:
+            ciphertext = self._create_ciphertext(implementation)
+
+            serializer = implementation.serializer
+            pickled = serializer.encode(serializer.serialize_abe_ciphertext(ciphertext))
+            serializer.binary_format = True
+            encoded = serializer.encode(serializer.serialize_abe_ciphertext(ciphertext))
+
+            self.assertLess(len(encoded), len(pickled))
+            self.assertEqual(ciphertext, serializer.deserialize_abe_ciphertext(serializer.decode(encoded)))
+            # Pickled ciphertexts can still be decoded
+            self.assertEqual(ciphertext, serializer.deserialize_abe_ciphertext(serializer.decode(pickled)))
+
     def test_serialize_deserialize_global_scheme_parameters(self):
         for implementation in self.implementations:
             self._setup_authorities(implementation)
@@ -83,8 +112,21 @@ class BaseSerializerTestCase(unittest.TestCase):
         return ciphertext
 
     def test_serialize_deserialize_data_record_meta(self):
+        self._test_serialize_deserialize_data_record_meta(False)
+
+    def test_serialize_deserialize_data_record_meta_binary(self):
+        self._test_serialize_deserialize_data_record_meta(True)
+
+    def test_serialize_deserialize_data_record_meta_lazy(self):
+        self._test_serialize_deserialize_data_record_meta(False, lazy=True)
+
+    def test_serialize_deserialize_data_record_meta_binary_lazy(self):
+        self._test_serialize_deserialize_data_record_meta(True, lazy=True)
+
+    def _test_serialize_deserialize_data_record_meta(self, binary_format: bool, lazy: bool = False):
         for implementation in self.implementations:
             serializer = implementation.serializer
+            serializer.binary_format = binary_format
             owner_keys = implementation.public_key_scheme.generate_key_pair(2048)
             write_keys = implementation.public_key_scheme.generate_key_pair(2048)
 
@@ -103,11 +145,15 @@ class BaseSerializerTestCase(unittest.TestCase):
                                                                      self.policy, self.time_period),
                 time_period=self.time_period,
                 info=None,
-                data=None
+                data=None,
+                wrapped_data_key=b'wrapped'
             )
 
             serialized = serializer.serialize_data_record_meta(data_record)
-            deserialized = serializer.deserialize_data_record_meta(serialized)
+            deserialized = serializer.deserialize_data_record_meta(serialized, lazy=lazy)
+            if lazy:
+                self.assertNotIn('encryption_key_read', deserialized.__dict__)
+                self.assertNotIn('owner_public_key', deserialized.__dict__)
 
             self.assertEqual(data_record.read_policy, deserialized.read_policy)
             self.assertEqual(data_record.write_policy, deserialized.write_policy)
@@ -119,6 +165,7 @@ class BaseSerializerTestCase(unittest.TestCase):
             self.assertEqual(data_record.time_period, deserialized.time_period)
             self.assertEqual(data_record.info, deserialized.info)
             self.assertEqual(data_record.data, deserialized.data)
+            self.assertEqual(data_record.wrapped_data_key, deserialized.wrapped_data_key)
 
     def test_serialize_deserialize_authority_public_keys(self):
         for implementation in self.implementations:
@@ -1,7 +1,10 @@
+import os
+import tempfile
 import unittest
 
 from shared.implementations.symmetric_key.aes_symmetric_key import AESSymmetricKey
 from shared.implementations.symmetric_key.base_symmetric_key import BaseSymmetricKey
+from shared.utils.data_util import FileChunks
 from test.data import lorem
 
 
@@ -23,6 +26,35 @@ class AESSymmetricKeyTestCase(unittest.TestCase):
             r = self.subject.ske_decrypt(c, b'b' * self.subject.ske_key_size())
             self.assertNotEqual(m, r)
 
+    def test_ske_encrypt_decrypt_stream(self):
+        key = b'a' * self.subject.ske_key_size()
+        for m in [b'', b'Hello world', lorem]:
+            for chunk_size in [1, 7, 16, 1000]:
+                chunks = [m[i:i + chunk_size] for i in range(0, len(m), chunk_size)]
+                c = b''.join(self.subject.ske_encrypt_stream(chunks, key))
+                self.assertEqual(m, self.subject.ske_decrypt(c, key))
+                c = self.subject.ske_encrypt(m, key)
+                d = b''.join(self.subject.ske_decrypt_stream(
+                    [c[i:i + chunk_size] for i in range(0, len(c), chunk_size)], key))
+                self.assertEqual(m, d)
+
+    def test_ske_decrypt_buffer(self):
+        key = b'a' * self.subject.ske_key_size()
+        for m in [b'', b'Hello world', lorem]:
+            c = self.subject.ske_encrypt(m, key)
+            self.assertEqual(m, self.subject.ske_decrypt_buffer(memoryview(c), key))
+            self.assertEqual(m, self.subject.ske_decrypt_buffer(memoryview(bytearray(c)), key))
+
+    def test_ske_decrypt_buffer_mapped_file(self):
+        key = b'a' * self.subject.ske_key_size()
+        handle, file_path = tempfile.mkstemp()
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                f.write(self.subject.ske_encrypt(lorem, key))
+            self.assertEqual(lorem, self.subject.ske_decrypt_buffer(FileChunks(file_path).buffer(), key))
+        finally:
+            os.remove(file_path)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.exception.ciphertext_integrity_exception import CiphertextIntegrityException
+from shared.implementations.symmetric_key.chunked_aes_symmetric_key import ChunkedAESSymmetricKey, HEADER_SIZE, \
+    TAG_SIZE
+from test.data import lorem
+
+
+class ChunkedAESSymmetricKeyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.subject = ChunkedAESSymmetricKey(block_size=64)
+        self.key = b'a' * self.subject.ske_key_size()
+
+    def test_ske_encrypt_decrypt(self):
+        for m in [b'', b'Hello world', b'a' * 64, b'a' * 128, lorem]:
+            c = self.subject.ske_encrypt(m, self.key)
+            self.assertNotEqual(c, m)
+            self.assertEqual(m, self.subject.ske_decrypt(c, self.key))
+            self.assertEqual(m, b''.join(self.subject.ske_decrypt_stream(
+                [c[i:i + 7] for i in range(0, len(c), 7)], self.key)))
+
+    def test_ske_decrypt_buffer(self):
+        for m in [b'', b'Hello world', b'a' * 64, b'a' * 128, lorem]:
+            c = self.subject.ske_encrypt(m, self.key)
+            self.assertEqual(m, self.subject.ske_decrypt_buffer(memoryview(c), self.key))
+
+    def test_ske_decrypt_range(self):
+        for m in [b'', b'Hello world', b'a' * 64, b'a' * 128, lorem]:
+            c = self.subject.ske_encrypt(m, self.key)
+            for offset, length in [(0, 10), (0, len(m)), (5, 64), (63, 2), (64, 64), (max(len(m) - 1, 0), 10), (1000, 1)]:
+                self.assertEqual(m[offset:offset + length],
+                                 self.subject.ske_decrypt_range(c, self.key, offset, length))
+
+    def test_ske_decrypt_tampered(self):
+        c = bytearray(self.subject.ske_encrypt(lorem, self.key))
+        c[HEADER_SIZE + 64 + TAG_SIZE + 6] ^= 1
+        with self.assertRaises(CiphertextIntegrityException):
+            self.subject.ske_decrypt(bytes(c), self.key)
+        with self.assertRaises(CiphertextIntegrityException):
+            self.subject.ske_decrypt_range(bytes(c), self.key, 64, 1)
+        # Other blocks can still be read
+        self.assertEqual(lorem[:64], self.subject.ske_decrypt_range(bytes(c), self.key, 0, 64))
+
+    def test_ske_decrypt_truncated(self):
+        c = self.subject.ske_encrypt(lorem, self.key)
+        with self.assertRaises(CiphertextIntegrityException):
+            self.subject.ske_decrypt(c[:HEADER_SIZE + 2 * (64 + TAG_SIZE)], self.key)
+        with self.assertRaises(CiphertextIntegrityException):
+            self.subject.ske_decrypt_range(c[:HEADER_SIZE + 2 * (64 + TAG_SIZE)], self.key, 0, 10000)
+
+    def test_ske_decrypt_wrong_key(self):
+        c = self.subject.ske_encrypt(b'Hello world', self.key)
+        with self.assertRaises(CiphertextIntegrityException):
+            self.subject.ske_decrypt(c, b'b' * self.subject.ske_key_size())
+
+    def test_ske_encrypt_decrypt_parallel(self):
+        executor = ThreadPoolExecutor(max_workers=3)
+        parallel = ChunkedAESSymmetricKey(block_size=64, workers=3, executor=executor)
+        for m in [b'', b'Hello world', lorem]:
+            # Ciphertexts are interchangeable between sequential and parallel processing
+            self.assertEqual(m, self.subject.ske_decrypt(parallel.ske_encrypt(m, self.key), self.key))
+            c = self.subject.ske_encrypt(m, self.key)
+            self.assertEqual(m, parallel.ske_decrypt(c, self.key))
+            self.assertEqual(m[60:200], parallel.ske_decrypt_range(c, self.key, 60, 140))
+        parallel.close()
+        # The given executor is still usable after closing the scheme
+        self.assertEqual(1, executor.submit(abs, -1).result())
+        executor.shutdown()
+
+    def test_window(self):
+        executor = ThreadPoolExecutor(max_workers=3)
+        self.assertEqual(6, ChunkedAESSymmetricKey(workers=3, executor=executor).window)
+        self.assertEqual(2, ChunkedAESSymmetricKey(executor=executor).window)
+        limited = ChunkedAESSymmetricKey(block_size=64, workers=3, executor=executor, max_in_flight=1)
+        self.assertEqual(1, limited.window)
+        self.assertEqual(lorem, limited.ske_decrypt(limited.ske_encrypt(lorem, self.key), self.key))
+        limited.close()
+        executor.shutdown()
+
+    def test_ske_encrypt_decrypt_process_pool(self):
+        parallel = ChunkedAESSymmetricKey(block_size=1024, workers=2)
+        c = parallel.ske_encrypt(lorem, self.key)
+        self.assertEqual(lorem, parallel.ske_decrypt(c, self.key))
+        parallel.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
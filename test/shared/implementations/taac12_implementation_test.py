@@ -1,7 +1,9 @@
+import shutil
+import tempfile
 import unittest
 
 from charm.toolbox.pairinggroup import PairingGroup
-from shared.implementations.taac12_implementation import TAAC12Implementation
+from shared.implementations.taac12_implementation import TAAC12Implementation, UPDATE_KEYS_CACHE_SIZE
 from test.shared.implementations.base_implementation_test import BaseImplementationTestCase
 
 
@@ -13,12 +15,45 @@ class TAAC12ImplementationTestCase(BaseImplementationTestCase):
     def test_encrypt_decrypt_abe(self):
         self.encrypt_decrypt_abe()
 
+    def test_encrypt_decrypt_abe_uncached(self):
+        self.encrypt_decrypt_abe_uncached()
+
     def test_encrypt_decrypt_abe_wrapped(self):
         self.encrypt_decrypt_abe_wrapped()
 
+    def test_encrypt_decrypt_abe_batch_keygen(self):
+        self.encrypt_decrypt_abe_batch_keygen()
+
     def test_abe_serialize_deserialize(self):
         self.abe_serialize_deserialize()
 
+    def test_public_key_scheme_serializer_options(self):
+        self.public_key_scheme_serializer_options()
+
+    def test_update_keys_incremental(self):
+        storage_path = tempfile.mkdtemp()
+        try:
+            ca = self.subject.create_central_authority()
+            ca.central_setup()
+            authority = self.subject.create_attribute_authority('A1', storage_path=storage_path)
+            authority.setup(ca, ['ONE@A1', 'TWO@A1'], 1)
+
+            update_keys = authority.update_keys(1)
+            self.assertIs(update_keys, authority.update_keys(1))
+
+            authority.revoke_attribute_indirect('alice', 'ONE@A1', 1)
+            incremental_update_keys = authority.update_keys(1)
+            self.assertIs(update_keys['TWO@A1'], incremental_update_keys['TWO@A1'])
+            self.assertNotEqual(update_keys['ONE@A1'], incremental_update_keys['ONE@A1'])
+
+            for time_period in range(2, UPDATE_KEYS_CACHE_SIZE + 2):
+                authority.update_keys(time_period)
+            self.assertNotIn(1, authority._update_keys)
+            self.assertEqual(self.subject.serializer.serialize_authority_update_keys(incremental_update_keys),
+                             self.subject.serializer.serialize_authority_update_keys(authority.update_keys(1)))
+        finally:
+            shutil.rmtree(storage_path)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import copy
+import pickle
+import threading
+import unittest
+
+from shared.model.records.lazy_data_record import LazyDataRecord
+
+
+class LazyDataRecordTestCase(unittest.TestCase):
+    def test_records_decoded_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def decode():
+            # Only returns when both records are decoded at the same time
+            barrier.wait()
+            return 'A'
+
+        records = [LazyDataRecord({'read_policy': decode}) for _ in range(2)]
+        results = []
+        threads = [threading.Thread(target=lambda record=record: results.append(record.read_policy))
+                   for record in records]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(['A', 'A'], results)
+        self.assertFalse(barrier.broken)
+
+    def test_copies_decode_once(self):
+        calls = []
+        record = LazyDataRecord({'read_policy': lambda: calls.append('rp') or 'A'})
+        copies = [copy.copy(copy.copy(record)) for _ in range(4)]
+        threads = [threading.Thread(target=lambda c=c: c.read_policy) for c in copies]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(['rp'], calls)
+        self.assertTrue(all(c._lock is record._lock for c in copies))
+
+    def test_pickle(self):
+        record = LazyDataRecord({'read_policy': lambda: 'A', 'write_policy': lambda: 'B'}, time_period=1)
+        self.assertEqual('A', record.read_policy)
+        for subject in (record, copy.copy(record)):
+            loaded = pickle.loads(pickle.dumps(subject))
+            self.assertEqual(('A', 'B', 1), (loaded.read_policy, loaded.write_policy, loaded.time_period))
+            with self.assertRaises(AttributeError):
+                _ = loaded.owner_public_key
+
+
+if __name__ == '__main__':
+    unittest.main()